@@ -2,6 +2,18 @@ from flask import Flask
 import os
 import models
 import routes
+import controllers.catalog
+import controllers.autocomplete
+import controllers.movie
+import controllers.media
+import controllers.like
+import controllers.leaderboard
+import controllers.ingestion
+import tools.user_cache
+import tools.revocation
+import tools.password_hasher
+import tools.token_cache
+from tools.json_encoder import FastJSONEncoder
 
 
 def create_app():
@@ -16,6 +28,7 @@ def create_app():
     """
 
     app = Flask(__name__)
+    app.json_encoder = FastJSONEncoder
 
     # Register the right config for app
     current_flask_env = os.getenv("FLASK_ENV").lower()
@@ -30,5 +43,16 @@ def create_app():
 
     models.init_app(app)
     routes.init_app(app)
+    controllers.autocomplete.init_app(app)
+    controllers.media.init_app(app)
+    controllers.movie.init_app(app)
+    controllers.catalog.init_app(app)
+    controllers.like.init_app(app)
+    controllers.leaderboard.init_app(app)
+    controllers.ingestion.init_app(app)
+    tools.user_cache.init_app(app)
+    tools.revocation.init_app(app)
+    tools.password_hasher.init_app(app)
+    tools.token_cache.init_app(app)
 
     return app
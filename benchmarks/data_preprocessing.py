@@ -0,0 +1,64 @@
+"""Benchmark of the preparation of movies from raw data
+
+It compares the modes of "fixtures.db_sql.data_preprocessing" ("merge":
+first version, "grouped": one pass, "chunked": one pass by chunks)
+on the raw data replicated several times. Time and peak of memory
+allocated (tracemalloc) are measured for each mode.
+
+Usage: python -m benchmarks.data_preprocessing [number of copies]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from fixtures.db_sql.data_preprocessing import MODES
+
+RAW_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "fixtures",
+    "db_sql",
+    "Film_Locations_in_San_Francisco.csv",
+)
+
+
+def replicate_raw_data(copies, path):
+    """Write raw data "copies" times in one file (header once)"""
+    with open(RAW_DATA_PATH, encoding="utf-8") as raw_file:
+        header = raw_file.readline()
+        lines = raw_file.read()
+    if not lines.endswith("\n"):
+        lines += "\n"
+    with open(path, "w", encoding="utf-8") as replicated_file:
+        replicated_file.write(header)
+        for _ in range(copies):
+            replicated_file.write(lines)
+
+
+def main(copies=100):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "raw_data.csv")
+        replicate_raw_data(copies, path)
+        print(f"raw data       {os.path.getsize(path) / 2**20:8.1f} MiB ({copies} copies)")
+
+        results = {}
+        for mode, prepare in MODES.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            movies = prepare(path)
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[mode] = seconds
+            print(
+                f"{mode:<14} {seconds:8.2f} s  {peak / 2**20:8.1f} MiB peak"
+                f"  {len(movies)} movies"
+            )
+
+    for mode, seconds in results.items():
+        if mode != "merge":
+            print(f"speedup {mode:<6} {results['merge'] / seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,44 @@
+"""Benchmark of token verification on the auth hot path
+
+It compares "jwt.decode()" (HMAC verified at each call) with
+"tools.token_cache.decode_token()" (verified once, then read from cache).
+
+Usage: python -m benchmarks.token_cache [number of calls]
+"""
+import datetime
+import sys
+import timeit
+import jwt
+from tools.token_cache import decode_token, token_cache
+
+SECRET_KEY = "benchmark-secret-key"
+
+
+def main(number=100000):
+    token = jwt.encode(
+        {
+            "id": "26cd6e36-f441-4a6f-9924-0417014803a2",
+            "exp": datetime.datetime.utcnow() + datetime.timedelta(minutes=30),
+            "is_admin": True,
+            "ver": 0,
+        },
+        SECRET_KEY,
+        algorithm="HS256",
+    )
+    results = {
+        "jwt.decode": timeit.timeit(
+            lambda: jwt.decode(token, SECRET_KEY, algorithms="HS256"),
+            number=number,
+        ),
+        "decode_token": timeit.timeit(
+            lambda: decode_token(token, SECRET_KEY), number=number
+        ),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<14} {seconds / number * 1e6:8.2f} us/call")
+    print(f"speedup        {results['jwt.decode'] / results['decode_token']:8.1f}x")
+    print(f"cache          {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -15,6 +15,101 @@ class Config:
     FLASK_RUN_PORT = os.getenv("FLASK_RUN_PORT")
     FLASK_RUN_HOST = os.getenv("FLASK_RUN_HOST")
 
+    # Where autocomplete searches: "index" (in-process catalog index)
+    # or "database" (trigram indexes of postgres shared by all workers)
+    AUTOCOMPLETE_BACKEND = os.getenv("AUTOCOMPLETE_BACKEND", "index").lower()
+
+    # Number of results of ranked or paginated autocomplete
+    # (default & max "limit")
+    AUTOCOMPLETE_DEFAULT_LIMIT = int(os.getenv("AUTOCOMPLETE_DEFAULT_LIMIT", 10))
+    AUTOCOMPLETE_MAX_LIMIT = int(os.getenv("AUTOCOMPLETE_MAX_LIMIT", 100))
+
+    # Default number of results by page of autocomplete (0: no pagination
+    # unless "limit" or "cursor" is sent)
+    AUTOCOMPLETE_PAGE_SIZE = int(os.getenv("AUTOCOMPLETE_PAGE_SIZE", 0))
+
+    # Cache of autocomplete results (max number of entries & ttl in seconds)
+    AUTOCOMPLETE_CACHE_SIZE = int(os.getenv("AUTOCOMPLETE_CACHE_SIZE", 4096))
+    AUTOCOMPLETE_CACHE_TTL = int(os.getenv("AUTOCOMPLETE_CACHE_TTL", 60))
+
+    # Cache of movies' info (max number of entries & ttl in seconds)
+    MOVIE_CACHE_SIZE = int(os.getenv("MOVIE_CACHE_SIZE", 1024))
+    MOVIE_CACHE_TTL = int(os.getenv("MOVIE_CACHE_TTL", 3600))
+
+    # Max number of movies found at once by /movies?ids=
+    MOVIE_BATCH_MAX_IDS = int(os.getenv("MOVIE_BATCH_MAX_IDS", 100))
+
+    # Provider of movies' poster & trailer: "placeholder" or "http"
+    MEDIA_PROVIDER = os.getenv("MEDIA_PROVIDER", "placeholder").lower()
+    MEDIA_API_URL = os.getenv("MEDIA_API_URL")
+    MEDIA_API_TIMEOUT = int(os.getenv("MEDIA_API_TIMEOUT", 5))
+    # Persistent cache of posters & trailers (ttl in seconds)
+    MEDIA_CACHE_PATH = os.getenv("MEDIA_CACHE_PATH", "media_cache.sqlite3")
+    MEDIA_CACHE_TTL = int(os.getenv("MEDIA_CACHE_TTL", 7 * 24 * 3600))
+    MEDIA_NEGATIVE_CACHE_TTL = int(os.getenv("MEDIA_NEGATIVE_CACHE_TTL", 24 * 3600))
+    # Max concurrent calls to provider
+    MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", 8))
+    # Seconds between two prefetches of the whole catalog (0: disabled),
+    # started by the first request served (never by cli commands)
+    MEDIA_PREFETCH_INTERVAL = int(os.getenv("MEDIA_PREFETCH_INTERVAL", 3600))
+
+    # Cache of users authenticated by token (max number of entries & ttl
+    # in seconds), a user modified in another worker is seen after ttl
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 1024))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 30))
+
+    # Check tokens without db, with their claims and a revocation list
+    # synced every REVOCATION_SYNC_INTERVAL seconds (a user deactivated or
+    # modified in another worker keeps access until next sync)
+    STATELESS_AUTH = os.getenv("STATELESS_AUTH", "false").lower() == "true"
+    REVOCATION_SYNC_INTERVAL = int(os.getenv("REVOCATION_SYNC_INTERVAL", 10))
+    # Lifetime of tokens (seconds), users revoked before are not synced
+    TOKEN_LIFETIME = int(os.getenv("TOKEN_LIFETIME", 1800))
+
+    # Max number of tokens already verified kept in cache (until their "exp")
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+
+    # Method & cost of password hashes (werkzeug's "generate_password_hash",
+    # ex: "pbkdf2:sha256:260000"), older hashes are replaced at login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "sha256")
+    # Processes hashing passwords, and max hashes pending before answering 503
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+
+    # Max users created at once by /users/bulk, and users by INSERT
+    USER_BULK_MAX_ROWS = int(os.getenv("USER_BULK_MAX_ROWS", 10000))
+    USER_BULK_BATCH_SIZE = int(os.getenv("USER_BULK_BATCH_SIZE", 1000))
+
+    # Number of users by page of GET /users (default & max "limit")
+    USER_LIST_DEFAULT_LIMIT = int(os.getenv("USER_LIST_DEFAULT_LIMIT", 50))
+    USER_LIST_MAX_LIMIT = int(os.getenv("USER_LIST_MAX_LIMIT", 500))
+
+    # Seconds between two flushes of likes to "movie_like_counter"
+    # (0: counter updated with each like, in the same transaction)
+    LIKE_FLUSH_INTERVAL = float(os.getenv("LIKE_FLUSH_INTERVAL", 1))
+    # Number of movies with likes not flushed which triggers a flush at once
+    LIKE_BUFFER_MAX_MOVIES = int(os.getenv("LIKE_BUFFER_MAX_MOVIES", 1000))
+
+    # Most liked movies served by /movies/top (max & default "n"), and max
+    # age (seconds) of in-process ranking before being reconciled with db
+    LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", 100))
+    LEADERBOARD_DEFAULT_N = int(os.getenv("LEADERBOARD_DEFAULT_N", 10))
+    LEADERBOARD_TTL = int(os.getenv("LEADERBOARD_TTL", 30))
+
+    # Movies inserted/updated by statement of "flask ingest-movies"
+    MOVIE_INGESTION_BATCH_SIZE = int(os.getenv("MOVIE_INGESTION_BATCH_SIZE", 500))
+    # Bytes of csv sent at once to COPY by "flask load-movies"
+    MOVIE_LOAD_BUFFER_SIZE = int(os.getenv("MOVIE_LOAD_BUFFER_SIZE", 65536))
+
+    # Max age (seconds) of in-process catalog index before being rebuilt
+    CATALOG_INDEX_TTL = int(os.getenv("CATALOG_INDEX_TTL", 300))
+    # Seconds between two checks of catalog version in db, a catalog changed
+    # by "flask ingest-movies" or "flask load-movies" is seen by all workers
+    # (index, movie & autocomplete caches) after at most this delay
+    CATALOG_VERSION_CHECK_INTERVAL = int(
+        os.getenv("CATALOG_VERSION_CHECK_INTERVAL", 5)
+    )
+
 
 class DevelopmentConfig(Config):
     # Add different config for dev if necessary
@@ -1,13 +1,34 @@
-from werkzeug.security import check_password_hash
 import jwt
 import datetime
+from flask import current_app
 from models.user import User
+from models import db
 from exceptions.errors import CredentialError, DatabaseError
 from log.my_logger import get_logger
+from tools.password_hasher import password_hasher
 
 logger = get_logger()
 
 
+def rehash_password(user, password):
+    """Hash again a password with the method & cost configured
+    It's done at login, the only time password is known.
+    Login doesn't fail if it fails, it's done at next login.
+
+    Args:
+        user (User): user logged in
+        password (string): correct password in plain text
+    """
+    try:
+        user.password = password_hasher.hash(password)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to rehash password of user({user.id}), details: {e}")
+        return
+    logger.info(f"Password of user({user.id}) has been rehashed.")
+
+
 def verify_login(auth, secret_key):
 
     if not auth or not auth.username or not auth.password:
@@ -30,14 +51,20 @@ def verify_login(auth, secret_key):
         logger.error(f"User {username} doesn't exist or is deactivated")
         raise CredentialError(message="User doesn't exist or is deactivated.")
 
-    if check_password_hash(user.password, auth.password):
+    if password_hasher.verify(user.password, auth.password):
+        if password_hasher.needs_rehash(user.password):
+            rehash_password(user, auth.password)
+
         # Generate token
         utc_time = datetime.datetime.utcnow()
-        timedelta = datetime.timedelta(minutes=30)
+        timedelta = datetime.timedelta(seconds=current_app.config["TOKEN_LIFETIME"])
         token = jwt.encode(
             {
                 "id": str(user.id),
                 "exp": utc_time + timedelta,
+                # Claims checked without db if STATELESS_AUTH is enabled
+                "is_admin": user.is_admin,
+                "ver": user.token_version,
             },
             secret_key,
             algorithm="HS256",
@@ -1,26 +1,258 @@
+import bisect
+from flask import current_app
 from exceptions.errors import InputError
 from models.movie import Movie
+from controllers.catalog import catalog_index
+from tools.cache import LRUCache
+from tools.common import verify_limit, is_valid_uuid, encode_cursor, decode_cursor
+from tools.ranking import top_k
+from log.my_logger import get_logger
 
+logger = get_logger()
 
-def search_movie_or_location_by_keyword(resource, keywords):
+# Results of searches, keyed by normalized resource & keywords
+autocomplete_cache = LRUCache()
+
+
+def is_database_backend():
+    """Check if autocomplete must search in database instead of catalog index
+
+    Returns:
+        boolean: True if AUTOCOMPLETE_BACKEND is "database"
+    """
+    return current_app.config["AUTOCOMPLETE_BACKEND"] == "database"
+
+
+def rank_movies(keywords, limit):
+    """Find the best movies for keywords, typos included
+
+    Args:
+        keywords (list): keywords input
+        limit (int): max number of movies
+
+    Returns:
+        list: dict with "id" & "title" of movies, the best at first
+    """
+    if is_database_backend():
+        movies_title_with_id = Movie().get_all_movies_similar_to(*keywords).items()
+    else:
+        movies_title_with_id = catalog_index.search_similar_titles(*keywords)
+
+    # Title is unique
+    id_by_title = {title: id for id, title in movies_title_with_id}
+    titles = top_k(id_by_title, keywords, limit)
+    return [{"id": id_by_title[title], "title": title} for title in titles]
+
+
+def rank_locations(keywords, limit):
+    """Find the best locations for keywords, typos included
+
+    Args:
+        keywords (list): keywords input
+        limit (int): max number of locations
+
+    Returns:
+        list: dict with "location" & related "movie_ids", the best at first
+    """
+    if is_database_backend():
+        locations_with_id = Movie().get_all_locations_similar_to(*keywords)
+    else:
+        locations_with_id = catalog_index.search_similar_locations(*keywords)
+
+    # Group id by location
+    ids_by_location = {}
+    for id, location in locations_with_id:
+        ids_by_location.setdefault(location, []).append(id)
+    locations = top_k(ids_by_location, keywords, limit)
+    return [
+        {"location": location, "movie_ids": ids_by_location[location]}
+        for location in locations
+    ]
+
+
+def page_movies(keywords, limit, cursor):
+    """Find one page of movies for keywords, sorted by title & id
+
+    Args:
+        keywords (list): keywords input
+        limit (int): max number of movies in page
+        cursor (string/None): "next_cursor" of previous page
+
+    Raises:
+        InputError: cursor is not valid
+
+    Returns:
+        dict: "movies" of page (list of dict with "id" & "title", in order)
+              and "next_cursor" (None if last page)
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if (
+            len(after) != 2
+            or not all(isinstance(value, str) for value in after)
+            or not is_valid_uuid(after[1])
+        ):
+            logger.error(f"Cursor({cursor}) is not a valid cursor of movies.")
+            raise InputError(message="The cursor is not valid.")
+        after = tuple(after)
+
+    # One more movie than limit is found to know if there is a next page
+    if is_database_backend():
+        movies_title_with_id = Movie().get_all_movies_contain(
+            *keywords, after=after, limit=limit + 1
+        )
+        titles_with_id = [(title, id) for id, title in movies_title_with_id.items()]
+    else:
+        movies_title_with_id = catalog_index.search_titles(*keywords)
+        titles_with_id = sorted(
+            (title, id) for id, title in movies_title_with_id.items()
+        )
+        if after is not None:
+            titles_with_id = [
+                title_with_id for title_with_id in titles_with_id if title_with_id > after
+            ]
+        titles_with_id = titles_with_id[: limit + 1]
+
+    page = titles_with_id[:limit]
+    next_cursor = None
+    if len(titles_with_id) > limit:
+        next_cursor = encode_cursor(list(page[-1]))
+    # A list, as keys of a dict are sorted by id in json
+    return {
+        "movies": [{"id": id, "title": title} for title, id in page],
+        "next_cursor": next_cursor,
+    }
+
+
+def page_locations(keywords, limit, cursor):
+    """Find one page of locations for keywords, sorted by location
+
+    Args:
+        keywords (list): keywords input
+        limit (int): max number of locations in page
+        cursor (string/None): "next_cursor" of previous page
+
+    Raises:
+        InputError: cursor is not valid
+
+    Returns:
+        dict: "locations" of page and "next_cursor" (None if last page)
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if len(after) != 1 or not isinstance(after[0], str):
+            logger.error(f"Cursor({cursor}) is not a valid cursor of locations.")
+            raise InputError(message="The cursor is not valid.")
+        after = after[0]
+
+    # One more location than limit is found to know if there is a next page
+    if is_database_backend():
+        locations_with_ids = Movie().get_locations_contain_with_movie_ids(
+            *keywords, after=after, limit=limit + 1
+        )
+    else:
+        locations_with_id = catalog_index.search_locations(*keywords)
+        ids_by_location = {}
+        for id, location in locations_with_id:
+            ids_by_location.setdefault(location, []).append(id)
+        locations = sorted(ids_by_location)
+        if after is not None:
+            locations = locations[bisect.bisect_right(locations, after):]
+        locations_with_ids = [
+            (location, ids_by_location[location]) for location in locations[: limit + 1]
+        ]
+
+    page = locations_with_ids[:limit]
+    next_cursor = None
+    if len(locations_with_ids) > limit:
+        next_cursor = encode_cursor([page[-1][0]])
+    return {"locations": dict(page), "next_cursor": next_cursor}
+
+
+def search_movie_or_location_by_keyword(
+    resource, keywords, ranked=False, limit=None, cursor=None
+):
     # Transfrom keywords
     # ex: from "boy_blue" to ["boy","blue"]
     keywords = keywords.split("_")
 
+    # Results are paginated if asked or by default (AUTOCOMPLETE_PAGE_SIZE)
+    if not ranked and limit is None and cursor is None:
+        limit = current_app.config["AUTOCOMPLETE_PAGE_SIZE"] or None
+    paginated = not ranked and (limit is not None or cursor is not None)
+
+    if ranked or paginated:
+        limit = verify_limit(
+            limit,
+            current_app.config["AUTOCOMPLETE_DEFAULT_LIMIT"],
+            current_app.config["AUTOCOMPLETE_MAX_LIMIT"],
+        )
+
+    # Search is case insensitive and keywords' order doesn't matter,
+    # ex: "Bay_bridge" and "bridge_bay" share the same result
+    keywords = sorted({keyword.casefold() for keyword in keywords})
+    cache_key = (resource.lower(), tuple(keywords), ranked, limit, cursor)
+    # Cached results are cleared if catalog changed
+    catalog_index.check_version()
+    result = autocomplete_cache.get(cache_key)
+    if result is None:
+        result = find_movies_or_locations(
+            resource, keywords, ranked, paginated, limit, cursor
+        )
+        autocomplete_cache.set(cache_key, result)
+    return result
+
+
+def find_movies_or_locations(resource, keywords, ranked, paginated, limit, cursor):
     if resource.upper() == "MOVIE":
+        if ranked:
+            return {"movies": rank_movies(keywords, limit)}
+        if paginated:
+            return page_movies(keywords, limit, cursor)
+
         # Get all corresponding movies' title with id
-        movies_title_with_id = Movie().get_all_movies_contain(*keywords)
+        if is_database_backend():
+            movies_title_with_id = Movie().get_all_movies_contain(*keywords)
+        else:
+            movies_title_with_id = catalog_index.search_titles(*keywords)
         return {"movies": movies_title_with_id}
 
     elif resource.upper() == "LOCATION":
-        # Get all corresponding locations with related movie's id
-        locations_with_id = Movie().get_all_locations_contain(*keywords)
+        if ranked:
+            return {"locations": rank_locations(keywords, limit)}
+        if paginated:
+            return page_locations(keywords, limit, cursor)
+
+        # Get all corresponding locations with related movie's id (sorted by id)
+        if is_database_backend():
+            locations_with_id = Movie().get_all_locations_contain(*keywords)
+        else:
+            locations_with_id = catalog_index.search_locations(*keywords)
         # Group id by location
         result = {}
-        for id, location in sorted(locations_with_id.items()):
+        for id, location in locations_with_id:
             result.setdefault(location, []).append(id)
         return {"locations": result}
 
     else:
         raise InputError(f"Search about '{resource}' not allowed,\
  you can only search 'movie' or 'location'")
+
+
+def clear_autocomplete_cache():
+    """Invalidate all cached results (ex: t_movie reloaded)"""
+    logger.info(f"Autocomplete cache cleared, stats: {autocomplete_cache.stats()}")
+    autocomplete_cache.clear()
+
+
+def init_app(app):
+    """Configure autocomplete cache
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    autocomplete_cache.maxsize = app.config["AUTOCOMPLETE_CACHE_SIZE"]
+    autocomplete_cache.ttl = app.config["AUTOCOMPLETE_CACHE_TTL"]
+    catalog_index.add_listener(clear_autocomplete_cache)
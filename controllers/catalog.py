@@ -0,0 +1,199 @@
+import threading
+import time
+from models import db
+from models.movie import Movie
+from models.catalog import CatalogVersion
+from exceptions.errors import DatabaseError
+from log.my_logger import get_logger
+from tools.search_index import SuffixArrayIndex, NGramIndex
+
+logger = get_logger()
+
+
+class CatalogIndex:
+    """In-process search index of the movie catalog
+
+    It's built from t_movie by the first search (never at startup, so not
+    by cli commands nor a master process before fork), kept in memory
+    by every worker and rebuilt when it's older than "ttl" seconds
+    or invalidated after the catalog changes. Catalog is changed by other
+    processes (ex: "flask ingest-movies"), so every worker checks its
+    version in db (t_catalog_version) at most every "version_check_interval"
+    seconds, see "check_version()".
+
+    Args:
+        ttl (int, optional): max age (seconds) of index. Defaults to 300.
+        version_check_interval (int, optional): seconds between two checks
+            of catalog version. Defaults to 5.
+    """
+
+    def __init__(self, ttl=300, version_check_interval=5):
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._title_index = None
+        self._title_grams_index = None
+        self._location_index = None
+        self._built_at = None
+        # Version of catalog seen by this worker, and when it was checked
+        self._version = None
+        self._version_checked_at = None
+        # Called when catalog is rebuilt or invalidated (ex: to clear caches)
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Register a function called every time the catalog changes
+
+        Args:
+            callback (function): function without argument
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+    def is_stale(self):
+        return (
+            self._built_at is None
+            or time.monotonic() - self._built_at > self.ttl
+        )
+
+    def build(self):
+        """(Re)build index from database
+
+        The new index replaces the old one only when it's complete,
+        so requests never see a partially built index.
+        """
+        # Read before movies, so a change during build is seen by next check
+        version = self._read_version()
+        movies_title_with_id = Movie().get_all_movies_title_with_id()
+        title_index = SuffixArrayIndex(movies_title_with_id.items())
+        # Only used to find titles with typos
+        title_grams_index = NGramIndex(movies_title_with_id.items())
+        locations_with_id = Movie().get_all_locations_with_movie_id()
+        location_index = NGramIndex(locations_with_id)
+
+        self._title_index = title_index
+        self._title_grams_index = title_grams_index
+        self._location_index = location_index
+        self._built_at = time.monotonic()
+        if version is not None:
+            self._version = version
+        self._notify()
+        logger.info(
+            f"Catalog index built with {len(title_index)} movies "
+            f"and {len(location_index)} locations."
+        )
+
+    def invalidate(self):
+        """Force to rebuild index on next search (ex: catalog reloaded)"""
+        self._built_at = None
+        self._notify()
+
+    def _read_version(self):
+        try:
+            return CatalogVersion().get_version()
+        except DatabaseError:
+            # Failed query must not break next queries of request
+            db.session.rollback()
+            return None
+
+    def check_version(self):
+        """Invalidate index (and caches listening to it) if catalog version
+        in db changed, it's read at most every "version_check_interval"
+        seconds (app context required)
+        """
+        now = time.monotonic()
+        checked_at = self._version_checked_at
+        if checked_at is not None and now - checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+
+        version = self._read_version()
+        if version is None:
+            logger.error("Failed to check catalog version, caches kept.")
+            return
+        if self._version is not None and version != self._version:
+            logger.info(f"Catalog changed (version {self._version} to {version}).")
+            self.invalidate()
+        self._version = version
+
+    def _ensure_fresh(self):
+        self.check_version()
+        if not self.is_stale():
+            return
+        with self._lock:
+            # Another thread may have rebuilt it while waiting for lock
+            if not self.is_stale():
+                return
+            try:
+                self.build()
+            except DatabaseError:
+                if self._title_index is None:
+                    raise
+                # Keep serving the old index and retry after another ttl
+                logger.error("Failed to rebuild catalog index, old one kept.")
+                self._built_at = time.monotonic()
+
+    def search_titles(self, *keywords):
+        """Find movies if they contain keyword in title
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            dict: key is "id" (string) and value "title"
+        """
+        self._ensure_fresh()
+        return self._title_index.search(*keywords)
+
+    def search_locations(self, *keywords):
+        """Find locations if they contain keyword
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            list: sorted tuples of ("id" (string), "location")
+        """
+        self._ensure_fresh()
+        return self._location_index.search(*keywords)
+
+    def search_similar_titles(self, *keywords):
+        """Find movies whose title could contain keyword with typos
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            list: sorted tuples of ("id" (string), "title")
+        """
+        self._ensure_fresh()
+        return self._title_grams_index.search_similar(*keywords)
+
+    def search_similar_locations(self, *keywords):
+        """Find locations which could contain keyword with typos
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            list: sorted tuples of ("id" (string), "location")
+        """
+        self._ensure_fresh()
+        return self._location_index.search_similar(*keywords)
+
+
+catalog_index = CatalogIndex()
+
+
+def init_app(app):
+    """Configure catalog index, it's built by the first search
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    catalog_index.ttl = app.config["CATALOG_INDEX_TTL"]
+    catalog_index.version_check_interval = app.config["CATALOG_VERSION_CHECK_INTERVAL"]
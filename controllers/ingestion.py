@@ -0,0 +1,248 @@
+import click
+from models.movie import Movie
+from models.user import User
+from models import db
+from models.catalog import CatalogVersion
+from exceptions.errors import DatabaseError
+from fixtures.db_sql.data_preprocessing import (
+    MOVIE_COLUMNS,
+    OUTPUT_COLUMNS,
+    compute_content_hash,
+    group_movies_by_chunks,
+    iter_movie_rows,
+)
+from tools.csv_stream import CSVRowStream
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+# Columns of t_movie written by "flask load-movies"
+LOAD_COLUMNS = OUTPUT_COLUMNS + ["content_hash"]
+
+
+def to_movie_columns(info, location_funfact, content_hash):
+    """Get columns of t_movie for a grouped movie
+
+    Args:
+        info (tuple): values of MOVIE_COLUMNS of movie (text)
+        location_funfact (dict): fun fact by location of movie
+        content_hash (string): hash of movie (see compute_content_hash)
+
+    Returns:
+        dict: value by column
+    """
+    # Empty text is NULL, as when "movies.csv" is imported by COPY
+    columns = {column: value or None for column, value in zip(MOVIE_COLUMNS, info)}
+    if columns["release_year"] is not None:
+        columns["release_year"] = int(columns["release_year"])
+    columns["location_funfact"] = location_funfact
+    columns["content_hash"] = content_hash
+    return columns
+
+
+def diff_catalog(movies, content_hashes):
+    """Find movies changed in raw data since last ingestion
+
+    Args:
+        movies (dict): grouped movies of raw data (see group_movies)
+        content_hashes (dict): content hash & if it's removed, by title
+            of movies in db (see Movie.get_all_content_hashes)
+
+    Returns:
+        tuple: columns of new movies (list), columns of changed or
+               restored movies (list) & titles of removed movies (list)
+    """
+    new_movies = []
+    changed_movies = []
+    for title, (info, location_funfact) in movies.items():
+        content_hash = compute_content_hash(info, location_funfact)
+        current = content_hashes.get(title)
+        if current is None:
+            new_movies.append(to_movie_columns(info, location_funfact, content_hash))
+        elif current != (content_hash, False):
+            changed_movies.append(
+                to_movie_columns(info, location_funfact, content_hash)
+            )
+
+    removed_titles = [
+        title
+        for title, (_, is_removed) in content_hashes.items()
+        if not is_removed and title not in movies
+    ]
+    return new_movies, changed_movies, removed_titles
+
+
+def ingest_movies(filepath, batch_size=500):
+    """Update t_movie with raw data, only movies changed are written
+
+    Raw data is grouped by movie (by chunks) and each movie is hashed.
+    Movies whose hash is new or different are upserted by batches (with
+    their locations), movies not in raw data anymore are tombstoned
+    ("removed_at").
+    Ids & like counters are kept. All is done in one transaction, with
+    catalog version incremented if a movie changed: workers see it within
+    CATALOG_VERSION_CHECK_INTERVAL seconds and clear their index & caches.
+
+    Args:
+        filepath (string): file path for raw data
+        batch_size (int, optional): movies by statement. Defaults to 500.
+
+    Raises:
+        DatabaseError: Errors when update movies in db
+
+    Returns:
+        dict: number of movies "inserted", "updated", "removed" & "unchanged"
+    """
+    movies = group_movies_by_chunks(filepath)
+    new_movies, changed_movies, removed_titles = diff_catalog(
+        movies, Movie().get_all_content_hashes()
+    )
+
+    upserted_movies = new_movies + changed_movies
+    try:
+        for start in range(0, len(upserted_movies), batch_size):
+            ids = Movie().upsert_movies(upserted_movies[start : start + batch_size])
+            Movie().sync_locations(ids)
+        for start in range(0, len(removed_titles), batch_size):
+            Movie().remove_movies(removed_titles[start : start + batch_size])
+        if upserted_movies or removed_titles:
+            CatalogVersion().increment_version()
+        db.session.commit()
+    except DatabaseError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.critical(f"There are errors when ingest movies, details: {e}")
+        raise DatabaseError(message="There are errors when ingest movies in database.")
+
+    summary = {
+        "inserted": len(new_movies),
+        "updated": len(changed_movies),
+        "removed": len(removed_titles),
+        "unchanged": len(movies) - len(upserted_movies),
+    }
+    logger.info(f"Movies of {filepath} ingested: {summary}.")
+    return summary
+
+
+def iter_loaded_rows(movies):
+    """Get rows of t_movie (LOAD_COLUMNS) from grouped movies
+
+    Args:
+        movies (dict): grouped movies of raw data (see group_movies)
+
+    Yields:
+        tuple: values of LOAD_COLUMNS of a movie
+    """
+    for row, (info, location_funfact) in zip(
+        iter_movie_rows(movies), movies.values()
+    ):
+        yield row + (compute_content_hash(info, location_funfact),)
+
+
+def load_movies(filepath, replace=False, buffer_size=65536, on_progress=None):
+    """Load raw data into t_movie with COPY ... FROM STDIN
+
+    Prepared movies are streamed to postgres in csv through a buffer
+    of "buffer_size" bytes, without writing "movies.csv", then their
+    locations are built (t_location & t_movie_location). All is done
+    in one transaction with catalog version incremented (see
+    "ingest_movies()"): if a movie fails, nothing is loaded.
+    Movies get their content hash, so next "ingest_movies()" only
+    writes movies changed.
+
+    Args:
+        filepath (string): file path for raw data
+        replace (bool, optional): delete all movies before, their ids &
+            likes are lost (liked movies of users are emptied, likes still
+            buffered by workers are dropped by their next flush as their
+            movie doesn't exist anymore). Defaults to False.
+        buffer_size (int, optional): bytes sent at once. Defaults to 65536.
+        on_progress (function, optional): function taking the number of
+            movies sent, called regularly. Defaults to None.
+
+    Raises:
+        DatabaseError: Errors when load movies in db (ex: movie exists)
+
+    Returns:
+        int: number of movies loaded
+    """
+    movies = group_movies_by_chunks(filepath)
+    stream = CSVRowStream(
+        iter_loaded_rows(movies),
+        buffer_size,
+        on_progress,
+        progress_every=max(1, len(movies) // 10),
+    )
+    try:
+        if replace:
+            # No foreign key on liked movies of users
+            User().remove_all_liked_movies()
+            Movie().remove_all_movies()
+        loaded = Movie().copy_movies(stream, LOAD_COLUMNS)
+        Movie().sync_locations()
+        CatalogVersion().increment_version()
+        db.session.commit()
+    except DatabaseError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.critical(f"There are errors when load movies, details: {e}")
+        raise DatabaseError(message="There are errors when load movies in database.")
+
+    logger.info(f"{loaded} movies of {filepath} loaded.")
+    return loaded
+
+
+def init_app(app):
+    """Register commands "flask ingest-movies" & "flask load-movies"
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+
+    @app.cli.command("ingest-movies")
+    @click.argument(
+        "filepath",
+        default="fixtures/db_sql/Film_Locations_in_San_Francisco.csv",
+        type=click.Path(exists=True, dir_okay=False),
+    )
+    @click.option(
+        "--batch-size",
+        default=app.config["MOVIE_INGESTION_BATCH_SIZE"],
+        show_default=True,
+        help="Movies inserted/updated by statement.",
+    )
+    def ingest_movies_command(filepath, batch_size):
+        """Update t_movie with raw data (only movies changed)"""
+        summary = ingest_movies(filepath, batch_size)
+        click.echo(", ".join(f"{count} {name}" for name, count in summary.items()))
+
+    @app.cli.command("load-movies")
+    @click.argument(
+        "filepath",
+        default="fixtures/db_sql/Film_Locations_in_San_Francisco.csv",
+        type=click.Path(exists=True, dir_okay=False),
+    )
+    @click.option(
+        "--replace",
+        is_flag=True,
+        help="Delete all movies before (their ids & all likes are lost).",
+    )
+    @click.option(
+        "--buffer-size",
+        default=app.config["MOVIE_LOAD_BUFFER_SIZE"],
+        show_default=True,
+        help="Bytes of csv sent to postgres at once.",
+    )
+    def load_movies_command(filepath, replace, buffer_size):
+        """Load raw data into t_movie with COPY (bulk load, ex: in CI)"""
+        loaded = load_movies(
+            filepath,
+            replace,
+            buffer_size,
+            on_progress=lambda sent: click.echo(f"{sent} movies sent..."),
+        )
+        click.echo(f"{loaded} movies loaded")
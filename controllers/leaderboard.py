@@ -0,0 +1,151 @@
+import bisect
+import threading
+import time
+from flask import current_app
+from models.movie import Movie
+from controllers.like import like_counter_buffer
+from exceptions.errors import DatabaseError
+from tools.common import verify_limit
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+
+class Leaderboard:
+    """In-process ranking of the most liked movies
+
+    It's loaded lazily from t_movie by the index on "movie_like_counter"
+    (first request, never at startup), updated at once with counters flushed
+    by this worker, and reconciled with t_movie when it's older than
+    "ttl" seconds (counters flushed by other workers, movies leaving the
+    top). Twice as many movies as served are kept, so a movie of the top
+    which loses likes is not replaced by a wrong one before reconciliation.
+
+    Args:
+        size (int, optional): max number of movies served. Defaults to 100.
+        ttl (int, optional): max age (seconds) of ranking. Defaults to 30.
+    """
+
+    def __init__(self, size=100, ttl=30):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # movie's id -> dict with "id", "title" & "movie_like_counter"
+        self._movies = {}
+        # Sorted keys (-counter, id) of movies, the most liked at first
+        self._ranking = []
+        # Movies of ranking in order, rebuilt after a change
+        self._top_movies = []
+        self._loaded_at = None
+
+    @property
+    def capacity(self):
+        return 2 * self.size
+
+    def is_stale(self):
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl
+        )
+
+    def load(self):
+        """(Re)load ranking from database"""
+        movies = Movie().get_top_liked_movies(self.capacity)
+        with self._lock:
+            self._movies = {movie["id"]: movie for movie in movies}
+            self._ranking = [
+                (-movie["movie_like_counter"], movie["id"]) for movie in movies
+            ]
+            self._top_movies = movies
+            self._loaded_at = time.monotonic()
+        logger.info(f"Leaderboard loaded with {len(movies)} movies.")
+
+    def update(self, movie):
+        """Move a movie in ranking after its counter changed
+
+        Args:
+            movie (dict): "id", "title" & new "movie_like_counter" of movie
+        """
+        movie_id = movie["id"]
+        key = (-movie["movie_like_counter"], movie_id)
+        with self._lock:
+            old_movie = self._movies.pop(movie_id, None)
+            if old_movie is not None:
+                old_key = (-old_movie["movie_like_counter"], movie_id)
+                del self._ranking[bisect.bisect_left(self._ranking, old_key)]
+
+            is_full = len(self._ranking) >= self.capacity
+            if movie["movie_like_counter"] > 0 and (
+                not is_full or key < self._ranking[-1]
+            ):
+                bisect.insort(self._ranking, key)
+                self._movies[movie_id] = movie
+                if len(self._ranking) > self.capacity:
+                    _, last_id = self._ranking.pop()
+                    del self._movies[last_id]
+            elif old_movie is None:
+                # Not in ranking before and after, nothing changed
+                return
+
+            self._top_movies = [self._movies[id] for _, id in self._ranking]
+
+    def _ensure_fresh(self):
+        if not self.is_stale():
+            return
+        with self._lock:
+            is_loaded = self._loaded_at is not None
+            # Other threads keep serving the old ranking while it's reloaded
+            self._loaded_at = time.monotonic()
+        try:
+            self.load()
+        except DatabaseError:
+            if not is_loaded:
+                self._loaded_at = None
+                raise
+            logger.error("Failed to reconcile leaderboard, old one kept.")
+
+    def top(self, n):
+        """Get the most liked movies
+
+        Args:
+            n (int): number of movies (at most "size")
+
+        Returns:
+            list: dict with "id", "title" & "movie_like_counter",
+                  the most liked at first
+        """
+        self._ensure_fresh()
+        return self._top_movies[: min(n, self.size)]
+
+
+leaderboard = Leaderboard()
+
+
+def find_top_movies(n=None):
+    """Find the most liked movies
+
+    Args:
+        n (string, optional): number of movies. Defaults to None.
+
+    Raises:
+        InputError: n is not valid
+
+    Returns:
+        dict: "movies" with "id", "title" & "movie_like_counter",
+              the most liked at first
+    """
+    n = verify_limit(
+        n, current_app.config["LEADERBOARD_DEFAULT_N"], leaderboard.size
+    )
+    return {"movies": leaderboard.top(n)}
+
+
+def init_app(app):
+    """Configure leaderboard, it's loaded by the first request
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    leaderboard.size = app.config["LEADERBOARD_SIZE"]
+    leaderboard.ttl = app.config["LEADERBOARD_TTL"]
+    like_counter_buffer.add_listener(leaderboard.update)
@@ -0,0 +1,276 @@
+import atexit
+import threading
+from flask import current_app
+from models.movie import Movie
+from models.user import User
+from models import db
+from controllers.movie import find_movie_by_id, discard_movie_like_counter
+from exceptions.errors import DatabaseError
+from tools.user_cache import invalidate_user
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+
+class LikeCounterBuffer:
+    """Likes not yet added to "movie_like_counter" (write-behind)
+
+    Likes of all requests are summed by movie in memory, then flushed
+    in one UPDATE for all movies. So a burst of likes on one movie only
+    updates its row once by flush, instead of locking it for each request.
+    Likes not flushed are lost if the worker is killed.
+
+    Args:
+        max_movies (int, optional): number of movies in buffer which
+            triggers a flush at once. Defaults to 1000.
+    """
+
+    def __init__(self, max_movies=1000):
+        self.max_movies = max_movies
+        # movie's id -> likes to add (negative if unliked)
+        self._deltas = {}
+        self._lock = threading.Lock()
+        # Set to flush without waiting for interval
+        self.flush_needed = threading.Event()
+        # Called with movie's "id", "title" & new counter after a flush
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._deltas)
+
+    def add_listener(self, callback):
+        """Register a function called when a counter is updated in db
+
+        Args:
+            callback (function): function taking a dict with movie's "id",
+                "title" & "movie_like_counter"
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def add(self, movie_id, delta):
+        """Add likes of a movie to buffer
+
+        Args:
+            movie_id (string): movie's id
+            delta (int): 1 for a like, -1 for an unlike
+        """
+        with self._lock:
+            self._deltas[movie_id] = self._deltas.get(movie_id, 0) + delta
+            if len(self._deltas) >= self.max_movies:
+                self.flush_needed.set()
+
+    def flush(self):
+        """Add all likes of buffer to counters in db (app context required)
+
+        If it fails, likes are put back in buffer for next flush.
+
+        Returns:
+            list: dict with "id", "title" & new "movie_like_counter"
+                  of movies updated
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        deltas = {id: delta for id, delta in deltas.items() if delta != 0}
+        if not deltas:
+            return []
+
+        try:
+            counters = Movie().add_to_like_counters(deltas)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to flush likes of {len(deltas)} movies, details: {e}")
+            with self._lock:
+                for id, delta in deltas.items():
+                    self._deltas[id] = self._deltas.get(id, 0) + delta
+            return []
+
+        for movie in counters:
+            self.notify(movie)
+        logger.info(f"Likes of {len(counters)} movies flushed.")
+        return counters
+
+    def notify(self, movie):
+        """Call listeners after a counter is updated in db
+
+        Args:
+            movie (dict): "id", "title" & new "movie_like_counter" of movie
+        """
+        for callback in self._listeners:
+            callback(movie)
+
+
+like_counter_buffer = LikeCounterBuffer()
+
+
+def is_write_behind():
+    """Check if counters are updated by flushes of buffer
+
+    Returns:
+        boolean: True if LIKE_FLUSH_INTERVAL isn't 0
+    """
+    return current_app.config["LIKE_FLUSH_INTERVAL"] > 0
+
+
+def change_like(user_id, movie_id, delta):
+    """Like or unlike a movie, counter included
+
+    Liked movies of user are updated in one atomic UPDATE. Counter is
+    added to buffer (write-behind), or updated in the same transaction
+    if LIKE_FLUSH_INTERVAL is 0.
+
+    Args:
+        user_id (string): user's id
+        movie_id (string): movie's id
+        delta (int): 1 for a like, -1 for an unlike
+
+    Raises:
+        DatabaseError: Errors when update user or movie in db
+
+    Returns:
+        boolean: True if changed, False if movie was liked (or not) already
+    """
+    write_behind = is_write_behind()
+    counters = []
+    try:
+        if delta > 0:
+            changed = User().add_liked_movie(user_id, movie_id)
+        else:
+            changed = User().remove_liked_movie(user_id, movie_id)
+        if changed and not write_behind:
+            counters = Movie().add_to_like_counters({movie_id: delta})
+        db.session.commit()
+    except DatabaseError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.critical(f"Failed to update likes of user({user_id}), details: {e}")
+        raise DatabaseError(message="There are errors when update likes in database.")
+
+    if changed:
+        if write_behind:
+            like_counter_buffer.add(movie_id, delta)
+        for movie in counters:
+            like_counter_buffer.notify(movie)
+        invalidate_user(user_id)
+    return changed
+
+
+def like_movie(current_user, movie_id):
+    """Add a movie to liked movies of current user
+
+    Args:
+        current_user (User): the user identified by decorator 'token_required'
+        movie_id (string): movie's id
+
+    Raises:
+        InputError: Not valid UUID input
+        NotFoundError: No corresponding movie in db
+        DatabaseError: Errors when update user in db
+
+    Returns:
+        dict: message about action
+    """
+    # Movie must exist (from movie cache if possible)
+    find_movie_by_id(movie_id, ("title",))
+    user_id = str(current_user.id)
+
+    if not change_like(user_id, movie_id, 1):
+        logger.info(f"Movie({movie_id}) is liked by user({user_id}) already.")
+        return {"message": "This movie is liked already."}
+
+    logger.info(f"Movie({movie_id}) has been liked by user({user_id}).")
+    return {"message": "The movie has been liked successfully."}
+
+
+def unlike_movie(current_user, movie_id):
+    """Remove a movie from liked movies of current user
+
+    Args:
+        current_user (User): the user identified by decorator 'token_required'
+        movie_id (string): movie's id
+
+    Raises:
+        InputError: Not valid UUID input
+        NotFoundError: No corresponding movie in db
+        DatabaseError: Errors when update user in db
+
+    Returns:
+        dict: message about action
+    """
+    find_movie_by_id(movie_id, ("title",))
+    user_id = str(current_user.id)
+
+    if not change_like(user_id, movie_id, -1):
+        logger.info(f"Movie({movie_id}) is not liked by user({user_id}).")
+        return {"message": "This movie is not liked."}
+
+    logger.info(f"Movie({movie_id}) has been unliked by user({user_id}).")
+    return {"message": "The movie has been unliked successfully."}
+
+
+def run_like_flusher(app, interval, stop_event):
+    """Flush buffer of likes every "interval" seconds, or when it's full
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+        interval (int): seconds between two flushes
+        stop_event (threading.Event): set it to stop flusher
+    """
+    while not stop_event.is_set():
+        like_counter_buffer.flush_needed.wait(interval)
+        like_counter_buffer.flush_needed.clear()
+        with app.app_context():
+            like_counter_buffer.flush()
+
+
+def flush_at_exit(app):
+    """Flush likes left in buffer when worker stops
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    with app.app_context():
+        like_counter_buffer.flush()
+
+
+def start_like_flusher(app, interval):
+    """Start flusher of likes in a daemon thread, and flush likes left
+    in buffer when worker stops
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+        interval (int): seconds between two flushes
+    """
+    stop_event = threading.Event()
+    threading.Thread(
+        target=run_like_flusher,
+        args=(app, interval, stop_event),
+        name="like-flusher",
+        daemon=True,
+    ).start()
+    app.extensions["like_flusher"] = stop_event
+    atexit.register(flush_at_exit, app)
+
+
+def init_app(app):
+    """Register listeners of counters, and configure buffer of likes
+    if counters are updated by write-behind (its flusher is started
+    by the first request)
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    # Cached movie info must be found again with its new counter
+    like_counter_buffer.add_listener(discard_movie_like_counter)
+
+    interval = app.config["LIKE_FLUSH_INTERVAL"]
+    if interval <= 0:
+        return
+
+    like_counter_buffer.max_movies = app.config["LIKE_BUFFER_MAX_MOVIES"]
+    # Only an app serving requests flushes, never cli commands
+    # (ex: "flask load-movies") nor a master process before fork
+    app.before_first_request(lambda: start_like_flusher(app, interval))
@@ -0,0 +1,222 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from models.movie import Movie
+from log.my_logger import get_logger
+from tools.disk_cache import DiskCache
+from tools.media_provider import PlaceholderMediaProvider, create_media_provider
+
+logger = get_logger()
+
+
+class MediaService:
+    """Posters & trailers of movies
+
+    Requests only read the disk cache and never wait for the provider:
+    unknown movies get default media and are fetched in background by
+    a pool of threads. A prefetcher warms the cache for the whole catalog.
+
+    Args:
+        provider (MediaProvider, optional): where poster & trailer come from.
+            Defaults to PlaceholderMediaProvider.
+        cache (DiskCache, optional): persistent cache. Defaults to None.
+        ttl (int, optional): ttl (seconds) of media found. Defaults to 7 days.
+        negative_ttl (int, optional): ttl (seconds) of unknown movies.
+            Defaults to 1 day.
+        workers (int, optional): max concurrent fetches. Defaults to 8.
+    """
+
+    def __init__(
+        self,
+        provider=None,
+        cache=None,
+        ttl=7 * 24 * 3600,
+        negative_ttl=24 * 3600,
+        workers=8,
+    ):
+        self.provider = provider or PlaceholderMediaProvider()
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="media"
+        )
+        # Movies being fetched, to never fetch the same one twice at once
+        self._pending = set()
+        self._lock = threading.Lock()
+        # Called with movie's id when its media are updated
+        self._listeners = []
+
+    def configure(self, provider, cache, ttl, negative_ttl, workers):
+        """Replace provider, cache and pool of threads (see __init__)"""
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        old_executor = self._executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="media"
+        )
+        old_executor.shutdown(wait=False)
+
+    def add_listener(self, callback):
+        """Register a function called when media of a movie are updated
+
+        Args:
+            callback (function): function taking movie's id
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def get_media(self, movie):
+        """Get poster & trailer of a movie without waiting for provider
+
+        Args:
+            movie (dict): "id", "title" & "release_year" of movie
+
+        Returns:
+            dict: "poster" & "trailer" urls
+        """
+        media = self.get_many_media([movie])
+        return media[str(movie["id"])]
+
+    def get_many_media(self, movies):
+        """Get poster & trailer of several movies without waiting for provider
+
+        Args:
+            movies (list): dict with "id", "title" & "release_year" of movies
+
+        Returns:
+            dict: "poster" & "trailer" urls by movie's id (string)
+        """
+        if self.cache is None:
+            return {str(movie["id"]): self.provider.default_media() for movie in movies}
+
+        cached_media = self.cache.get_many([str(movie["id"]) for movie in movies])
+        media = {}
+        for movie in movies:
+            movie_id = str(movie["id"])
+            if movie_id in cached_media:
+                # Unknown movie (negative entry) gets default media
+                media[movie_id] = cached_media[movie_id][0] or self.provider.default_media()
+            else:
+                media[movie_id] = self.provider.default_media()
+                self.submit(movie)
+        return media
+
+    def submit(self, movie):
+        """Fetch media of a movie in background
+
+        Args:
+            movie (dict): "id", "title" & "release_year" of movie
+
+        Returns:
+            Future/None: future of fetch, None if it's already being fetched
+        """
+        movie_id = str(movie["id"])
+        with self._lock:
+            if movie_id in self._pending:
+                return None
+            self._pending.add(movie_id)
+        return self._executor.submit(self._fetch, movie)
+
+    def _fetch(self, movie):
+        movie_id = str(movie["id"])
+        try:
+            media = self.provider.fetch(movie)
+        except Exception as e:
+            # Not cached, it will be fetched again later
+            logger.error(f"Failed to fetch media of movie({movie_id}), details: {e}")
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(movie_id)
+
+        ttl = self.ttl if media is not None else self.negative_ttl
+        self.cache.set(movie_id, media, ttl)
+        for callback in self._listeners:
+            callback(movie_id)
+
+    def prefetch(self, movies):
+        """Fetch concurrently media of all movies not in cache, and wait
+
+        Args:
+            movies (list): dict with "id", "title" & "release_year" of movies
+        """
+        cached_media = self.cache.get_many([str(movie["id"]) for movie in movies])
+        futures = [
+            self.submit(movie)
+            for movie in movies
+            if str(movie["id"]) not in cached_media
+        ]
+        futures = [future for future in futures if future is not None]
+        wait(futures)
+        logger.info(f"Media prefetched for {len(futures)} movies.")
+
+
+media_service = MediaService()
+
+
+def run_prefetcher(app, interval, stop_event):
+    """Warm media cache for the whole catalog every "interval" seconds
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+        interval (int): seconds between two prefetches
+        stop_event (threading.Event): set it to stop prefetcher
+    """
+    while not stop_event.is_set():
+        try:
+            with app.app_context():
+                movies = Movie().get_all_movies_title_and_year()
+            media_service.prefetch(movies)
+        except Exception as e:
+            logger.error(f"Failed to prefetch media, details: {e}")
+        stop_event.wait(interval)
+
+
+def start_prefetcher(app, interval):
+    """Start prefetcher of media in a daemon thread
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+        interval (int): seconds between two prefetches
+    """
+    stop_event = threading.Event()
+    threading.Thread(
+        target=run_prefetcher,
+        args=(app, interval, stop_event),
+        name="media-prefetcher",
+        daemon=True,
+    ).start()
+    app.extensions["media_prefetcher"] = stop_event
+
+
+def init_app(app):
+    """Configure media service, its prefetcher is started by the first request
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    provider = create_media_provider(
+        app.config["MEDIA_PROVIDER"],
+        app.config["MEDIA_API_URL"],
+        app.config["MEDIA_API_TIMEOUT"],
+    )
+    if isinstance(provider, PlaceholderMediaProvider):
+        # Nothing to fetch, no cache & prefetcher needed
+        media_service.provider = provider
+        return
+
+    media_service.configure(
+        provider,
+        DiskCache(app.config["MEDIA_CACHE_PATH"]),
+        app.config["MEDIA_CACHE_TTL"],
+        app.config["MEDIA_NEGATIVE_CACHE_TTL"],
+        app.config["MEDIA_WORKERS"],
+    )
+
+    interval = app.config["MEDIA_PREFETCH_INTERVAL"]
+    if interval > 0:
+        # Only an app serving requests prefetches, never cli commands
+        # (ex: "flask load-movies") nor a master process before fork
+        app.before_first_request(lambda: start_prefetcher(app, interval))
@@ -1,12 +1,263 @@
-from models.movie import Movie
+import hashlib
+import orjson
+from flask import current_app
+from models.movie import Movie, INTERNAL_COLUMNS
+from controllers.catalog import catalog_index
+from controllers.media import media_service
+from exceptions.errors import InputError
+from tools.cache import LRUCache
+from tools.common import is_valid_uuid
+from log.my_logger import get_logger
 
+logger = get_logger()
 
-def find_movie_by_id(movie_id):
-    # Get basic info from db
-    movie_info = Movie().get_movie_by_id(movie_id)
+# Fields which are not columns of t_movie
+MEDIA_FIELDS = ("poster", "trailer")
+# Columns needed by media provider to find poster & trailer of a movie
+MEDIA_COLUMNS = ("title", "release_year")
 
-    # TODO get post & trailer from another api or scraping
-    movie_info["poster"] = "https://movie_url"
-    movie_info["trailer"] = "https://trailer_url"
+# Movie info with its etag, keyed by movie id & fields wanted
+# (grouped by movie id, to discard all fields of a movie at once)
+movie_cache = LRUCache(group_of=lambda key: key[0])
 
-    return movie_info
+
+def compute_etag(movie_info):
+    """Create a strong etag from the content of movie info
+
+    Args:
+        movie_info (dict): info about a movie
+
+    Returns:
+        string: sha256 of movie info in json
+    """
+    content = orjson.dumps(
+        movie_info,
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return hashlib.sha256(content).hexdigest()
+
+
+def verify_fields(fields):
+    """Check the "fields" param of a request (field projection)
+
+    Args:
+        fields (string/None): fields wanted seperated by "," (ex: "title,director"),
+                              None if all fields are wanted
+
+    Raises:
+        InputError: no field or unknown field
+
+    Returns:
+        tuple/None: sorted fields, None for all fields
+    """
+    if fields is None:
+        return None
+
+    fields = tuple(sorted({field.strip() for field in fields.split(",")} - {""}))
+    if not fields:
+        logger.error("Param fields is empty.")
+        raise InputError(message="You must provide at least one field.")
+    unknown_fields = [
+        field
+        for field in fields
+        if (field not in Movie.__mapper__.c.keys() or field in INTERNAL_COLUMNS)
+        and field not in MEDIA_FIELDS
+    ]
+    if unknown_fields:
+        logger.error(f"Unknown fields {unknown_fields}.")
+        raise InputError(message=f"Unknown fields: {', '.join(unknown_fields)}.")
+    return fields
+
+
+def get_columns(fields):
+    """Get columns to load from db for fields
+
+    Args:
+        fields (tuple/None): fields wanted, None for all fields
+
+    Returns:
+        tuple/None: columns of t_movie, None for all columns
+    """
+    if fields is None:
+        return None
+    columns = tuple(field for field in fields if field not in MEDIA_FIELDS)
+    if len(columns) < len(fields):
+        # Not sent unless wanted (see projection in cache_movie())
+        columns += tuple(column for column in MEDIA_COLUMNS if column not in columns)
+    return columns
+
+
+def find_movie_by_id(movie_id, fields=None):
+    """Find movie by id, from cache if possible (read-through)
+
+    Args:
+        movie_id (string): movie id
+        fields (tuple, optional): fields wanted (see verify_fields()),
+            "id" is always sent. Defaults to None (all fields).
+
+    Returns:
+        tuple: movie info (dict) and its etag (string)
+    """
+    # Cached movies are cleared if catalog changed (ex: movie removed)
+    catalog_index.check_version()
+    cached_movie = movie_cache.get((movie_id, fields))
+    if cached_movie is not None:
+        return cached_movie
+
+    # Projection of all info if they are in cache
+    if fields is not None:
+        cached_movie = project_cached_movie(movie_id, fields)
+        if cached_movie is not None:
+            return cached_movie
+
+    # Get basic info from db (only columns wanted)
+    movie_info = Movie().get_movie_by_id(movie_id, columns=get_columns(fields))
+
+    return cache_movie(movie_id, movie_info, fields)
+
+
+def project_cached_movie(movie_id, fields):
+    """Get some fields of a movie from its cached info with all fields
+
+    Args:
+        movie_id (string): movie id
+        fields (tuple): fields wanted
+
+    Returns:
+        tuple/None: movie info (dict) and its etag (string),
+                    None if all info of movie are not in cache
+    """
+    cached_movie = movie_cache.get((movie_id, None))
+    if cached_movie is None:
+        return None
+    movie_info = dict(cached_movie[0])
+    media = {field: movie_info[field] for field in MEDIA_FIELDS}
+    return cache_movie(movie_id, movie_info, fields, media)
+
+
+def cache_movie(movie_id, movie_info, fields=None, media=None):
+    """Complete movie info and keep it in cache with its etag
+
+    Args:
+        movie_id (string): movie id
+        movie_info (dict): info in db about the movie
+        fields (tuple, optional): fields wanted. Defaults to None (all fields).
+        media (dict, optional): poster & trailer of movie, got from
+            media service if None. Defaults to None.
+
+    Returns:
+        tuple: movie info (dict) and its etag (string)
+    """
+    if fields is None or any(field in MEDIA_FIELDS for field in fields):
+        # Poster & trailer from cache of media service (never waits for provider)
+        if media is None:
+            media = media_service.get_media(movie_info)
+        movie_info.update(media)
+
+    if fields is not None:
+        # Columns loaded only for media are removed too
+        movie_info = {
+            field: movie_info[field] for field in ("id",) + fields if field in movie_info
+        }
+
+    cached_movie = (movie_info, compute_etag(movie_info))
+    movie_cache.set((movie_id, fields), cached_movie)
+    return cached_movie
+
+
+def find_movies_by_ids(ids, fields=None):
+    """Find several movies by ids
+
+    Cached movies are taken from cache, others are found in one query.
+
+    Args:
+        ids (string): movies' id seperated by "," (ex: "id1,id2")
+        fields (tuple, optional): fields wanted (see verify_fields()),
+            "id" is always sent. Defaults to None (all fields).
+
+    Raises:
+        InputError: no id, too many ids or not valid UUID
+
+    Returns:
+        dict: key is each id and value its info, or an error if not found
+    """
+    if not ids:
+        logger.error("No movie's id to find.")
+        raise InputError(message="You must provide movies' id (ids=id1,id2).")
+
+    # Remove duplicates but keep order
+    ids = list(dict.fromkeys(id.strip() for id in ids.split(",")))
+    max_ids = current_app.config["MOVIE_BATCH_MAX_IDS"]
+    if len(ids) > max_ids:
+        logger.error(f"{len(ids)} movies asked, max is {max_ids}.")
+        raise InputError(message=f"You can find at most {max_ids} movies at once.")
+    invalid_ids = [id for id in ids if not is_valid_uuid(id)]
+    if invalid_ids:
+        logger.error(f"{invalid_ids} are not valid UUID")
+        raise InputError(f"{', '.join(invalid_ids)} are not valid UUID")
+
+    catalog_index.check_version()
+    movies = {}
+    for id in ids:
+        cached_movie = movie_cache.get((id, fields))
+        if cached_movie is None and fields is not None:
+            cached_movie = project_cached_movie(id, fields)
+        if cached_movie is not None:
+            movies[id] = cached_movie[0]
+
+    # Get basic info from db of all movies not in cache at once
+    missing_ids = [id for id in ids if id not in movies]
+    if missing_ids:
+        movies_info = Movie().get_movies_by_ids(*missing_ids, columns=get_columns(fields))
+        media = {}
+        if fields is None or any(field in MEDIA_FIELDS for field in fields):
+            media = media_service.get_many_media(list(movies_info.values()))
+        for id in missing_ids:
+            if id in movies_info:
+                movies[id] = cache_movie(id, movies_info[id], fields, media.get(id))[0]
+            else:
+                logger.error(f"Corresponding movie not found for '{id}'")
+                movies[id] = {
+                    "message": f"Corresponding movie not found for '{id}'.",
+                    "error_code": "NOT_FOUND_ERROR",
+                }
+
+    return {"movies": movies}
+
+
+def discard_movie(movie_id):
+    """Remove all cached info (all fields projections) of a movie
+
+    Args:
+        movie_id (string): movie id
+    """
+    movie_cache.delete_group(movie_id)
+
+
+def discard_movie_like_counter(movie):
+    """Remove cached info of a movie whose like counter changed
+
+    Args:
+        movie (dict): "id", "title" & new "movie_like_counter" of movie
+    """
+    discard_movie(movie["id"])
+
+
+def clear_movie_cache():
+    """Invalidate all cached movies (ex: t_movie reloaded)"""
+    logger.info(f"Movie cache cleared, stats: {movie_cache.stats()}")
+    movie_cache.clear()
+
+
+def init_app(app):
+    """Configure movie cache
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    movie_cache.maxsize = app.config["MOVIE_CACHE_SIZE"]
+    movie_cache.ttl = app.config["MOVIE_CACHE_TTL"]
+    catalog_index.add_listener(clear_movie_cache)
+    # Movie info must be completed again with its new poster & trailer
+    media_service.add_listener(discard_movie)
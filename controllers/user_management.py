@@ -1,62 +1,91 @@
-from werkzeug.security import generate_password_hash
+from flask import current_app
 from sqlalchemy.exc import IntegrityError
 import re
+import uuid
 from models.user import User
 from models import db
 from exceptions.errors import PermissionError, InputError, NotFoundError, DatabaseError
 from log.my_logger import get_logger
-from tools.user import is_uuid, verify_type_integrity_of_data, verify_data_form
+from tools.user import is_uuid
+from tools.schema import Field, Schema
+from tools.common import verify_limit, verify_boolean, encode_cursor, decode_cursor
+from tools.user_cache import invalidate_user
+from tools.revocation import revocation_list
+from tools.password_hasher import password_hasher
 
 logger = get_logger()
 
+# Mail validation
+MAIL_REGEX = re.compile(
+    r"^[A-Za-z0-9]+([_\-\.][A-Za-z0-9]+)*@([A-Za-z0-9\-]+\.)+[A-Za-z]{2,6}$"
+)
+# Password needs a lower case, an upper case & a digit (6 to 20 characters)
+PASSWORD_REGEX = re.compile(r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)[\s\S]{6,20}$")
+
+MAIL_FIELD = Field(
+    str,
+    regex=MAIL_REGEX,
+    normalize=str.lower,
+    message="Only a valid email address is accepted.",
+)
+PASSWORD_FIELD = Field(
+    str, regex=PASSWORD_REGEX, message="This password is unauthorized."
+)
+# Info of a user which can be modified by admin (PUT)
+USER_INFO_SCHEMA = Schema(
+    {
+        "mail": MAIL_FIELD,
+        "first_name": Field(str, normalize=str.capitalize),
+        "last_name": Field(str, normalize=str.capitalize),
+        "is_activated": Field(bool),
+        "is_admin": Field(bool),
+    }
+)
+# Only info to change (PATCH)
+USER_CHANGES_SCHEMA = USER_INFO_SCHEMA.partial()
+# Info of a new user
+NEW_USER_SCHEMA = Schema({**USER_INFO_SCHEMA.fields, "password": PASSWORD_FIELD})
+PASSWORD_SCHEMA = Schema({"password": PASSWORD_FIELD})
+
+
+def revoke_tokens(user):
+    """Revoke tokens of a modified user at once in this worker
+    Other workers revoke them at next sync of their revocation list.
+
+    Args:
+        user (Row): "id", new "token_version" & "is_activated" of user
+            modified (committed)
+    """
+    user_id = str(user.id)
+    invalidate_user(user_id)
+    revocation_list.revoke(user_id, user.token_version, user.is_activated)
+
+
+def prepare_new_user(data):
+    """Check info of a new user and prepare its columns
+
+    Args:
+        data (dict): user's info sent in json
+
+    Raises:
+        InputError: info missing or not valid
+
+    Returns:
+        dict: columns of new user, with "password" not hashed yet
+    """
+    # Data form, type, integrity & normalization check
+    return NEW_USER_SCHEMA.validate(data)
+
 
 def create_new_user(data):
-    # Data form check (dict send in json)
-    verify_data_form(data)
-
-    # Data type & integrity check
-    template = {
-        "first_name": str,
-        "password": str,
-        "is_activated": bool,
-        "is_admin": bool,
-        "last_name": str,
-        "mail": str,
-    }
-    verify_type_integrity_of_data(template, data)
-
-    # Prepare data
-    mail = data["mail"].lower()
-    # Mail validation
-    left = "^[A-Za-z0-9]+([_\-\.][A-Za-z0-9]+)*"
-    right = "([A-Za-z0-9\-]+\.)+[A-Za-z]{2,6}$"
-    regex = rf"{left}@{right}"
-    if not re.search(regex, mail):
-        logger.error(f"{mail} is not a valid email address.")
-        raise InputError(message="Only a valid email address is accepted.")
-    first_name = data["first_name"].capitalize()
-    last_name = data["last_name"].capitalize()
-    is_admin = data["is_admin"]
-    is_activated = data["is_activated"]
-    password = data["password"]
-    # Password check
-    reg = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)[\s\S]{6,20}$"
-    if not re.match(re.compile(reg), password):
-        logger.error(f"{mail}'s password is unauthorized")
-        raise InputError(message="This password is unauthorized.")
+    new_user_info = prepare_new_user(data)
+    mail = new_user_info["mail"]
     # Encrypt password
-    hashed_password = generate_password_hash(password, method="sha256")
+    new_user_info["password"] = password_hasher.hash(new_user_info["password"])
 
     # Save in database
     try:
-        new_user = User(
-            mail=mail,
-            password=hashed_password,
-            first_name=first_name,
-            last_name=last_name,
-            is_admin=is_admin,
-            is_activated=is_activated,
-        )
+        new_user = User(**new_user_info)
         db.session.add(new_user)
         db.session.commit()
     except IntegrityError as e:
@@ -80,6 +109,181 @@ def create_new_user(data):
     return {"message": f"New user ({mail}) created successfully"}, 201
 
 
+def create_users_in_bulk(current_user, rows):
+    """Create several users at once
+
+    Each user is checked as in "create_new_user()", passwords are hashed
+    in parallel and users are inserted by batches. A wrong user doesn't stop
+    the others, the result of each one is sent back.
+
+    Args:
+        current_user (User): the user identified by decorator 'token_required'
+        rows (list): users' info (same as body of "create_new_user()")
+
+    Raises:
+        PermissionError: current user is not admin
+        InputError: no list of users or too many users
+
+    Returns:
+        dict: number of users "created" & "failed", and "results" of
+              each user in the order of rows ("status" "created" with "id",
+              or "error" with "message")
+    """
+    if not current_user.is_admin:
+        logger.error(f"User no admin {current_user.id} tried to create users.")
+        raise PermissionError(message="Only admin can perform this operation")
+
+    if not rows or not isinstance(rows, list):
+        logger.error("No list of users to create.")
+        raise InputError(message="A list of users (json array or ndjson) is required.")
+    max_rows = current_app.config["USER_BULK_MAX_ROWS"]
+    if len(rows) > max_rows:
+        logger.error(f"{len(rows)} users to create, more than {max_rows}.")
+        raise InputError(message=f"No more than {max_rows} users at once.")
+
+    results = [None] * len(rows)
+    # (row's index, columns of user) of users to insert
+    new_users = []
+    mails = set()
+    for index, data in enumerate(rows):
+        try:
+            new_user_info = prepare_new_user(data)
+        except InputError as e:
+            results[index] = {"row": index, "status": "error", "message": e.message}
+            continue
+        mail = new_user_info["mail"]
+        if mail in mails:
+            logger.error(f"The user {mail} is sent twice.")
+            results[index] = {
+                "row": index,
+                "status": "error",
+                "message": f"The user {mail} is sent twice.",
+            }
+            continue
+        mails.add(mail)
+        new_users.append((index, new_user_info))
+
+    # Encrypt passwords
+    hashed_passwords = password_hasher.hash_many(
+        [new_user_info["password"] for _, new_user_info in new_users]
+    )
+    for (_, new_user_info), hashed_password in zip(new_users, hashed_passwords):
+        new_user_info["password"] = hashed_password
+        new_user_info["id"] = uuid.uuid4()
+        new_user_info["token_version"] = 0
+
+    # Save in database by batches
+    batch_size = current_app.config["USER_BULK_BATCH_SIZE"]
+    for start in range(0, len(new_users), batch_size):
+        batch = new_users[start : start + batch_size]
+        try:
+            inserted_mails = User().insert_users_if_not_exist(
+                [new_user_info for _, new_user_info in batch]
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.critical(
+                f"There are errors when create new users in database, details: {e}"
+            )
+            inserted_mails = None
+
+        for index, new_user_info in batch:
+            mail = new_user_info["mail"]
+            if inserted_mails is None:
+                message = "There are errors when create new user in database."
+            elif mail not in inserted_mails:
+                logger.error(f"The user {mail} exists already.")
+                message = f"The user {mail} exists already."
+            else:
+                results[index] = {
+                    "row": index,
+                    "status": "created",
+                    "mail": mail,
+                    "id": new_user_info["id"],
+                }
+                continue
+            results[index] = {"row": index, "status": "error", "message": message}
+
+    created = sum(result["status"] == "created" for result in results)
+    logger.info(f"{created} users have been created in bulk.")
+    return {"created": created, "failed": len(rows) - created, "results": results}
+
+
+def find_users(
+    current_user,
+    sort=None,
+    limit=None,
+    cursor=None,
+    is_admin=None,
+    is_activated=None,
+    mail_prefix=None,
+):
+    """List users page by page
+
+    Args:
+        current_user (User): the user identified by decorator 'token_required'
+        sort (string, optional): "id" (default) or "mail"
+        limit (string, optional): number of users by page
+        cursor (string, optional): "next_cursor" of previous page
+        is_admin (string, optional): "true" or "false"
+        is_activated (string, optional): "true" or "false"
+        mail_prefix (string, optional): beginning of mails
+
+    Raises:
+        PermissionError: current user is not admin
+        InputError: params are not valid
+
+    Returns:
+        dict: "users" of page (without password) and
+              "next_cursor" (None if last page)
+    """
+    if not current_user.is_admin:
+        logger.error(f"User no admin {current_user.id} tried to list users.")
+        raise PermissionError(message="Only admin can perform this operation")
+
+    sort = sort or "id"
+    if sort not in ("id", "mail"):
+        logger.error(f"Users can't be sorted by '{sort}'.")
+        raise InputError(message="Users can only be sorted by 'id' or 'mail'.")
+    limit = verify_limit(
+        limit,
+        current_app.config["USER_LIST_DEFAULT_LIMIT"],
+        current_app.config["USER_LIST_MAX_LIMIT"],
+    )
+    is_admin = verify_boolean(is_admin, "is_admin")
+    is_activated = verify_boolean(is_activated, "is_activated")
+
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        # Cursor keeps the sort, so it can't be used with another one
+        if (
+            len(after) != 2
+            or after[0] != sort
+            or not isinstance(after[1], str)
+            or (sort == "id" and not is_uuid(after[1]))
+        ):
+            logger.error(f"Cursor({cursor}) is not a valid cursor of users.")
+            raise InputError(message="The cursor is not valid.")
+        after = after[1]
+
+    # One more user than limit is found to know if there is a next page
+    users = User().get_users(
+        sort, after, limit + 1, is_admin, is_activated, mail_prefix
+    )
+    page = users[:limit]
+    next_cursor = None
+    if len(users) > limit:
+        next_cursor = encode_cursor([sort, str(getattr(page[-1], sort))])
+
+    logger.info(f"{len(page)} users have been listed.")
+    return {
+        "users": [user.to_dict("password", "token_version", "revoked_at") for user in page],
+        "next_cursor": next_cursor,
+    }
+
+
 def find_user_by_id(current_user, user_id):
     if not current_user.is_admin:
         if not str(current_user.id) == user_id:
@@ -111,89 +315,97 @@ def find_user_by_id(current_user, user_id):
             "User info(without password, is_activated) has been\
          displayed successfully."
         )
-        return user.to_dict("password", "is_activated")
+        return user.to_dict("password", "is_activated", "token_version", "revoked_at")
 
     logger.info("User info(without password) has been displayed successfully.")
-    return user.to_dict("password")
+    return user.to_dict("password", "token_version", "revoked_at")
 
 
-def modify_user(current_user, data, user_id):
+def prepare_user_changes(data, partial=False):
+    """Check info of a user to modify and prepare its columns
 
-    if not current_user.is_admin:
-        logger.error(
-            f"User no admin {current_user.id} is not allowed to \
-        update user's info."
-        )
-        raise PermissionError(message="Only admin can perform this operation")
+    Args:
+        data (dict): user's info sent in json
+        partial (bool, optional): True if only info to change are sent
+            (only them are checked). Defaults to False (all info required).
 
-    # Data form check (dict send in json)
-    verify_data_form(data)
+    Raises:
+        InputError: info missing, unknown or not valid
 
-    # Data type & integrity check
-    template = {
-        "mail": str,
-        "first_name": str,
-        "last_name": str,
-        "is_activated": bool,
-        "is_admin": bool,
-    }
-    verify_type_integrity_of_data(template, data)
+    Returns:
+        dict: columns to update
+    """
+    # Data form, type, integrity & normalization check
+    if partial:
+        return USER_CHANGES_SCHEMA.validate(data)
+    return USER_INFO_SCHEMA.validate(data)
+
+
+def update_user(user_id, columns, only_activated=False):
+    """Update a user in one query and revoke its tokens
+
+    Args:
+        user_id (string): user's id
+        columns (dict): new value by column
+        only_activated (bool, optional): update user only if it's
+            activated. Defaults to False.
+
+    Raises:
+        InputError: not valid uuid or mail used by another user
+        DatabaseError: Errors when update user in db
+
+    Returns:
+        Row/None: "id", "token_version" & "is_activated" of user updated,
+                  None if no user updated
+    """
     # Valid uuid check
     if not is_uuid(user_id):
         logger.error(f"The id({user_id}) is not a valid uuid.")
         raise InputError(message="The user's id must be a valid uuid.")
 
-    # Find & modify user
-    id = user_id
-    mail = data["mail"].lower()
-    # Mail validation
-    left = "^[A-Za-z0-9]+([_\-\.][A-Za-z0-9]+)*"
-    right = "([A-Za-z0-9\-]+\.)+[A-Za-z]{2,6}$"
-    regex = rf"{left}@{right}"
-    if not re.search(regex, mail):
-        logger.error(f"{mail} is not a valid email address.")
-        raise InputError(message="Only a valid email address is accepted.")
-    first_name = data["first_name"].capitalize()
-    last_name = data["last_name"].capitalize()
-    is_admin = data["is_admin"]
-    is_activated = data["is_activated"]
     try:
-        user = User.query.filter_by(id=id).first()
-        if not user:
-            logger.error(f"User({id}) doesn't exist.")
-            raise NotFoundError(message="This user doesn't exist")
-        user.mail = mail
-        user.first_name = first_name
-        user.last_name = last_name
-        user.is_admin = is_admin
-        user.is_activated = is_activated
-        db.session.merge(user)
+        user = User().update_user(user_id, columns, only_activated)
         db.session.commit()
+    except (InputError, DatabaseError):
+        db.session.rollback()
+        raise
     except Exception as e:
-        logger.critical(f"There are errors when update user({id}), details: {e}")
+        db.session.rollback()
+        logger.critical(f"There are errors when update user({user_id}), details: {e}")
         raise DatabaseError(message="There are errors when update user in database.")
 
-    logger.info(f"User({id}) has been updated successfully.")
+    if user is not None:
+        revoke_tokens(user)
+    return user
+
+
+def modify_user(current_user, data, user_id, partial=False):
+
+    if not current_user.is_admin:
+        logger.error(
+            f"User no admin {current_user.id} is not allowed to \
+        update user's info."
+        )
+        raise PermissionError(message="Only admin can perform this operation")
+
+    columns = prepare_user_changes(data, partial)
+    # Find & modify user
+    if update_user(user_id, columns) is None:
+        logger.error(f"User({user_id}) doesn't exist.")
+        raise NotFoundError(message="This user doesn't exist")
+
+    logger.info(f"User({user_id}) has been updated successfully.")
     return {"message": "User's info has been updated successfully"}
 
 
 def change_password(current_user, data, user_id):
 
-    # Data form check (dict send in json)
-    verify_data_form(data)
-
-    # Data type & integrity check
-    template = {"password": str}
-    verify_type_integrity_of_data(template, data)
-    # Valid uuid check
+    # Data form, type & valid password check
+    password = PASSWORD_SCHEMA.validate(data)["password"]
+    # Valid uuid check (before hashing, which uses the pool of processes)
     if not is_uuid(user_id):
         logger.error(f"The id({user_id}) is not a valid uuid.")
         raise InputError(message="The user's id must be a valid uuid.")
-    # Valid password check
-    reg = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)[\s\S]{6,20}$"
-    if not re.match(re.compile(reg), data["password"]):
-        logger.error(f"User({data['id']})'s password is unauthorized")
-        raise InputError(message="This password is unauthorized.")
 
     # Permission check
     # Only admin can change for other user
@@ -203,26 +415,13 @@ def change_password(current_user, data, user_id):
             message="You are not authorized to perform this operation."
         )
 
-    id = user_id
-    password = data["password"]
-    password_hashed = generate_password_hash(password, method="sha256")
+    password_hashed = password_hasher.hash(password)
     # Find user & modify password
-    try:
-        user = User.query.filter_by(id=id).first()
-        if not user:
-            logger.error(f"User({id}) doesn't exist.")
-            raise NotFoundError(message="This user doesn't exist.")
-
-        user.password = password_hashed
-        db.session.merge(user)
-        db.session.commit()
-    except Exception as e:
-        logger.critical(
-            f"Failed to update user({id})'s password in database, details: {e}"
-        )
-        raise DatabaseError(message="There are errors when find user in db.")
+    if update_user(user_id, {"password": password_hashed}) is None:
+        logger.error(f"User({user_id}) doesn't exist.")
+        raise NotFoundError(message="This user doesn't exist.")
 
-    logger.info(f"Password of user({id}) has been changed successfully.")
+    logger.info(f"Password of user({user_id}) has been changed successfully.")
     return {"message": "user's info has been changed successfully"}
 
 
@@ -232,42 +431,17 @@ def deactivate_user_by_id(current_user, user_id):
         logger.error(f"User {current_user.id} (not admin) tried to deactivate user.")
         raise PermissionError(message="Only admin can deactivate user.")
 
-    if not is_uuid(user_id):
-        logger.error(f"The id({user_id}) is not a valid uuid.")
-        raise InputError(message="The user's id must be a uuid.")
-
-    try:
-        user = User.query.filter_by(id=user_id).first()
-    except Exception as e:
-        logger.critical(f"Failed to query user({user_id}), details: {e}")
-        raise DatabaseError(message="There are errors when find in database.")
-
-    if not user:
-        logger.error(f"This user({user_id}) doesn't exist.")
-        raise NotFoundError(message="This user doesn't exist.")
-
-    if not user.is_activated:
+    # Deactivate user in database (only if it's activated)
+    if update_user(user_id, {"is_activated": False}, only_activated=True) is None:
+        # Nothing updated, find why (rare case)
+        if User().is_user_activated(user_id) is None:
+            logger.error(f"This user({user_id}) doesn't exist.")
+            raise NotFoundError(message="This user doesn't exist.")
         logger.error(f"This user({user_id}) has been deactivated already.")
         raise PermissionError(
             message="This user has been deactivated already."
             "You can not redeactivate him/her again."
         )
 
-    # Deactivate user in database
-    try:
-        logger.debug(f"Before, user is activated : {user.is_activated}")
-        user.is_activated = False
-        db.session.merge(user)
-        db.session.commit()
-        logger.debug(f"After, user is activated : {user.is_activated}")
-    except Exception as e:
-        db.session.rollback()
-        logger.critical(
-            f"Failed to deactivate user({user_id}) in database, details: {e}"
-        )
-        raise DatabaseError(
-            message="There are errors when deactivate user in database."
-        )
-
     logger.info(f"The user({user_id}) has been deactivated successfully.")
     return {"message": "The user has been deactivated successfully."}
@@ -35,7 +35,11 @@ class APIException(HTTPException):
         return body
 
     def get_headers(self, environ=None):
-        return [("Content-Type", "application/json")]
+        headers = [("Content-Type", "application/json")]
+        if self.headers:
+            # ex: "Retry-After" of ServiceUnavailableError
+            headers.extend(self.headers.items())
+        return headers
 
     def get_response(self, environ=None):
         headers = self.get_headers(environ)
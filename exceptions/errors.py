@@ -74,3 +74,18 @@ class DatabaseError(APIException):
         self.error_code = error_code
         self.status_code = status_code
         self.headers = headers
+
+
+class ServiceUnavailableError(APIException):
+    def __init__(
+        self,
+        message="The service is overloaded, please retry later.",
+        error_code="SERVICE_UNAVAILABLE_ERROR",
+        status_code=503,
+        headers=None,
+    ):
+        APIException.__init__(self, message, error_code, status_code, headers)
+        self.message = message
+        self.error_code = error_code
+        self.status_code = status_code
+        self.headers = headers
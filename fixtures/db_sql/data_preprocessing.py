@@ -1,5 +1,24 @@
 import pandas as pd
+import hashlib
 import json
+import sys
+
+# Columns of a movie kept from raw data (same for all its locations)
+MOVIE_COLUMNS = [
+    "title",
+    "release_year",
+    "production_company",
+    "distributor",
+    "director",
+    "writer",
+    "actor_1",
+    "actor_2",
+    "actor_3",
+]
+# Columns of prepared data (t_movie without "id")
+OUTPUT_COLUMNS = MOVIE_COLUMNS + ["location_funfact", "movie_like_counter"]
+# Rows of raw data read at once by "chunked" mode
+DEFAULT_CHUNKSIZE = 100000
 
 
 def convert_tow_columns_to_json(row):
@@ -15,18 +34,139 @@ def convert_tow_columns_to_json(row):
     return json.dumps(temp_dict)
 
 
-def prepare_movie_data(filepath):
-    """Data preparation
-    It allows to transform raw data to desired format, steps:
-        - Data preparation (delete empty row, rename colums' name etc.)
-        - Delete lines where 'location' is empty
-        - Modify in order that every movie takes only 1 line and /
-        its related 'location'and 'fun fact' become an dict keeped /
-        in a new column 'location_funfact'
-        - Add columns 'movie_like_counter'
+def read_raw_data(filepath, chunksize=None):
+    """Read raw data, all values are kept as text
+
+    Args:
+        filepath (string): file path for raw data
+        chunksize (int, optional): number of rows by chunk.
+            Defaults to None (whole file at once).
+
+    Returns:
+        DataFrame/iterator: raw data, or its chunks if chunksize is given
+    """
+    return pd.read_csv(
+        filepath,
+        encoding="utf-8",
+        dtype=str,
+        # No value is NA (empty text is kept), it's faster to parse
+        na_filter=False,
+        chunksize=chunksize,
+    )
+
+
+def clean_raw_data(dataframe):
+    """Rename columns and delete lines without location
+
+    Args:
+        dataframe (DataFrame): raw data (or a chunk of it)
+
+    Returns:
+        DataFrame: cleaned data
+    """
+    # Reform colums' name
+    dataframe.columns = dataframe.columns.str.replace(" ", "_").str.lower()
+    # Empty lines are skipped by "read_csv()" already
+    # Delete lines where "locations" is empty
+    return dataframe[dataframe.locations.ne("")]
+
+
+def group_movies(dataframe, movies=None):
+    """Group lines of raw data by movie
+
+    The first line of a movie gives its info, and its locations are kept
+    in order of first appearance with their last fun fact. Data is reduced
+    by pandas (one "drop_duplicates" & one "groupby"), so only one line
+    by movie and by location of movie is handled in python.
+
+    Args:
+        dataframe (DataFrame): cleaned data (or a chunk of it)
+        movies (dict, optional): movies grouped from previous chunks,
+            completed in place. Defaults to None.
+
+    Returns:
+        dict: title -> (info of movie (tuple of MOVIE_COLUMNS),
+              dict of fun fact by location), in order of first appearance
+    """
+    if movies is None:
+        movies = {}
+    infos = dataframe.drop_duplicates(subset="title")[MOVIE_COLUMNS]
+    for info in infos.itertuples(index=False, name=None):
+        if info[0] not in movies:
+            movies[info[0]] = (info, {})
+
+    fun_facts = dataframe.groupby(["title", "locations"], sort=False)[
+        "fun_facts"
+    ].last()
+    for (title, location), fun_fact in fun_facts.items():
+        movies[title][1][location] = fun_fact
+    return movies
+
+
+def group_movies_by_chunks(filepath, chunksize=DEFAULT_CHUNKSIZE):
+    """Group lines of raw data by movie, reading raw data by chunks
+
+    Only one chunk and the grouped movies are in memory, so memory
+    depends on the number of movies & locations, not on the size of file.
+
+    Args:
+        filepath (string): file path for raw data
+        chunksize (int, optional): number of rows by chunk.
+            Defaults to DEFAULT_CHUNKSIZE.
+
+    Returns:
+        dict: movies (see "group_movies()")
+    """
+    movies = {}
+    for chunk in read_raw_data(filepath, chunksize):
+        group_movies(clean_raw_data(chunk), movies)
+    return movies
+
+
+def compute_content_hash(info, location_funfact):
+    """Hash of the content of a grouped movie
+
+    It doesn't depend on the order of locations, so a movie gets the same
+    hash as long as its info, locations and fun facts are the same.
+
+    Args:
+        info (tuple): values of MOVIE_COLUMNS of movie
+        location_funfact (dict): fun fact by location of movie
+
+    Returns:
+        string: sha256 in hex
+    """
+    content = json.dumps(
+        [list(info), location_funfact],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def iter_movie_rows(movies):
+    """Get rows of prepared data from grouped movies
+
+    Args:
+        movies (dict): movies returned by "group_movies()"
+
+    Yields:
+        tuple: values of OUTPUT_COLUMNS of a movie
+    """
+    for info, location_funfact in movies.values():
+        yield info + (json.dumps(location_funfact), 0)
+
+
+def prepare_movies_with_merge(filepath):
+    """Prepare data with two "groupby" and a "merge" (first version,
+    kept as reference of benchmarks)
 
     Args:
         filepath (string): file path for raw data
+
+    Returns:
+        DataFrame: prepared data
     """
     # Read raw data
     dataframe = pd.read_csv(
@@ -71,13 +211,73 @@ def prepare_movie_data(filepath):
     new_dataframe = pd.merge(dataframe, df_temp, on="title")
     # Add "movie_like_counter"
     new_dataframe["movie_like_counter"] = 0
+    return new_dataframe
+
+
+def prepare_movies_grouped(filepath):
+    """Prepare data with one grouping pass over the whole file
+
+    Args:
+        filepath (string): file path for raw data
+
+    Returns:
+        DataFrame: prepared data
+    """
+    movies = group_movies(clean_raw_data(read_raw_data(filepath)))
+    return pd.DataFrame.from_records(
+        iter_movie_rows(movies), columns=OUTPUT_COLUMNS
+    )
 
-    new_dataframe.to_csv("./movies.csv", index=False)
+
+def prepare_movies_chunked(filepath, chunksize=DEFAULT_CHUNKSIZE):
+    """Prepare data reading raw data by chunks
+    (see "group_movies_by_chunks()")
+
+    Args:
+        filepath (string): file path for raw data
+        chunksize (int, optional): number of rows by chunk.
+            Defaults to DEFAULT_CHUNKSIZE.
+
+    Returns:
+        DataFrame: prepared data
+    """
+    movies = group_movies_by_chunks(filepath, chunksize)
+    return pd.DataFrame.from_records(
+        iter_movie_rows(movies), columns=OUTPUT_COLUMNS
+    )
+
+
+# Ways to prepare data, by name of mode
+MODES = {
+    "merge": prepare_movies_with_merge,
+    "grouped": prepare_movies_grouped,
+    "chunked": prepare_movies_chunked,
+}
+
+
+def prepare_movie_data(filepath, output_path="./movies.csv", mode="chunked"):
+    """Data preparation
+    It allows to transform raw data to desired format, steps:
+        - Data preparation (delete empty row, rename colums' name etc.)
+        - Delete lines where 'location' is empty
+        - Modify in order that every movie takes only 1 line and /
+        its related 'location'and 'fun fact' become an dict keeped /
+        in a new column 'location_funfact'
+        - Add columns 'movie_like_counter'
+
+    Args:
+        filepath (string): file path for raw data
+        output_path (string, optional): file path for prepared data.
+            Defaults to "./movies.csv".
+        mode (string, optional): "merge", "grouped" or "chunked"
+            (see MODES). Defaults to "chunked".
+    """
+    MODES[mode](filepath).to_csv(output_path, index=False)
 
 
-def main():
-    prepare_movie_data("./Film_Locations_in_San_Francisco.csv")
+def main(mode="chunked"):
+    prepare_movie_data("./Film_Locations_in_San_Francisco.csv", mode=mode)
 
 
 if __name__ == "__main__":
-    main()
+    main(*sys.argv[1:])
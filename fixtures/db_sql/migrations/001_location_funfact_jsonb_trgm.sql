@@ -0,0 +1,25 @@
+-- Migrate an existing "db_tts" (created before JSONB & trigram indexes)
+    -- Convert "location_funfact" from JSON to JSONB
+    -- Create trigram indexes used by autocomplete on title & locations
+    -- Get contrib modules, if not already available : sudo apt-get install postgresql-contrib
+
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+ALTER TABLE t_movie
+    ALTER COLUMN location_funfact TYPE JSONB USING location_funfact::JSONB;
+
+CREATE OR REPLACE FUNCTION location_names(location_funfact JSONB)
+RETURNS TEXT
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT UPPER(string_agg(location, E'\n'))
+    FROM jsonb_object_keys(location_funfact) AS location
+$$;
+
+CREATE INDEX IF NOT EXISTS ix_t_movie_title_trgm ON t_movie USING GIN (UPPER(title) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_t_movie_location_names_trgm ON t_movie USING GIN (location_names(location_funfact) gin_trgm_ops);
+
+COMMIT;
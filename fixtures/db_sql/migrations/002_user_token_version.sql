@@ -0,0 +1,21 @@
+-- Migrate an existing "db_tts" (created before stateless tokens)
+    -- Add "token_version" to t_user, incremented when a user is modified
+    -- (tokens of older versions are revoked when STATELESS_AUTH is enabled)
+    -- and "revoked_at", when it was incremented or user deactivated
+    -- (only users revoked within lifetime of tokens have unexpired tokens)
+
+
+BEGIN;
+
+ALTER TABLE t_user
+    ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMPTZ;
+
+-- Users revoked before this migration may still have unexpired tokens
+UPDATE t_user SET revoked_at = NOW()
+    WHERE revoked_at IS NULL AND (token_version > 0 OR NOT is_activated);
+
+CREATE INDEX IF NOT EXISTS ix_t_user_revoked_at ON t_user (revoked_at)
+    WHERE revoked_at IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Migrate an existing "db_tts" (created before GET /users)
+    -- Create indexes used by keyset pagination & filters of users
+
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_t_user_mail_c ON t_user (mail COLLATE "C");
+CREATE INDEX IF NOT EXISTS ix_t_user_activated_mail_c ON t_user (is_activated, mail COLLATE "C");
+CREATE INDEX IF NOT EXISTS ix_t_user_activated_id ON t_user (is_activated, id);
+    -- admins are few, partial indexes are enough
+CREATE INDEX IF NOT EXISTS ix_t_user_admin_mail_c ON t_user (mail COLLATE "C") WHERE is_admin;
+CREATE INDEX IF NOT EXISTS ix_t_user_admin_id ON t_user (id) WHERE is_admin;
+
+COMMIT;
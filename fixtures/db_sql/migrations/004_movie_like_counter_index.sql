@@ -0,0 +1,9 @@
+-- Migrate an existing "db_tts" (created before /movies/top)
+    -- Create index used by the leaderboard of most liked movies
+
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_t_movie_like_counter ON t_movie (movie_like_counter DESC NULLS LAST, id);
+
+COMMIT;
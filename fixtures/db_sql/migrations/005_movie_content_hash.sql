@@ -0,0 +1,11 @@
+-- Migrate an existing "db_tts" (created before "flask ingest-movies")
+    -- Add hash of movies' content in raw data (NULL until next ingestion)
+    -- Add tombstone of movies removed from raw data
+
+
+BEGIN;
+
+ALTER TABLE t_movie ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE t_movie ADD COLUMN IF NOT EXISTS removed_at TIMESTAMPTZ;
+
+COMMIT;
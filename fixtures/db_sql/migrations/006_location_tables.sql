@@ -0,0 +1,70 @@
+-- Migrate an existing "db_tts" (created before t_location)
+    -- Create locations by canonical name & locations of each movie,
+    -- filled from "location_funfact" (then kept in sync by "flask ingest-movies")
+    -- Drop trigram index on "location_funfact", locations are searched in t_location
+
+
+BEGIN;
+
+-- Canonical name of a location: spaces trimmed & collapsed, in upper case
+CREATE OR REPLACE FUNCTION canonical_location(name TEXT)
+RETURNS TEXT
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT UPPER(btrim(regexp_replace(name, '\s+', ' ', 'g')))
+$$;
+
+-- Locations of all movies, once by canonical name
+CREATE TABLE IF NOT EXISTS t_location (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL, -- first name found, spaces trimmed & collapsed
+    canonical_name TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_t_location_canonical_name ON t_location (canonical_name);
+-- Trigram index used by autocomplete (LIKE '%keyword%' on locations)
+CREATE INDEX IF NOT EXISTS ix_t_location_canonical_name_trgm ON t_location USING GIN (canonical_name gin_trgm_ops);
+
+-- Locations of each movie with their fun fact
+CREATE TABLE IF NOT EXISTS t_movie_location (
+    movie_id uuid NOT NULL REFERENCES t_movie (id) ON DELETE CASCADE,
+    location_id INTEGER NOT NULL REFERENCES t_location (id),
+    fun_fact TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (movie_id, location_id)
+);
+-- Movies of a location
+CREATE INDEX IF NOT EXISTS ix_t_movie_location_location_id ON t_movie_location (location_id, movie_id);
+
+-- (Re)build locations of movies from their "location_funfact" (all movies if NULL),
+-- keys with the same canonical name are one location (a non empty fun fact is kept)
+CREATE OR REPLACE FUNCTION sync_movie_locations(movie_ids UUID[])
+RETURNS VOID
+LANGUAGE SQL
+AS $$
+    DELETE FROM t_movie_location
+    WHERE movie_ids IS NULL OR movie_id = ANY(movie_ids);
+
+    INSERT INTO t_location (name, canonical_name)
+    SELECT DISTINCT ON (canonical_location(location))
+        btrim(regexp_replace(location, '\s+', ' ', 'g')), canonical_location(location)
+    FROM t_movie, jsonb_object_keys(location_funfact) AS location
+    WHERE (movie_ids IS NULL OR id = ANY(movie_ids))
+        AND canonical_location(location) <> ''
+    ORDER BY canonical_location(location), location
+    ON CONFLICT (canonical_name) DO NOTHING;
+
+    INSERT INTO t_movie_location (movie_id, location_id, fun_fact)
+    SELECT DISTINCT ON (t_movie.id, t_location.id)
+        t_movie.id, t_location.id, COALESCE(fun_facts.value, '')
+    FROM t_movie
+    CROSS JOIN LATERAL jsonb_each_text(t_movie.location_funfact) AS fun_facts
+    JOIN t_location ON t_location.canonical_name = canonical_location(fun_facts.key)
+    WHERE movie_ids IS NULL OR t_movie.id = ANY(movie_ids)
+    ORDER BY t_movie.id, t_location.id, COALESCE(fun_facts.value, '') = '', fun_facts.key;
+$$;
+
+SELECT sync_movie_locations(NULL);
+
+DROP INDEX IF EXISTS ix_t_movie_location_names_trgm;
+DROP FUNCTION IF EXISTS location_names(JSONB);
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Migrate an existing "db_tts" (created before t_catalog_version)
+    -- Add version of the movie catalog, incremented by "flask ingest-movies"
+    -- & "flask load-movies" and checked by all workers to refresh their caches
+
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS t_catalog_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO t_catalog_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+COMMIT;
@@ -4,11 +4,17 @@
     -- Import "movies.csv" to table:
         -- ex: COPY t_movie('all', 'columns', 'except', 'id') FROM 'pathtofile/filename.csv' DELIMITER ',' CSV HEADER;
         -- attention : must list all colums except 'id' which is generated automatically
+        -- then fill locations of movies: SELECT sync_movie_locations(NULL);
+    -- Or load raw data directly (COPY ... FROM STDIN, without "movies.csv"):
+        -- flask load-movies fixtures/db_sql/Film_Locations_in_San_Francisco.csv
+    -- Or ingest raw data (and later its updates, only movies changed are written):
+        -- flask ingest-movies fixtures/db_sql/Film_Locations_in_San_Francisco.csv
 
 
 -- Get contrib modules, if not already available : sudo apt-get install postgresql-contrib-9.4
-DROP TABLE IF EXISTS t_movie;
+DROP TABLE IF EXISTS t_movie CASCADE;
 CREATE EXTENSION "pgcrypto"; -- enable gen_random_uuid()
+CREATE EXTENSION IF NOT EXISTS "pg_trgm"; -- enable trigram indexes (gin_trgm_ops)
 CREATE TABLE t_movie (
     id uuid DEFAULT gen_random_uuid() PRIMARY KEY,
     title VARCHAR(50) UNIQUE,
@@ -20,10 +26,86 @@ CREATE TABLE t_movie (
     actor_1 VARCHAR(50),
     actor_2 VARCHAR(50),
     actor_3 VARCHAR(50),
-    location_funfact JSON NOT NULL,
-    movie_like_counter INTEGER
+    location_funfact JSONB NOT NULL,
+    movie_like_counter INTEGER,
+    content_hash VARCHAR(64), -- sha256 of movie's content in raw data
+    removed_at TIMESTAMPTZ -- movie removed from raw data (tombstone)
 );
 
+-- Trigram index used by autocomplete (LIKE '%keyword%' on title)
+CREATE INDEX ix_t_movie_title_trgm ON t_movie USING GIN (UPPER(title) gin_trgm_ops);
+-- Index used by the leaderboard of most liked movies (/movies/top)
+CREATE INDEX ix_t_movie_like_counter ON t_movie (movie_like_counter DESC NULLS LAST, id);
+
+
+DROP TABLE IF EXISTS t_movie_location;
+DROP TABLE IF EXISTS t_location;
+-- Canonical name of a location: spaces trimmed & collapsed, in upper case
+CREATE OR REPLACE FUNCTION canonical_location(name TEXT)
+RETURNS TEXT
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT UPPER(btrim(regexp_replace(name, '\s+', ' ', 'g')))
+$$;
+
+-- Locations of all movies, once by canonical name
+CREATE TABLE t_location (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL, -- first name found, spaces trimmed & collapsed
+    canonical_name TEXT NOT NULL
+);
+CREATE UNIQUE INDEX ux_t_location_canonical_name ON t_location (canonical_name);
+-- Trigram index used by autocomplete (LIKE '%keyword%' on locations)
+CREATE INDEX ix_t_location_canonical_name_trgm ON t_location USING GIN (canonical_name gin_trgm_ops);
+
+-- Locations of each movie with their fun fact
+CREATE TABLE t_movie_location (
+    movie_id uuid NOT NULL REFERENCES t_movie (id) ON DELETE CASCADE,
+    location_id INTEGER NOT NULL REFERENCES t_location (id),
+    fun_fact TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (movie_id, location_id)
+);
+-- Movies of a location
+CREATE INDEX ix_t_movie_location_location_id ON t_movie_location (location_id, movie_id);
+
+-- (Re)build locations of movies from their "location_funfact" (all movies if NULL),
+-- keys with the same canonical name are one location (a non empty fun fact is kept)
+CREATE OR REPLACE FUNCTION sync_movie_locations(movie_ids UUID[])
+RETURNS VOID
+LANGUAGE SQL
+AS $$
+    DELETE FROM t_movie_location
+    WHERE movie_ids IS NULL OR movie_id = ANY(movie_ids);
+
+    INSERT INTO t_location (name, canonical_name)
+    SELECT DISTINCT ON (canonical_location(location))
+        btrim(regexp_replace(location, '\s+', ' ', 'g')), canonical_location(location)
+    FROM t_movie, jsonb_object_keys(location_funfact) AS location
+    WHERE (movie_ids IS NULL OR id = ANY(movie_ids))
+        AND canonical_location(location) <> ''
+    ORDER BY canonical_location(location), location
+    ON CONFLICT (canonical_name) DO NOTHING;
+
+    INSERT INTO t_movie_location (movie_id, location_id, fun_fact)
+    SELECT DISTINCT ON (t_movie.id, t_location.id)
+        t_movie.id, t_location.id, COALESCE(fun_facts.value, '')
+    FROM t_movie
+    CROSS JOIN LATERAL jsonb_each_text(t_movie.location_funfact) AS fun_facts
+    JOIN t_location ON t_location.canonical_name = canonical_location(fun_facts.key)
+    WHERE movie_ids IS NULL OR t_movie.id = ANY(movie_ids)
+    ORDER BY t_movie.id, t_location.id, COALESCE(fun_facts.value, '') = '', fun_facts.key;
+$$;
+
+
+-- Version of the movie catalog (one row), incremented with every change of
+-- movies and checked by all workers to refresh their caches
+DROP TABLE IF EXISTS t_catalog_version;
+CREATE TABLE t_catalog_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO t_catalog_version (id, version) VALUES (1, 0);
+
 
 DROP TABLE IF EXISTS t_user;
 CREATE TABLE t_user (
@@ -34,9 +116,23 @@ CREATE TABLE t_user (
     last_name VARCHAR(50) NOT NULL,
     is_admin BOOLEAN NOT NULL,
     is_activated BOOLEAN NOT NULL,
-    liked_movie_id UUID []
+    liked_movie_id UUID [],
+    token_version INTEGER NOT NULL DEFAULT 0,
+    revoked_at TIMESTAMPTZ
 );
 
+-- Indexes used by GET /users (keyset pagination by id or mail, filters)
+    -- mails are sorted & searched by prefix in "C" collation
+CREATE INDEX ix_t_user_mail_c ON t_user (mail COLLATE "C");
+CREATE INDEX ix_t_user_activated_mail_c ON t_user (is_activated, mail COLLATE "C");
+CREATE INDEX ix_t_user_activated_id ON t_user (is_activated, id);
+    -- admins are few, partial indexes are enough
+CREATE INDEX ix_t_user_admin_mail_c ON t_user (mail COLLATE "C") WHERE is_admin;
+CREATE INDEX ix_t_user_admin_id ON t_user (id) WHERE is_admin;
+
+-- Index used by sync of revoked tokens (users revoked recently)
+CREATE INDEX ix_t_user_revoked_at ON t_user (revoked_at) WHERE revoked_at IS NOT NULL;
+
 
 -- COPY t_movie(title,release_year,production_company,distributor,director,writer,actor_1,actor_2,actor_3,location_funfact,movie_like_counter) FROM '/Users/Jr/Documents/self_project/tonight_tomorrow_sanfrancisco/fixtures/db_sql/movies.csv' DELIMITER ',' CSV HEADER;
 -- INSERT INTO t_user (id, mail, password, first_name, last_name, is_admin, is_activated) VALUES ('26cd6e36-f441-4a6f-9924-0417014803a2', 'admin@gmail.com', 'sha256$aAd0M6vC$4f79400a3c85d0250890adef5ec76469aebbb5c9acf036a7d1008f0ce73fbf96', 'Lea', 'Dupont', True, True);
\ No newline at end of file
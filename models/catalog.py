@@ -0,0 +1,63 @@
+from sqlalchemy import update
+from . import db
+from exceptions.errors import DatabaseError
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+
+class CatalogVersion(db.Model):
+    """Data model for the version of the movie catalog (one row)
+
+    It's incremented in the same transaction as every change of the
+    catalog (ex: "flask ingest-movies"), so all workers can find out that
+    their in-process index & caches are stale.
+
+    Args:
+        db (db): db object created in models/__init__.py
+    """
+
+    __tablename__ = "t_catalog_version"
+
+    id = db.Column(db.SmallInteger, primary_key=True, default=1)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def get_version(self):
+        """Find current version of catalog
+
+        Raises:
+            DatabaseError: Errors occured when find version in db
+
+        Returns:
+            int: version, 0 if catalog never changed
+        """
+        try:
+            version = CatalogVersion.query.with_entities(
+                CatalogVersion.version).filter_by(id=1).scalar()
+        except Exception as e:
+            logger.error(f"Errors when find catalog version, details: {e}")
+            raise DatabaseError(f"Errors when find catalog version, details: {e}")
+
+        return version or 0
+
+    def increment_version(self):
+        """Increment version of catalog after a change of movies
+        It's not committed (done with the change).
+
+        Raises:
+            DatabaseError: Errors occured when update version in db
+
+        Returns:
+            int: new version
+        """
+        try:
+            version = db.session.execute(
+                update(CatalogVersion).where(CatalogVersion.id == 1).values(
+                    version=CatalogVersion.version + 1).returning(
+                        CatalogVersion.version)).scalar()
+        except Exception as e:
+            logger.error(f"Errors when update catalog version, details: {e}")
+            raise DatabaseError(
+                f"Errors when update catalog version, details: {e}")
+
+        return version
@@ -0,0 +1,41 @@
+from sqlalchemy.dialects.postgresql import UUID
+from . import db
+
+
+class Location(db.Model):
+    """Data model for locations, once by canonical name
+
+    Args:
+        db (db): db object created in models/__init__.py
+    """
+
+    __tablename__ = "t_location"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # First name found, spaces trimmed & collapsed
+    name = db.Column(db.Text, nullable=False)
+    # Name in upper case, spaces trimmed & collapsed (see canonical_location)
+    canonical_name = db.Column(db.Text, unique=True, nullable=False)
+
+
+class MovieLocation(db.Model):
+    """Data model for locations of movies, with their fun fact
+
+    Rows are built from "location_funfact" of movies by sql function
+    "sync_movie_locations()".
+
+    Args:
+        db (db): db object created in models/__init__.py
+    """
+
+    __tablename__ = "t_movie_location"
+
+    movie_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("t_movie.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("t_location.id"), primary_key=True
+    )
+    fun_fact = db.Column(db.Text, nullable=False, default="")
@@ -1,13 +1,19 @@
-from sqlalchemy.dialects.postgresql import UUID, JSON
-from sqlalchemy import func, any_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB, aggregate_order_by, insert
+from sqlalchemy import Integer, bindparam, column, func, or_, select, tuple_, update, values
+from sqlalchemy.orm import load_only
 import uuid
 from . import db
+from .location import Location, MovieLocation
 from exceptions.errors import DatabaseError, NotFoundError, InputError
 from log.my_logger import get_logger
 from tools.common import is_valid_uuid
+from tools.serializer import to_dict
 
 logger = get_logger()
 
+# Columns used by catalog ingestion only, never sent to clients
+INTERNAL_COLUMNS = ("content_hash", "removed_at")
+
 
 class Movie(db.Model):
     """Data model for movies & locations
@@ -34,28 +40,38 @@ class Movie(db.Model):
     actor_1 = db.Column(db.String(50))
     actor_2 = db.Column(db.String(50))
     actor_3 = db.Column(db.String(50))
-    location_funfact = db.Column(JSON, nullable=False)
+    location_funfact = db.Column(JSONB, nullable=False)
     movie_like_counter = db.Column(db.Integer)
+    # sha256 of movie's content in raw data (see compute_content_hash)
+    content_hash = db.Column(db.String(64))
+    # When movie left raw data (tombstone), None if it's in catalog.
+    # Removed movies are never found, but their id & likes are kept.
+    removed_at = db.Column(db.DateTime(timezone=True))
 
-    def to_dict(self, *columns_to_ignore):
+    def to_dict(self, *columns_to_ignore, only=None):
         """Convert to dict
         This method allows to convert schema to dict and ignore unwanted info.
+        INTERNAL_COLUMNS are always ignored.
+
+        Args:
+            only (list, optional): columns to convert, others are ignored
+                (ex: columns loaded by "load_only"). Defaults to None (all).
 
         Returns:
             dict: dict of schema's wanted info
         """
-        dict_ = {}
-        for key in self.__mapper__.c.keys():
-            if key in columns_to_ignore:
-                continue
-            dict_[key] = getattr(self, key)
-        return dict_
+        return to_dict(self, columns_to_ignore + INTERNAL_COLUMNS, only)
 
-    def get_all_movies_contain(self, *keywords):
+    def get_all_movies_contain(self, *keywords, after=None, limit=None):
         """Find movies if they contain keyword in title
 
         Args:
             keyword (string): keywords input
+            after (tuple, optional): ("title", "id") of the last movie of
+                previous page, only movies after it are found (keyset
+                pagination). Defaults to None.
+            limit (int, optional): max number of movies, sorted by title & id.
+                Defaults to None (all movies).
 
         Raises:
             DatabaseError: Errors occured when find movies in db
@@ -68,11 +84,19 @@ class Movie(db.Model):
         movies_title_with_id_dict = {}
         try:
             # Find all movies ("id" & "title") which contains keyword in their "title"
+            # (one LIKE per keyword so each one can use trigram index on UPPER(title))
             # result is a list of tuple : [(UUID('1a'), 'm1'), (UUID('1b'), 'm2')]
-            movies_title_with_id = Movie.query.filter(
-                func.upper(Movie.title).like(
-                    any_(keywords_list))).with_entities(Movie.id,
-                                                        Movie.title).all()
+            query = Movie.query.filter(is_listed()).filter(
+                or_(*[
+                    func.upper(Movie.title).like(keyword)
+                    for keyword in keywords_list
+                ])).with_entities(Movie.id, Movie.title)
+            if after is not None:
+                query = query.filter(
+                    tuple_(Movie.title, Movie.id) > tuple_(*after))
+            if limit is not None:
+                query = query.order_by(Movie.title, Movie.id).limit(limit)
+            movies_title_with_id = query.all()
 
             # Convert "id" (UUID type) to string then to dict
             movies_title_with_id_dict = dict([
@@ -83,45 +107,209 @@ class Movie(db.Model):
             raise DatabaseError(f"Errors when find movies, details: {e}")
         return movies_title_with_id_dict
 
-    # TODO find a more efficient way to do it by avoiding retrieve all locations_funfacts
+    def get_all_movies_title_with_id(self):
+        """Find all movies' title with their id
+        It's used to build the in-process search index of titles.
+
+        Raises:
+            DatabaseError: Errors occured when find movies in db
+
+        Returns:
+            dict: key is "id" (string) and value "title"
+        """
+        try:
+            movies_title_with_id = Movie.query.filter(
+                is_listed()).with_entities(Movie.id, Movie.title).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        return dict((str(id), title) for id, title in movies_title_with_id)
+
+    def get_all_movies_title_and_year(self):
+        """Find all movies' id, title and release year
+        It's used to fetch posters & trailers of the whole catalog.
+
+        Raises:
+            DatabaseError: Errors occured when find movies in db
+
+        Returns:
+            list: dict with "id" (string), "title" & "release_year"
+        """
+        try:
+            movies = Movie.query.filter(is_listed()).with_entities(
+                Movie.id, Movie.title, Movie.release_year).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        return [{
+            "id": str(id),
+            "title": title,
+            "release_year": release_year
+        } for id, title, release_year in movies]
+
+    def get_all_locations_with_movie_id(self):
+        """Find all locations with their related movie's id
+        It's used to build the in-process search index of locations.
+
+        Raises:
+            DatabaseError: Errors occured when find locations in db
+
+        Returns:
+            list: tuples of ("id" (string), "location")
+        """
+        try:
+            locations_with_movieid = join_locations(
+                Movie.query.with_entities(Movie.id, Location.name)).all()
+        except Exception as e:
+            logger.error(f"Errors when find locations, details: {e}")
+            raise DatabaseError(f"Errors when find locations, details: {e}")
+
+        return [(str(id), location) for id, location in locations_with_movieid]
+
     def get_all_locations_contain(self, *keywords):
         """Find locations if they contain keyword
 
+        Locations are searched in t_location by their canonical name
+        (indexed by trigrams), then joined to their movies.
+
         Args:
             keyword (string): keywords input
 
+        Raises:
+            DatabaseError: Errors occured when find locations in db
+
         Returns:
-            dict: key is "id" (string) and value "location"
+            list: sorted tuples of ("id" (string), "location")
         """
+        keywords_list = [("%" + keyword + "%").upper() for keyword in keywords]
 
-        # Find all location_funfacts with related movies id
         try:
-            locations_funfacts_with_movieid = Movie.query.with_entities(
-                Movie.id, Movie.location_funfact).all()
+            locations_with_movieid = join_locations(
+                Movie.query.with_entities(Movie.id, Location.name)).filter(
+                    or_(*[
+                        Location.canonical_name.like(keyword)
+                        for keyword in keywords_list
+                    ])).order_by(Movie.id, Location.name).all()
         except Exception as e:
             logger.error(f"Errors when find locations, details: {e}")
             raise DatabaseError(f"Errors when find locations, details: {e}")
 
-        # Convert "id" (UUID type) to string then to dict
-        locations_funfacts_with_movieid_dict = dict(
-            (str(id), location_funfact)
-            for id, location_funfact in locations_funfacts_with_movieid)
+        # Convert "id" (UUID type) to string
+        return [(str(id), location) for id, location in locations_with_movieid]
+
+    def get_locations_contain_with_movie_ids(self, *keywords, after=None, limit=None):
+        """Find locations if they contain keyword, grouped by location
+
+        Args:
+            keyword (string): keywords input
+            after (string, optional): last location of previous page, only
+                locations after it are found (keyset pagination).
+                Defaults to None.
+            limit (int, optional): max number of locations. Defaults to None.
 
-        result = {}
-        for movie_id, location_funfact in locations_funfacts_with_movieid_dict.items(
-        ):
-            for location in location_funfact.keys():
-                for keyword in keywords:
-                    if keyword.upper() in location.upper():
-                        result[movie_id] = location
+        Raises:
+            DatabaseError: Errors occured when find locations in db
 
-        return result
+        Returns:
+            list: tuples of ("location", list of movies' id (string))
+                  sorted by location
+        """
+        keywords_list = [("%" + keyword + "%").upper() for keyword in keywords]
 
-    def get_movie_by_id(self, id):
+        try:
+            query = join_locations(
+                Movie.query.with_entities(
+                    Location.name,
+                    func.array_agg(aggregate_order_by(Movie.id, Movie.id)))
+            ).filter(
+                or_(*[
+                    Location.canonical_name.like(keyword)
+                    for keyword in keywords_list
+                ])).group_by(Location.name).order_by(Location.name)
+            if after is not None:
+                query = query.filter(Location.name > after)
+            if limit is not None:
+                query = query.limit(limit)
+            locations_with_movieids = query.all()
+        except Exception as e:
+            logger.error(f"Errors when find locations, details: {e}")
+            raise DatabaseError(f"Errors when find locations, details: {e}")
+
+        return [(location, [str(id) for id in ids])
+                for location, ids in locations_with_movieids]
+
+    def get_all_movies_similar_to(self, *keywords):
+        """Find movies if they contain keyword or a word similar to it in title
+
+        Similar words (with typos) are found by trigram word similarity
+        of pg_trgm ("%>"), which uses trigram index on UPPER(title) as LIKE.
+
+        Args:
+            keyword (string): keywords input
+
+        Raises:
+            DatabaseError: Errors occured when find movies in db
+
+        Returns:
+            dict: key is "id" (string) and value "title"
+        """
+        keywords_list = [keyword.upper() for keyword in keywords]
+        title = func.upper(Movie.title)
+        try:
+            movies_title_with_id = Movie.query.filter(is_listed()).filter(
+                or_(*[title.like("%" + keyword + "%") for keyword in keywords_list],
+                    *[title.op("%>")(keyword) for keyword in keywords_list
+                      ])).with_entities(Movie.id, Movie.title).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        return dict((str(id), title) for id, title in movies_title_with_id)
+
+    def get_all_locations_similar_to(self, *keywords):
+        """Find locations if they contain keyword or a word similar to it
+
+        Same as "get_all_locations_contain()" but with trigram word
+        similarity of pg_trgm ("%>") to find locations with typos.
+
+        Args:
+            keyword (string): keywords input
+
+        Raises:
+            DatabaseError: Errors occured when find locations in db
+
+        Returns:
+            list: sorted tuples of ("id" (string), "location")
+        """
+        keywords_list = [keyword.upper() for keyword in keywords]
+
+        location = Location.canonical_name
+        try:
+            locations_with_movieid = join_locations(
+                Movie.query.with_entities(Movie.id, Location.name)).filter(
+                    or_(*[
+                        location.like("%" + keyword + "%")
+                        for keyword in keywords_list
+                    ], *[
+                        location.op("%>")(keyword)
+                        for keyword in keywords_list
+                    ])).order_by(Movie.id, Location.name).all()
+        except Exception as e:
+            logger.error(f"Errors when find locations, details: {e}")
+            raise DatabaseError(f"Errors when find locations, details: {e}")
+
+        return [(str(id), location) for id, location in locations_with_movieid]
+
+    def get_movie_by_id(self, id, columns=None):
         """Find movie by id
 
         Args:
             id (string): movie id
+            columns (list, optional): columns to load ("id" is always loaded),
+                others are never loaded from db (ex: "location_funfact").
+                Defaults to None (all columns).
 
         Raises:
             DatabaseError: Errors when find movie in db
@@ -136,9 +324,11 @@ class Movie(db.Model):
             logger.error(f"{id} is not valid UUID")
             raise InputError(f"{id} is not valid UUID")
 
-        # Find movie by id
+        # Find movie by id ("location_funfact" is found in t_movie_location)
+        columns, with_locations = split_columns(columns)
         try:
-            movie = Movie.query.filter_by(id=id).first()
+            movie = Movie.query.options(*load_columns(columns)).filter(
+                is_listed()).filter_by(id=id).first()
         except Exception as e:
             logger.error(f"Errors when find movies, details: {e}")
             raise DatabaseError(f"Errors when find movies, details: {e}")
@@ -148,4 +338,330 @@ class Movie(db.Model):
             raise NotFoundError(
                 message=f"Corresponding movie not found for '{id}'.")
 
-        return movie.to_dict()
\ No newline at end of file
+        movie_info = movie.to_dict(only=("id", *columns))
+        if with_locations:
+            movie_info["location_funfact"] = self.get_location_funfacts(
+                movie.id).get(str(movie.id), {})
+        return movie_info
+
+    def get_movies_by_ids(self, *ids, columns=None):
+        """Find movies by ids in one query
+
+        Args:
+            ids (string): valid UUIDs of movies (see tools.common.is_valid_uuid)
+            columns (list, optional): columns to load ("id" is always loaded).
+                Defaults to None (all columns).
+
+        Raises:
+            DatabaseError: Errors when find movies in db
+
+        Returns:
+            dict: key is "id" (string) and value all info in db about the movie,
+                  movies not found are missing
+        """
+        columns, with_locations = split_columns(columns)
+        try:
+            movies = Movie.query.options(*load_columns(columns)).filter(
+                is_listed(), Movie.id.in_(ids)).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        movies_info = dict((str(movie.id), movie.to_dict(only=("id", *columns)))
+                           for movie in movies)
+        if with_locations and movies_info:
+            # Locations of all movies in one query
+            location_funfacts = self.get_location_funfacts(*movies_info)
+            for id, movie_info in movies_info.items():
+                movie_info["location_funfact"] = location_funfacts.get(id, {})
+        return movies_info
+
+    def get_location_funfacts(self, *ids):
+        """Find locations of movies with their fun fact (t_movie_location)
+
+        Args:
+            ids (string/UUID): ids of movies
+
+        Raises:
+            DatabaseError: Errors when find locations in db
+
+        Returns:
+            dict: key is "id" (string) and value a dict of fun fact by
+                  location (sorted), movies without location are missing
+        """
+        try:
+            locations = MovieLocation.query.join(
+                Location, Location.id == MovieLocation.location_id).filter(
+                    MovieLocation.movie_id.in_(ids)).with_entities(
+                        MovieLocation.movie_id, Location.name,
+                        MovieLocation.fun_fact).order_by(
+                            MovieLocation.movie_id, Location.name).all()
+        except Exception as e:
+            logger.error(f"Errors when find locations, details: {e}")
+            raise DatabaseError(f"Errors when find locations, details: {e}")
+
+        location_funfacts = {}
+        for id, location, fun_fact in locations:
+            location_funfacts.setdefault(str(id), {})[location] = fun_fact
+        return location_funfacts
+
+    def add_to_like_counters(self, deltas):
+        """Add likes to counters of several movies in one UPDATE
+        Counters never go below 0, removed movies are ignored.
+        It's not committed.
+
+        Args:
+            deltas (dict): likes to add (negative to remove) by movie's id
+
+        Raises:
+            DatabaseError: Errors occured when update movies in db
+
+        Returns:
+            list: dict with "id" (string), "title" & new "movie_like_counter"
+                  of movies updated
+        """
+        # Sorted, so concurrent updates lock movies in the same order
+        deltas_values = values(column("id", UUID(as_uuid=True)),
+                               column("delta", Integer),
+                               name="deltas").data(sorted(
+                                   (uuid.UUID(id), delta)
+                                   for id, delta in deltas.items()))
+        counter = func.coalesce(Movie.movie_like_counter, 0)
+        try:
+            counters = db.session.execute(
+                update(Movie).where(Movie.id == deltas_values.c.id,
+                                    is_listed()).values(
+                    movie_like_counter=func.greatest(
+                        counter + deltas_values.c.delta, 0)).returning(
+                            Movie.id, Movie.title,
+                            Movie.movie_like_counter).execution_options(
+                                synchronize_session=False)).all()
+        except Exception as e:
+            logger.error(f"Errors when update like counters, details: {e}")
+            raise DatabaseError(
+                f"Errors when update like counters, details: {e}")
+
+        return [{
+            "id": str(id),
+            "title": title,
+            "movie_like_counter": like_counter
+        } for id, title, like_counter in counters]
+
+    def get_top_liked_movies(self, limit):
+        """Find the most liked movies (index on "movie_like_counter")
+
+        Args:
+            limit (int): max number of movies
+
+        Raises:
+            DatabaseError: Errors occured when find movies in db
+
+        Returns:
+            list: dict with "id" (string), "title" & "movie_like_counter",
+                  the most liked at first (movies never liked are ignored)
+        """
+        try:
+            movies = Movie.query.filter(
+                is_listed(), Movie.movie_like_counter > 0).order_by(
+                Movie.movie_like_counter.desc().nullslast(),
+                Movie.id).with_entities(Movie.id, Movie.title,
+                                        Movie.movie_like_counter).limit(
+                                            limit).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        return [{
+            "id": str(id),
+            "title": title,
+            "movie_like_counter": like_counter
+        } for id, title, like_counter in movies]
+
+    def get_all_content_hashes(self):
+        """Find content hash of all movies, removed ones included
+        It's used by catalog ingestion to find movies changed in raw data.
+
+        Raises:
+            DatabaseError: Errors occured when find movies in db
+
+        Returns:
+            dict: key is "title" and value a tuple of ("content_hash",
+                  True if movie is removed)
+        """
+        try:
+            movies = Movie.query.with_entities(Movie.title, Movie.content_hash,
+                                               Movie.removed_at).all()
+        except Exception as e:
+            logger.error(f"Errors when find movies, details: {e}")
+            raise DatabaseError(f"Errors when find movies, details: {e}")
+
+        return dict((title, (content_hash, removed_at is not None))
+                    for title, content_hash, removed_at in movies)
+
+    def upsert_movies(self, movies):
+        """Insert movies, or update them if their title exists already
+        Id & "movie_like_counter" of existing movies are kept, and removed
+        movies are restored. It's not committed.
+
+        Args:
+            movies (list): dict of columns by movie (all columns except "id",
+                "movie_like_counter" & "removed_at")
+
+        Raises:
+            DatabaseError: Errors occured when upsert movies in db
+
+        Returns:
+            list: ids (UUID) of movies inserted or updated
+        """
+        statement = insert(Movie).values(
+            [dict(movie, movie_like_counter=0) for movie in movies])
+        columns = [column for column in movies[0] if column != "title"]
+        try:
+            ids = db.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Movie.title],
+                    set_=dict(
+                        {
+                            column: getattr(statement.excluded, column)
+                            for column in columns
+                        },
+                        removed_at=None)).returning(Movie.id)).scalars().all()
+        except Exception as e:
+            logger.error(f"Errors when upsert movies, details: {e}")
+            raise DatabaseError(f"Errors when upsert movies, details: {e}")
+
+        return ids
+
+    def sync_locations(self, ids=None):
+        """(Re)build locations of movies (t_location & t_movie_location)
+        from their "location_funfact", with sql function
+        "sync_movie_locations()". It's not committed.
+
+        Args:
+            ids (list, optional): ids (UUID) of movies.
+                Defaults to None (all movies).
+
+        Raises:
+            DatabaseError: Errors occured when update locations in db
+        """
+        movie_ids = bindparam("movie_ids", ids, type_=ARRAY(UUID(as_uuid=True)))
+        try:
+            db.session.execute(select(func.sync_movie_locations(movie_ids)))
+        except Exception as e:
+            logger.error(f"Errors when sync locations, details: {e}")
+            raise DatabaseError(f"Errors when sync locations, details: {e}")
+
+    def remove_movies(self, titles):
+        """Tombstone movies which are not in raw data anymore
+        It's not committed.
+
+        Args:
+            titles (list): titles of movies
+
+        Raises:
+            DatabaseError: Errors occured when update movies in db
+        """
+        try:
+            db.session.execute(
+                update(Movie).where(Movie.title.in_(titles), is_listed()).values(
+                    removed_at=func.now()).execution_options(
+                        synchronize_session=False))
+        except Exception as e:
+            logger.error(f"Errors when remove movies, details: {e}")
+            raise DatabaseError(f"Errors when remove movies, details: {e}")
+
+    def copy_movies(self, stream, columns):
+        """Load movies from csv with one COPY ... FROM STDIN
+        It's not committed.
+
+        Args:
+            stream (file): file-like object of csv (without header),
+                read by chunks of its "buffer_size"
+            columns (list): columns of t_movie in csv
+
+        Raises:
+            DatabaseError: Errors occured when load movies in db
+
+        Returns:
+            int: number of movies loaded
+        """
+        sql = (f"COPY {Movie.__tablename__} ({', '.join(columns)}) "
+               "FROM STDIN WITH (FORMAT csv)")
+        try:
+            # Raw psycopg2 cursor in the transaction of session
+            cursor = db.session.connection().connection.cursor()
+            cursor.copy_expert(sql, stream, size=stream.buffer_size)
+        except Exception as e:
+            logger.error(f"Errors when load movies, details: {e}")
+            raise DatabaseError(f"Errors when load movies, details: {e}")
+
+        return cursor.rowcount
+
+    def remove_all_movies(self):
+        """Delete all movies (before loading another catalog)
+        It's not committed.
+
+        Raises:
+            DatabaseError: Errors occured when delete movies in db
+        """
+        try:
+            Movie.query.delete(synchronize_session=False)
+        except Exception as e:
+            logger.error(f"Errors when delete movies, details: {e}")
+            raise DatabaseError(f"Errors when delete movies, details: {e}")
+
+
+def is_listed():
+    """Condition of movies in catalog (not removed from raw data)
+
+    Returns:
+        expression: "removed_at IS NULL"
+    """
+    return Movie.removed_at.is_(None)
+
+
+def join_locations(query):
+    """Join movies of a query to their locations (t_location)
+
+    Args:
+        query (query): query on t_movie
+
+    Returns:
+        query: query with one row by location of movie in catalog
+    """
+    return query.join(MovieLocation, MovieLocation.movie_id == Movie.id).join(
+        Location, Location.id == MovieLocation.location_id).filter(is_listed())
+
+
+def split_columns(columns):
+    """Split columns wanted between t_movie & t_movie_location
+
+    Args:
+        columns (list/None): columns wanted, None for all columns
+
+    Returns:
+        tuple: columns to load from t_movie (tuple, never "location_funfact"
+               nor INTERNAL_COLUMNS) & if "location_funfact" is wanted
+    """
+    if columns is None:
+        columns = [
+            column for column in Movie.__mapper__.c.keys()
+            if column not in INTERNAL_COLUMNS
+        ]
+    return (tuple(column for column in columns
+                  if column not in ("id", "location_funfact")),
+            "location_funfact" in columns)
+
+
+def load_columns(columns):
+    """Loader options to load only some columns of t_movie
+
+    Args:
+        columns (list/None): columns to load, None for all columns
+
+    Returns:
+        list: options for "query.options()"
+    """
+    if columns is None:
+        return []
+    return [load_only(Movie.id, *[getattr(Movie, column) for column in columns])]
@@ -1,6 +1,18 @@
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy import case, cast, func, not_, or_, update
+from sqlalchemy.exc import IntegrityError
+import datetime
+import re
 import uuid
 from . import db
+from exceptions.errors import DatabaseError, InputError
+from log.my_logger import get_logger
+from tools.serializer import to_dict
+
+logger = get_logger()
+
+# Columns whose change revokes tokens of user (claims & credentials)
+REVOKING_COLUMNS = ("mail", "password", "is_admin", "is_activated")
 
 
 class User(db.Model):
@@ -26,6 +38,10 @@ class User(db.Model):
     is_admin = db.Column(db.Boolean, nullable=False)
     is_activated = db.Column(db.Boolean, nullable=False)
     liked_movie_id = db.Column(db.ARRAY(UUID))
+    # Incremented when user is modified, tokens of older versions are revoked
+    token_version = db.Column(db.Integer, nullable=False, default=0)
+    # When "token_version" was incremented or user deactivated
+    revoked_at = db.Column(db.DateTime(timezone=True))
 
     def to_dict(self, *columns_to_ignore):
         """Convert to dict
@@ -34,9 +50,255 @@ class User(db.Model):
         Returns:
             dict: dict of schema's wanted info
         """
-        dict_ = {}
-        for key in self.__mapper__.c.keys():
-            if key in columns_to_ignore:
-                continue
-            dict_[key] = getattr(self, key)
-        return dict_
+        return to_dict(self, columns_to_ignore)
+
+    def get_all_users_with_revoked_tokens(self, token_lifetime):
+        """Find users having revoked tokens not expired yet
+        They are users modified or deactivated within lifetime of tokens,
+        tokens of users revoked before are expired already.
+
+        Args:
+            token_lifetime (int): lifetime of tokens (seconds)
+
+        Raises:
+            DatabaseError: Errors occured when find users in db
+
+        Returns:
+            list: tuples of ("id" (string), "token_version", "is_activated")
+        """
+        try:
+            users = User.query.filter(
+                User.revoked_at > func.now() -
+                datetime.timedelta(seconds=token_lifetime)).with_entities(
+                    User.id, User.token_version, User.is_activated).all()
+        except Exception as e:
+            logger.error(f"Errors when find users, details: {e}")
+            raise DatabaseError(f"Errors when find users, details: {e}")
+
+        return [(str(id), token_version, is_activated)
+                for id, token_version, is_activated in users]
+
+    def insert_users_if_not_exist(self, users):
+        """Insert several users in one query, users whose mail exists are ignored
+        It's not committed.
+
+        Args:
+            users (list): dict with all columns of each user, "id" included
+
+        Raises:
+            DatabaseError: Errors occured when insert users in db
+
+        Returns:
+            set: mails of users inserted
+        """
+        try:
+            inserted_users = db.session.execute(
+                insert(User).values(users).on_conflict_do_nothing(
+                    index_elements=[User.mail]).returning(User.mail)).all()
+        except Exception as e:
+            logger.error(f"Errors when insert users, details: {e}")
+            raise DatabaseError(f"Errors when insert users, details: {e}")
+
+        return set(mail for mail, in inserted_users)
+
+    def get_users(
+        self,
+        sort="id",
+        after=None,
+        limit=50,
+        is_admin=None,
+        is_activated=None,
+        mail_prefix=None,
+    ):
+        """Find one page of users, sorted by id or mail
+
+        Users after the last one of previous page are found by an index
+        (keyset pagination), so each page costs the same whatever its rank.
+        Mails are compared in "C" collation, as their index.
+
+        Args:
+            sort (string, optional): "id" or "mail". Defaults to "id".
+            after (string, optional): id or mail of the last user of
+                previous page. Defaults to None (first page).
+            limit (int, optional): max number of users. Defaults to 50.
+            is_admin (boolean, optional): only admins or not. Defaults to None.
+            is_activated (boolean, optional): only activated users or not.
+                Defaults to None.
+            mail_prefix (string, optional): only mails starting with it.
+                Defaults to None.
+
+        Raises:
+            DatabaseError: Errors occured when find users in db
+
+        Returns:
+            list: users (User), sorted
+        """
+        mail = User.mail.collate("C")
+        sort_column = mail if sort == "mail" else User.id
+        query = User.query
+        if is_admin is not None:
+            query = query.filter(User.is_admin == is_admin)
+        if is_activated is not None:
+            query = query.filter(User.is_activated == is_activated)
+        if mail_prefix:
+            # "%" & "_" of prefix are not wildcards
+            escaped_prefix = re.sub(r"([\\%_])", r"\\\1", mail_prefix.lower())
+            query = query.filter(mail.like(escaped_prefix + "%", escape="\\"))
+        if after is not None:
+            query = query.filter(sort_column > after)
+        try:
+            users = query.order_by(sort_column).limit(limit).all()
+        except Exception as e:
+            logger.error(f"Errors when find users, details: {e}")
+            raise DatabaseError(f"Errors when find users, details: {e}")
+
+        return users
+
+    def add_liked_movie(self, user_id, movie_id):
+        """Add a movie to liked movies of a user, in one atomic UPDATE
+        It's not committed.
+
+        Args:
+            user_id (string): user's id
+            movie_id (string): valid UUID of movie
+
+        Raises:
+            DatabaseError: Errors occured when update user in db
+
+        Returns:
+            boolean: True if added, False if movie was liked already
+        """
+        liked_movie_id = User.liked_movie_id
+        try:
+            updated = User.query.filter(
+                User.id == user_id,
+                or_(liked_movie_id.is_(None),
+                    not_(liked_movie_id.any(movie_id)))).update(
+                        {
+                            liked_movie_id:
+                            func.array_append(liked_movie_id,
+                                              cast(movie_id, UUID))
+                        },
+                        synchronize_session=False)
+        except Exception as e:
+            logger.error(f"Errors when update user({user_id}), details: {e}")
+            raise DatabaseError(f"Errors when update user, details: {e}")
+
+        return updated == 1
+
+    def remove_liked_movie(self, user_id, movie_id):
+        """Remove a movie from liked movies of a user, in one atomic UPDATE
+        It's not committed.
+
+        Args:
+            user_id (string): user's id
+            movie_id (string): valid UUID of movie
+
+        Raises:
+            DatabaseError: Errors occured when update user in db
+
+        Returns:
+            boolean: True if removed, False if movie was not liked
+        """
+        liked_movie_id = User.liked_movie_id
+        try:
+            updated = User.query.filter(
+                User.id == user_id, liked_movie_id.any(movie_id)).update(
+                    {
+                        liked_movie_id:
+                        func.array_remove(liked_movie_id, cast(movie_id, UUID))
+                    },
+                    synchronize_session=False)
+        except Exception as e:
+            logger.error(f"Errors when update user({user_id}), details: {e}")
+            raise DatabaseError(f"Errors when update user, details: {e}")
+
+        return updated == 1
+
+    def remove_all_liked_movies(self):
+        """Empty liked movies of all users (ex: all movies deleted)
+        It's not committed.
+
+        Raises:
+            DatabaseError: Errors occured when update users in db
+
+        Returns:
+            int: number of users updated
+        """
+        try:
+            updated = User.query.filter(User.liked_movie_id.isnot(None)).update(
+                {User.liked_movie_id: None}, synchronize_session=False)
+        except Exception as e:
+            logger.error(f"Errors when update liked movies, details: {e}")
+            raise DatabaseError(f"Errors when update liked movies, details: {e}")
+
+        return updated
+
+    def update_user(self, user_id, columns, only_activated=False):
+        """Update columns of a user in one UPDATE ... RETURNING
+        If a column of REVOKING_COLUMNS gets a new value, its "token_version"
+        is incremented and "revoked_at" set (its tokens are revoked).
+        It's not committed.
+
+        Args:
+            user_id (string): valid uuid of user
+            columns (dict): new value by column
+            only_activated (bool, optional): update user only if it's
+                activated. Defaults to False.
+
+        Raises:
+            InputError: new mail is used by another user
+            DatabaseError: Errors occured when update user in db
+
+        Returns:
+            Row/None: "id", "token_version" & "is_activated" of user updated,
+                      None if no user updated
+        """
+        query = update(User).where(User.id == user_id)
+        if only_activated:
+            query = query.where(User.is_activated.is_(True))
+        changes = [
+            getattr(User, column).is_distinct_from(value)
+            for column, value in columns.items() if column in REVOKING_COLUMNS
+        ]
+        if changes:
+            # Old values are compared, in the same UPDATE
+            is_revoked = or_(*changes)
+            query = query.values(
+                token_version=case((is_revoked, User.token_version + 1),
+                                   else_=User.token_version),
+                revoked_at=case((is_revoked, func.now()),
+                                else_=User.revoked_at))
+        try:
+            return db.session.execute(
+                query.values(**columns).returning(
+                    User.id, User.token_version,
+                    User.is_activated).execution_options(
+                        synchronize_session=False)).first()
+        except IntegrityError as e:
+            logger.error(f"Mail of user({user_id}) is used already, details: {e}")
+            raise InputError(message="This mail is used by another user already.")
+        except Exception as e:
+            logger.error(f"Errors when update user({user_id}), details: {e}")
+            raise DatabaseError(f"Errors when update user, details: {e}")
+
+    def is_user_activated(self, user_id):
+        """Check if a user is activated
+
+        Args:
+            user_id (string): valid uuid of user
+
+        Raises:
+            DatabaseError: Errors occured when find user in db
+
+        Returns:
+            boolean/None: True if activated, None if user doesn't exist
+        """
+        try:
+            user = User.query.filter_by(id=user_id).with_entities(
+                User.is_activated).first()
+        except Exception as e:
+            logger.error(f"Errors when find user({user_id}), details: {e}")
+            raise DatabaseError(f"Errors when find user, details: {e}")
+
+        return None if user is None else user.is_activated
@@ -1,4 +1,4 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from controllers.autocomplete import search_movie_or_location_by_keyword
 
 autocomplete = Blueprint("autocomplete", __name__, url_prefix="/autocomplete")
@@ -12,6 +12,13 @@ def autocomplete_resource(resource, keywords):
         resource (string): must be "movie" or "location"
         keywords (string): if multipl keywords that must be seperated by "_" (ex: "ab_c_d")
 
+    Params:
+        ranked (string, optional): "true" to get only the best matches
+                                   (typos tolerated), the best at first
+        limit (int, optional): max number of results when ranked,
+                               else number of results by page
+        cursor (string, optional): "next_cursor" of previous page
+
     Returns:
         dict: response structure is different according to resource
             ex:
@@ -34,6 +41,38 @@ def autocomplete_resource(resource, keywords):
                         ]
                     }
                 }
+            ex (paginated, movies sorted by title & id, locations as above
+                with "next_cursor"):
+                {
+                    "movies": [
+                        {
+                            "id": "1be9b31c-32c8-4e60-a1ad-a561d7860b24",
+                            "title": "GirlBoss"
+                        }
+                    ],
+                    "next_cursor": "WyJHaXJsQm9zcyIsICIxYmU5YjMxYy..."
+                }
+            ex (ranked):
+                {
+                    "movies": [
+                        {
+                            "id": "1be9b31c-32c8-4e60-a1ad-a561d7860b24",
+                            "title": "GirlBoss"
+                        }
+                    ]
+                }
+                {
+                    "locations": [
+                        {
+                            "location": "Bay Bridge",
+                            "movie_ids": ["22e86742-7750-46be-86a5-7661601f377f"]
+                        }
+                    ]
+                }
     """
-
-    return search_movie_or_location_by_keyword(resource, keywords)
\ No newline at end of file
+    ranked = request.args.get("ranked", "false").lower() == "true"
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    return search_movie_or_location_by_keyword(
+        resource, keywords, ranked, limit, cursor
+    )
@@ -1,18 +1,136 @@
-from flask import Blueprint
-from controllers.movie import find_movie_by_id
+from flask import Blueprint, request, make_response, current_app
+from controllers.movie import find_movie_by_id, find_movies_by_ids, verify_fields
+from controllers.like import like_movie, unlike_movie
+from controllers.leaderboard import find_top_movies
+from tools.decorator_token_required import token_required
 
 movie = Blueprint("movie", __name__, url_prefix="/movies")
 
 
+@movie.route("", methods=["GET"])
+def get_movies_by_ids():
+    """Find several movies by ids
+    It allows to get all info about corresponding movies at once.
+
+    Endpoint: /movies?ids=<movie's id>,<movie's id>
+
+    Params:
+        ids (string): movies' id seperated by ","
+        fields (string, optional): fields wanted seperated by ","
+                                   (ex: "title,release_year,director")
+
+    Returns:
+        dict: info of each movie (same as /movies/<movie_id>) by id
+            ex:
+                {
+                    "movies": {
+                        "1be9b31c-32c8-4e60-a1ad-a561d7860b24": {
+                            "title": "GirlBoss",
+                            ...
+                        },
+                        "22e86742-7750-46be-86a5-7661601f377f": {
+                            "error_code": "NOT_FOUND_ERROR",
+                            "message": "Corresponding movie not found for ..."
+                        }
+                    }
+                }
+    """
+    fields = verify_fields(request.args.get("fields"))
+    return find_movies_by_ids(request.args.get("ids"), fields)
+
+
+@movie.route("/top", methods=["GET"])
+def get_top_movies():
+    """Find the most liked movies (leaderboard)
+
+    Endpoint: /movies/top?n=<number of movies>
+
+    Params:
+        n (int, optional): number of movies
+
+    Returns:
+        dict: the most liked movies, the most liked at first
+            ex:
+                {
+                    "movies": [
+                        {
+                            "id": "1be9b31c-32c8-4e60-a1ad-a561d7860b24",
+                            "movie_like_counter": 42,
+                            "title": "GirlBoss"
+                        }
+                    ]
+                }
+    """
+    return find_top_movies(request.args.get("n"))
+
+
 @movie.route("/<movie_id>", methods=["GET"])
 def get_movie_by_id(movie_id):
     """Find movie by id
     It allows to get all info about corresponding movie,
-    its poster and trailer
+    its poster and trailer.
+    Response has an "ETag", if it's sent back in "If-None-Match" and
+    the movie is unchanged, the response is 304 (Not Modified) without body.
+
     Args:
         movie_id (string): Movie id
 
+    Params:
+        fields (string, optional): fields wanted seperated by ","
+                                   (ex: "title,release_year,director"),
+                                   "id" is always sent
+
     Returns:
         dict: Basic info & poster & trailer about the corresponding movie
     """
-    return find_movie_by_id(movie_id)
+    fields = verify_fields(request.args.get("fields"))
+    movie_info, etag = find_movie_by_id(movie_id, fields)
+
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(movie_info)
+    response.set_etag(etag)
+    return response
+
+
+@movie.route("/<movie_id>/like", methods=["PUT"])
+@token_required
+def like(current_user, movie_id):
+    """Like a movie
+    It adds the movie to liked movies of current user
+    and 1 to its like counter (nothing if it's liked already).
+
+    Args:
+        current_user: the user identified by decorator 'token_required'
+        x-access-token: token genarated after /login
+                        and kept in localstorage/cookie
+        movie_id (string): Movie id
+
+    Returns:
+        message : positive response about action
+        OR
+        message & error_code : negative response about action
+    """
+    return like_movie(current_user, movie_id)
+
+
+@movie.route("/<movie_id>/like", methods=["DELETE"])
+@token_required
+def unlike(current_user, movie_id):
+    """Unlike a movie
+    It removes the movie from liked movies of current user
+    and 1 from its like counter (nothing if it's not liked).
+
+    Args:
+        current_user: the user identified by decorator 'token_required'
+        x-access-token: token genarated after /login
+                        and kept in localstorage/cookie
+        movie_id (string): Movie id
+
+    Returns:
+        message : positive response about action
+        OR
+        message & error_code : negative response about action
+    """
+    return unlike_movie(current_user, movie_id)
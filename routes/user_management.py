@@ -1,7 +1,10 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from tools.decorator_token_required import token_required
+from tools.user import read_ndjson
 from controllers.user_management import (
     create_new_user,
+    create_users_in_bulk,
+    find_users,
     find_user_by_id,
     modify_user,
     change_password,
@@ -35,6 +38,78 @@ def create_user():
     return create_new_user(data)
 
 
+@user.route("", methods=["GET"])
+@token_required
+def list_users(current_user):
+    """List users
+    This allows admin ONLY to list all users, page by page.
+
+    Endpoint: /users
+
+    Methods: GET
+
+    Args:
+            current_user: the user identified by decorator 'token_required'
+            x-access-token: token genarated after /login
+                            and kept in localstorage/cookie
+
+    Params:
+            sort (string, optional): "id" (default) or "mail"
+            limit (int, optional): number of users by page
+            cursor (string, optional): "next_cursor" of previous page
+            is_admin (string, optional): "true" or "false"
+            is_activated (string, optional): "true" or "false"
+            mail_prefix (string, optional): beginning of mails
+
+    Returns:
+            users : users of page (without password)
+            next_cursor : cursor of next page, null if last page
+            OR
+            message & error_code : negative response about action
+    """
+    return find_users(
+        current_user,
+        request.args.get("sort"),
+        request.args.get("limit"),
+        request.args.get("cursor"),
+        request.args.get("is_admin"),
+        request.args.get("is_activated"),
+        request.args.get("mail_prefix"),
+    )
+
+
+@user.route("/bulk", methods=["POST"])
+@token_required
+def create_users(current_user):
+    """Create several users at once
+    This allows admin ONLY to create many users (ex: onboarding).
+
+    endpoint: /users/bulk
+
+    Methods: POST
+
+    Args:
+            current_user: the user identified by decorator 'token_required'
+            x-access-token: token genarated after /login
+                            and kept in localstorage/cookie
+            body: json array of users' info (same as POST /users),
+                  or one user's info by line with
+                  Content-Type "application/x-ndjson"
+
+    Returns:
+            created & failed : number of users created or not
+            results : "created" with "id", or "error" with "message"
+                      for each user (in the order sent)
+            OR
+            message & error_code : negative response about action
+    """
+    if request.mimetype in ("application/x-ndjson", "application/jsonlines"):
+        rows = read_ndjson(request.stream, current_app.config["USER_BULK_MAX_ROWS"])
+    else:
+        rows = request.get_json()
+    return create_users_in_bulk(current_user, rows)
+
+
 @user.route("/<user_id>", methods=["GET"])
 @token_required
 def find_user(current_user, user_id):
@@ -90,6 +165,35 @@ def update_user(current_user, user_id):
     return modify_user(current_user, data, user_id)
 
 
+@user.route("/<user_id>", methods=["PATCH"])
+@token_required
+def patch_user(current_user, user_id):
+    """Update some info of user
+
+    Only admin could modify everyone's info (all columns except password).
+    Only info to change are sent in the body.
+
+    endpoint: /users/<user_id>
+
+    Methods: PATCH
+
+    Args:
+            current_user: the user identified by decorator 'token_required'
+            x-access-token: token genarated after /login
+                            and kept in localstorage/cookie
+            body: user's info to change in json (any of mail, first_name,
+                  last_name, is_admin, is_activated)
+
+    Returns:
+            message : positive response about action
+            OR
+            message & error_code : negative response about action
+    """
+
+    data = request.get_json()
+    return modify_user(current_user, data, user_id, partial=True)
+
+
 @user.route("/<user_id>/reset-password", methods=["PUT"])
 @token_required
 def reset_password(current_user, user_id):
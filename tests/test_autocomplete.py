@@ -0,0 +1,50 @@
+import json
+import pytest
+from flask import Flask, jsonify
+from controllers import autocomplete
+from controllers.autocomplete import page_movies
+from tools.json_encoder import FastJSONEncoder
+
+# Titles sorted differently than ids
+MOVIES = {
+    "f0000000-0000-4000-8000-000000000000": "Alcatraz",
+    "a0000000-0000-4000-8000-000000000000": "Bullitt",
+    "e0000000-0000-4000-8000-000000000000": "Vertigo",
+    "b0000000-0000-4000-8000-000000000000": "Zodiac",
+}
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.json_encoder = FastJSONEncoder
+    app.config["AUTOCOMPLETE_BACKEND"] = "index"
+    monkeypatch.setattr(
+        autocomplete.catalog_index, "search_titles", lambda *keywords: dict(MOVIES)
+    )
+    with app.app_context():
+        yield app
+
+
+def read_json(result):
+    return json.loads(jsonify(result).get_data())
+
+
+def test_page_of_movies_keeps_title_order_in_json(app):
+    first_page = read_json(page_movies([""], 3, None))
+
+    assert [movie["title"] for movie in first_page["movies"]] == [
+        "Alcatraz",
+        "Bullitt",
+        "Vertigo",
+    ]
+    assert first_page["movies"][0] == {
+        "id": "f0000000-0000-4000-8000-000000000000",
+        "title": "Alcatraz",
+    }
+
+    last_page = read_json(page_movies([""], 3, first_page["next_cursor"]))
+    assert last_page == {
+        "movies": [{"id": "b0000000-0000-4000-8000-000000000000", "title": "Zodiac"}],
+        "next_cursor": None,
+    }
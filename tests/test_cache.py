@@ -0,0 +1,144 @@
+import threading
+import pytest
+import tools.cache
+from tools.cache import LRUCache
+
+
+class FakeClock:
+    """Replace module "time" of tools.cache, time only moves when asked"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tools.cache, "time", clock)
+    return clock
+
+
+def test_least_recently_used_evicted_at_first(clock):
+    cache = LRUCache(maxsize=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+
+    # "a" is used, so "b" is the least recently used
+    assert cache.get("a") == "A"
+    cache.set("d", "D")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert len(cache) == 3
+
+
+def test_set_existing_key_makes_it_recent(clock):
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 3)
+    cache.set("c", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 3
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+
+    clock.now += 0.1
+    assert cache.get("a", "default") == "default"
+    assert cache.get("b") == 2
+    # Expired entry is removed when it's found
+    assert len(cache) == 1
+
+    clock.now += 20
+    assert cache.get("b") is None
+
+
+def test_stats_count_hits_and_misses(clock):
+    cache = LRUCache(maxsize=5, ttl=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    clock.now += 10
+    cache.get("a")
+
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 0, "maxsize": 5}
+
+
+def test_delete_matching_and_clear(clock):
+    cache = LRUCache()
+    for key in [("m1", None), ("m1", ("title",)), ("m2", None)]:
+        cache.set(key, key)
+
+    cache.delete_matching(lambda key: key[0] == "m1")
+    assert len(cache) == 1
+    assert cache.get(("m2", None)) == ("m2", None)
+
+    cache.delete("missing")
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_delete_group_keeps_index_in_sync(clock):
+    cache = LRUCache(maxsize=3, ttl=5, group_of=lambda key: key[0])
+    for key in [("m1", None), ("m1", ("title",)), ("m2", None)]:
+        cache.set(key, key)
+
+    cache.delete_group("m1")
+    assert len(cache) == 1
+    assert cache._groups == {"m2": {("m2", None)}}
+    cache.delete_group("missing")
+
+    # Evicted, expired & deleted keys leave their group
+    cache.set(("m3", None), 3)
+    cache.set(("m3", ("title",)), 3)
+    cache.set(("m4", None), 4)
+    assert "m2" not in cache._groups
+    cache.delete(("m3", None))
+    clock.now += 10
+    cache.get(("m3", ("title",)))
+    assert cache._groups == {"m4": {("m4", None)}}
+
+    cache.clear()
+    assert cache._groups == {}
+
+def test_concurrent_use_keeps_bound():
+    cache = LRUCache(maxsize=50, ttl=60, group_of=lambda key: key % 10)
+    errors = []
+
+    def use_cache(worker):
+        try:
+            for i in range(2000):
+                key = (worker + i) % 200
+                if cache.get(key) is None:
+                    cache.set(key, key)
+                if i % 500 == 0:
+                    cache.delete_matching(lambda key: key % 7 == 0)
+                if i % 300 == 0:
+                    cache.delete_group(worker)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=use_cache, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache) <= 50
+    assert sum(len(keys) for keys in cache._groups.values()) == len(cache)
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+    for key in range(200):
+        assert cache.get(key) in (None, key)
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+import pytest
+import controllers.catalog
+from controllers.catalog import CatalogIndex
+from exceptions.errors import DatabaseError
+from models.catalog import CatalogVersion
+
+
+class FakeClock:
+    """Replace module "time" of controllers.catalog"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(controllers.catalog, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    # Versions read in db, the last one is returned again
+    versions = [1]
+    reads = []
+
+    def get_version(self):
+        reads.append(versions[0])
+        if isinstance(versions[0], Exception):
+            raise versions[0]
+        return versions.pop(0) if len(versions) > 1 else versions[0]
+
+    monkeypatch.setattr(CatalogVersion, "get_version", get_version)
+    session = SimpleNamespace(rollback=lambda: None)
+    monkeypatch.setattr(controllers.catalog, "db", SimpleNamespace(session=session))
+    return SimpleNamespace(values=versions, reads=reads)
+
+
+@pytest.fixture
+def index(clock):
+    index = CatalogIndex(version_check_interval=5)
+    index.notified = []
+    index.add_listener(lambda: index.notified.append(clock.now))
+    return index
+
+
+def test_first_check_only_keeps_version(index, versions):
+    index.check_version()
+
+    assert index.notified == []
+    assert versions.reads == [1]
+
+
+def test_version_read_at_most_every_interval(index, versions, clock):
+    index.check_version()
+    clock.now += 4.9
+    index.check_version()
+    assert len(versions.reads) == 1
+
+    clock.now += 0.1
+    index.check_version()
+    assert len(versions.reads) == 2
+    assert index.notified == []
+
+
+def test_new_version_invalidates_index_and_caches(index, versions, clock):
+    versions.values[:] = [1, 2]
+    index._built_at = clock.now
+
+    index.check_version()
+    clock.now += 5
+    index.check_version()
+
+    assert index.notified == [1005.0]
+    assert index.is_stale()
+    # Same version again, nothing to clear
+    clock.now += 5
+    index.check_version()
+    assert index.notified == [1005.0]
+
+
+def test_failed_check_keeps_caches(index, versions, clock):
+    index.check_version()
+    versions.values[:] = [DatabaseError("no table")]
+    clock.now += 5
+    index.check_version()
+
+    assert index.notified == []
+    assert index._version == 1
@@ -0,0 +1,77 @@
+import csv
+import io
+import pytest
+from tools.csv_stream import CSVRowStream
+
+ROWS = [
+    ("180", "2011", "SPI Cinemas", None, "Jayendra", 0),
+    ('A "quoted" title', "", "Company, Inc.", "Line\nbreak", "Ünïcödé 映画", 3),
+    ("Comma, title", None, "", "  spaces  ", "\\", -1),
+]
+
+
+def read_all(stream, size=-1):
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return chunks
+        chunks.append(chunk)
+
+
+def test_rows_round_trip():
+    csv_text = b"".join(read_all(CSVRowStream(ROWS, buffer_size=16))).decode("utf-8")
+
+    # None & empty text are both unquoted empty values (NULL for COPY)
+    assert list(csv.reader(io.StringIO(csv_text))) == [
+        ["" if value is None else str(value) for value in row] for row in ROWS
+    ]
+    assert ",SPI Cinemas,,Jayendra," in csv_text
+    assert '"A ""quoted"" title"' in csv_text
+    assert '"Line\nbreak"' in csv_text
+
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 100, 65536])
+def test_same_csv_whatever_buffer_size(buffer_size):
+    expected = b"".join(read_all(CSVRowStream(ROWS)))
+
+    assert b"".join(read_all(CSVRowStream(ROWS, buffer_size))) == expected
+
+
+def test_no_more_than_buffer_size_and_one_row_in_memory():
+    rows = [(f"Movie {i}", "é" * (i % 50), i) for i in range(2000)]
+    longest_row = max(
+        len(f"{title},{text},{i}\n".encode("utf-8")) for title, text, i in rows
+    )
+    read_rows = []
+
+    def iter_rows():
+        for row in rows:
+            read_rows.append(row)
+            yield row
+
+    stream = CSVRowStream(iter_rows(), buffer_size=256)
+    chunks = []
+    while True:
+        chunk = stream.read()
+        if not chunk:
+            break
+        chunks.append(chunk)
+        assert len(chunk) <= 256
+        # Only rows needed for this chunk are written
+        assert len(stream._buffer) < longest_row
+        if len(chunks) == 1:
+            assert len(read_rows) < 30
+
+    assert sum(len(chunk) for chunk in chunks) == sum(
+        len(f"{title},{text},{i}\n".encode("utf-8")) for title, text, i in rows
+    )
+    assert stream.rows_read == len(rows)
+
+
+def test_progress():
+    sent = []
+    stream = CSVRowStream(ROWS * 5, on_progress=sent.append, progress_every=4)
+    read_all(stream)
+
+    assert sent == [4, 8, 12]
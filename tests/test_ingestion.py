@@ -0,0 +1,80 @@
+from controllers.ingestion import diff_catalog, to_movie_columns
+from fixtures.db_sql.data_preprocessing import MOVIE_COLUMNS, compute_content_hash
+
+
+def info(title, release_year="2010", director="Lea Dupont"):
+    values = dict.fromkeys(MOVIE_COLUMNS, "")
+    values.update(title=title, release_year=release_year, director=director)
+    return tuple(values[column] for column in MOVIE_COLUMNS)
+
+
+def grouped(title, **kwargs):
+    return info(title, **kwargs), {"City Hall": "Built in 1915", "Pier 39": ""}
+
+
+def test_content_hash_ignores_order_of_locations():
+    movie_info = info("Vertigo")
+    locations = {"City Hall": "Built in 1915", "Pier 39": "", "Ferry": "Old"}
+    reversed_locations = dict(reversed(list(locations.items())))
+
+    assert compute_content_hash(movie_info, locations) == compute_content_hash(
+        movie_info, reversed_locations
+    )
+    assert compute_content_hash(movie_info, locations) != compute_content_hash(
+        movie_info, {**locations, "Ferry": "New"}
+    )
+    assert compute_content_hash(movie_info, locations) != compute_content_hash(
+        info("Vertigo", director="Alfred Hitchcock"), locations
+    )
+
+
+def test_to_movie_columns_empty_text_is_null_and_year_is_int():
+    columns = to_movie_columns(info("Vertigo"), {"Pier 39": ""}, "hash")
+
+    assert columns["title"] == "Vertigo"
+    assert columns["release_year"] == 2010
+    assert columns["director"] == "Lea Dupont"
+    assert columns["writer"] is None
+    assert columns["actor_1"] is None
+    assert columns["location_funfact"] == {"Pier 39": ""}
+    assert columns["content_hash"] == "hash"
+    assert set(columns) == set(MOVIE_COLUMNS) | {"location_funfact", "content_hash"}
+
+    assert to_movie_columns(info("Vertigo", release_year=""), {}, "hash")[
+        "release_year"
+    ] is None
+
+
+def test_diff_catalog_classifies_movies():
+    movies = {
+        title: grouped(title)
+        for title in ["Unchanged", "Changed", "Restored", "New"]
+    }
+    content_hashes = {
+        "Unchanged": (compute_content_hash(*movies["Unchanged"]), False),
+        "Changed": ("old hash", False),
+        # Same content, but removed by a previous ingestion
+        "Restored": (compute_content_hash(*movies["Restored"]), True),
+        "Removed": ("hash", False),
+        "Removed already": ("hash", True),
+    }
+
+    new_movies, changed_movies, removed_titles = diff_catalog(
+        movies, content_hashes
+    )
+
+    assert [movie["title"] for movie in new_movies] == ["New"]
+    assert [movie["title"] for movie in changed_movies] == ["Changed", "Restored"]
+    # A movie removed already is not tombstoned again
+    assert removed_titles == ["Removed"]
+    assert changed_movies[0]["content_hash"] == compute_content_hash(
+        *movies["Changed"]
+    )
+    assert new_movies[0]["release_year"] == 2010
+
+
+def test_diff_catalog_without_changes():
+    movies = {"Vertigo": grouped("Vertigo")}
+    content_hashes = {"Vertigo": (compute_content_hash(*movies["Vertigo"]), False)}
+
+    assert diff_catalog(movies, content_hashes) == ([], [], [])
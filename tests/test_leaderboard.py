@@ -0,0 +1,85 @@
+import pytest
+import controllers.leaderboard
+from controllers.leaderboard import Leaderboard
+
+
+def movie(number, counter):
+    return {
+        "id": f"{number:08d}-0000-4000-8000-000000000000",
+        "title": f"Movie {number}",
+        "movie_like_counter": counter,
+    }
+
+
+def ranked(movies, capacity):
+    """Ranking of t_movie, as "ORDER BY movie_like_counter DESC, id" """
+    movies = [movie for movie in movies if movie["movie_like_counter"] > 0]
+    return sorted(movies, key=lambda m: (-m["movie_like_counter"], m["id"]))[
+        :capacity
+    ]
+
+
+@pytest.fixture
+def leaderboard(monkeypatch):
+    # Capacity of 4 movies
+    leaderboard = Leaderboard(size=2, ttl=3600)
+    db_movies = [movie(1, 10), movie(2, 8), movie(3, 6), movie(4, 4)]
+    monkeypatch.setattr(
+        controllers.leaderboard.Movie,
+        "get_top_liked_movies",
+        lambda self, limit: ranked(db_movies, limit),
+    )
+    leaderboard.load()
+    return leaderboard
+
+
+def ids(leaderboard):
+    return [movie["id"][:8] for movie in leaderboard._top_movies]
+
+
+def test_load(leaderboard):
+    assert ids(leaderboard) == ["00000001", "00000002", "00000003", "00000004"]
+    assert leaderboard.top(10) == leaderboard._top_movies[:2]
+
+
+def test_move_up_and_down(leaderboard):
+    leaderboard.update(movie(3, 9))
+    assert ids(leaderboard) == ["00000001", "00000003", "00000002", "00000004"]
+
+    leaderboard.update(movie(1, 5))
+    assert ids(leaderboard) == ["00000003", "00000002", "00000001", "00000004"]
+    assert leaderboard._movies[movie(1, 5)["id"]]["movie_like_counter"] == 5
+
+
+def test_drop_to_zero(leaderboard):
+    leaderboard.update(movie(2, 0))
+
+    assert ids(leaderboard) == ["00000001", "00000003", "00000004"]
+    assert movie(2, 0)["id"] not in leaderboard._movies
+
+
+def test_evict_at_capacity(leaderboard):
+    leaderboard.update(movie(5, 7))
+
+    assert ids(leaderboard) == ["00000001", "00000002", "00000005", "00000003"]
+    assert movie(4, 4)["id"] not in leaderboard._movies
+
+
+def test_ignore_movie_outside_full_ranking(leaderboard):
+    top_movies = leaderboard._top_movies
+    leaderboard.update(movie(5, 3))
+    leaderboard.update(movie(6, 0))
+
+    assert leaderboard._top_movies is top_movies
+    assert ids(leaderboard) == ["00000001", "00000002", "00000003", "00000004"]
+
+
+def test_ties_ordered_by_id(leaderboard):
+    leaderboard.update(movie(5, 8))
+    leaderboard.update(movie(0, 8))
+    assert ids(leaderboard) == ["00000001", "00000000", "00000002", "00000005"]
+
+    # Same counter as the last one, but a greater id
+    leaderboard.update(movie(9, 8))
+    assert ids(leaderboard) == ["00000001", "00000000", "00000002", "00000005"]
+
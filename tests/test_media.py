@@ -0,0 +1,203 @@
+import json
+import threading
+import urllib.error
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from flask import Flask
+import controllers.media
+import tools.disk_cache
+from controllers.media import MediaService
+from tools.disk_cache import DiskCache
+from tools.media_provider import HTTPMediaProvider, MediaProvider
+
+KNOWN_MOVIE = {"id": "m1", "title": "Vertigo", "release_year": 1958}
+UNKNOWN_MOVIE = {"id": "m2", "title": "Unknown", "release_year": None}
+BROKEN_MOVIE = {"id": "m3", "title": "Broken", "release_year": 2000}
+
+
+class StubMediaAPI(BaseHTTPRequestHandler):
+    """Media api answering 404 for "Unknown" and 500 for "Broken" """
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        title = query["title"][0]
+        self.server.requests.append((title, query.get("year", [""])[0]))
+        if title == "Unknown":
+            self.send_error(404)
+            return
+        if title == "Broken":
+            self.send_error(500)
+            return
+        body = json.dumps(
+            {
+                "poster": f"https://posters/{title}.jpg",
+                "trailer": f"https://trailers/{title}.mp4",
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeClock:
+    """Replace module "time" of tools.disk_cache"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubMediaAPI)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def provider(server):
+    return HTTPMediaProvider(f"http://127.0.0.1:{server.server_port}/media", timeout=2)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tools.disk_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def service(provider, tmp_path, clock):
+    service = MediaService(
+        provider, DiskCache(str(tmp_path / "media.sqlite3")), ttl=100, negative_ttl=10
+    )
+    yield service
+    service._executor.shutdown(wait=True)
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        MediaProvider()
+
+
+def test_http_provider_fetches_media(server, provider):
+    assert provider.fetch(KNOWN_MOVIE) == {
+        "poster": "https://posters/Vertigo.jpg",
+        "trailer": "https://trailers/Vertigo.mp4",
+    }
+    assert server.requests == [("Vertigo", "1958")]
+
+
+def test_http_provider_unknown_movie(provider):
+    assert provider.fetch(UNKNOWN_MOVIE) is None
+
+
+def test_http_provider_unavailable(provider):
+    with pytest.raises(urllib.error.HTTPError):
+        provider.fetch(BROKEN_MOVIE)
+
+
+def test_media_fetched_in_background_then_cached(server, service):
+    updated = []
+    service.add_listener(updated.append)
+
+    # Default media at first, never waits for provider
+    assert service.get_media(KNOWN_MOVIE) == {"poster": None, "trailer": None}
+    service._executor.shutdown(wait=True)
+
+    assert service.get_media(KNOWN_MOVIE)["poster"] == "https://posters/Vertigo.jpg"
+    assert updated == ["m1"]
+    assert server.requests == [("Vertigo", "1958")]
+
+
+def test_unknown_movie_cached_for_negative_ttl(server, service, clock):
+    service.submit(UNKNOWN_MOVIE).result()
+    assert service.cache.get("m2") == (None,)
+
+    # Negative entry: default media and not fetched again before its ttl
+    clock.now += 9
+    assert service.get_many_media([UNKNOWN_MOVIE]) == {
+        "m2": {"poster": None, "trailer": None}
+    }
+    assert service._pending == set()
+
+    clock.now += 1
+    assert service.cache.get("m2") is None
+    service.get_many_media([UNKNOWN_MOVIE])
+    service._executor.shutdown(wait=True)
+    assert len(server.requests) == 2
+
+
+def test_failed_fetch_not_cached(service):
+    updated = []
+    service.add_listener(updated.append)
+
+    service.submit(BROKEN_MOVIE).result()
+
+    assert service.cache.get("m3") is None
+    assert updated == []
+    # Not pending anymore, so it can be fetched again
+    assert service.submit(BROKEN_MOVIE) is not None
+
+
+def test_disk_cache_expiry_and_persistence(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path)
+    cache.set("a", {"poster": "p"}, ttl=5)
+    cache.set("b", None, ttl=50)
+
+    # Kept in file, so shared with another instance (ex: another worker)
+    other_cache = DiskCache(path)
+    assert other_cache.get("a") == ({"poster": "p"},)
+    assert other_cache.get_many(["a", "b", "c"]) == {"a": ({"poster": "p"},), "b": (None,)}
+
+    clock.now += 5
+    assert cache.get("a") is None
+    assert cache.get_many(["a", "b"]) == {"b": (None,)}
+
+    cache.set("a", {"poster": "q"}, ttl=5)
+    assert cache.get("a") == ({"poster": "q"},)
+
+
+def test_prefetcher_started_by_first_request_only(monkeypatch, tmp_path):
+    started = []
+    monkeypatch.setattr(
+        controllers.media,
+        "start_prefetcher",
+        lambda app, interval: started.append(interval),
+    )
+    monkeypatch.setattr(controllers.media, "media_service", MediaService())
+    app = Flask(__name__)
+    app.config.update(
+        MEDIA_PROVIDER="http",
+        MEDIA_API_URL="http://127.0.0.1:1/media",
+        MEDIA_API_TIMEOUT=1,
+        MEDIA_CACHE_PATH=str(tmp_path / "media.sqlite3"),
+        MEDIA_CACHE_TTL=100,
+        MEDIA_NEGATIVE_CACHE_TTL=10,
+        MEDIA_WORKERS=1,
+        MEDIA_PREFETCH_INTERVAL=60,
+    )
+    app.cli.command("noop")(lambda: None)
+    controllers.media.init_app(app)
+
+    # Cli commands don't serve requests
+    assert app.test_cli_runner().invoke(args=["noop"]).exit_code == 0
+    assert started == []
+
+    client = app.test_client()
+    client.get("/")
+    client.get("/")
+    assert started == [60]
@@ -0,0 +1,104 @@
+import pytest
+from flask import Flask
+import controllers.movie
+from controllers.media import MediaService
+from controllers.movie import find_movie_by_id, find_movies_by_ids, movie_cache
+from models.movie import Movie
+from tools.disk_cache import DiskCache
+from tools.media_provider import MediaProvider
+
+MOVIE_ID = "1be9b31c-32c8-4e60-a1ad-a561d7860b24"
+MOVIE = {
+    "id": MOVIE_ID,
+    "title": "GirlBoss",
+    "release_year": 2017,
+    "director": "Jamie Babbit",
+}
+
+
+class RecordingProvider(MediaProvider):
+    """Provider keeping movies asked, as the http one it needs title & year"""
+
+    def __init__(self):
+        self.movies = []
+
+    def fetch(self, movie):
+        self.movies.append(movie)
+        return {
+            "poster": f"https://posters/{movie['title']}-{movie['release_year']}",
+            "trailer": None,
+        }
+
+
+def load_columns(columns):
+    # Only columns wanted are loaded, as with "load_only"
+    if columns is None:
+        return dict(MOVIE)
+    return {column: MOVIE[column] for column in ("id", *columns)}
+
+
+@pytest.fixture
+def provider(monkeypatch, tmp_path):
+    provider = RecordingProvider()
+    service = MediaService(provider, DiskCache(str(tmp_path / "media.sqlite3")))
+    service.add_listener(controllers.movie.discard_movie)
+    monkeypatch.setattr(controllers.movie, "media_service", service)
+    monkeypatch.setattr(
+        Movie, "get_movie_by_id", lambda self, id, columns=None: load_columns(columns)
+    )
+    monkeypatch.setattr(
+        Movie,
+        "get_movies_by_ids",
+        lambda self, *ids, columns=None: {MOVIE_ID: load_columns(columns)},
+    )
+    # Catalog version is in db
+    monkeypatch.setattr(controllers.movie.catalog_index, "check_version", lambda: None)
+    movie_cache.clear()
+    yield provider
+    service._executor.shutdown(wait=True)
+    movie_cache.clear()
+
+
+def wait_fetches():
+    controllers.movie.media_service._executor.shutdown(wait=True)
+
+
+def test_poster_only_on_cold_cache(provider):
+    # Default poster until it's fetched, title & year are not sent
+    movie_info, _ = find_movie_by_id(MOVIE_ID, ("poster",))
+    assert movie_info == {"id": MOVIE_ID, "poster": None}
+
+    wait_fetches()
+    assert len(provider.movies) == 1
+    assert provider.movies[0]["title"] == "GirlBoss"
+    assert provider.movies[0]["release_year"] == 2017
+    # Placeholder was discarded from movie cache once poster was fetched
+    movie_info, _ = find_movie_by_id(MOVIE_ID, ("poster",))
+    assert movie_info == {"id": MOVIE_ID, "poster": "https://posters/GirlBoss-2017"}
+
+
+def test_media_with_other_fields(provider):
+    movie_info, _ = find_movie_by_id(MOVIE_ID, ("director", "trailer"))
+
+    assert movie_info == {"id": MOVIE_ID, "director": "Jamie Babbit", "trailer": None}
+    wait_fetches()
+    assert len(provider.movies) == 1
+
+
+def test_fields_without_media_not_fetched(provider):
+    movie_info, _ = find_movie_by_id(MOVIE_ID, ("director",))
+
+    assert movie_info == {"id": MOVIE_ID, "director": "Jamie Babbit"}
+    wait_fetches()
+    assert provider.movies == []
+
+
+def test_batch_poster_only_on_cold_cache(provider):
+    app = Flask(__name__)
+    app.config["MOVIE_BATCH_MAX_IDS"] = 10
+    with app.app_context():
+        movies = find_movies_by_ids(MOVIE_ID, ("poster",))
+
+    assert movies == {"movies": {MOVIE_ID: {"id": MOVIE_ID, "poster": None}}}
+    wait_fetches()
+    assert provider.movies[0]["title"] == "GirlBoss"
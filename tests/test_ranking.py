@@ -0,0 +1,23 @@
+from tools.ranking import top_k
+
+
+def test_best_texts_at_first():
+    texts = ["Golden Gate Bridge", "Bay Bridge", "Bridges of Madison"]
+
+    assert top_k(texts, ["bridge"], 3) == [
+        "Bridges of Madison",
+        "Bay Bridge",
+        "Golden Gate Bridge",
+    ]
+
+
+def test_texts_with_same_score_sorted_by_text():
+    texts = ["Pier 39", "Pier 17", "Pier 45"]
+
+    assert top_k(texts, ["pier"], 3) == ["Pier 17", "Pier 39", "Pier 45"]
+    assert top_k(reversed(texts), ["pier"], 2) == ["Pier 17", "Pier 39"]
+
+
+def test_texts_not_matching_are_ignored():
+    assert top_k(["City Hall", "Coit Tower"], ["zzzz"], 10) == []
+    assert top_k(["City Hall", "Coit Tower"], ["hall"], 0) == []
@@ -0,0 +1,99 @@
+import threading
+from tools.revocation import ALL_REVOKED, RevocationList
+
+USER_1 = "1be9b31c-32c8-4e60-a1ad-a561d7860b24"
+USER_2 = "1f211831-7b93-4fc7-b691-b90c37ef4623"
+USER_3 = "26cd6e36-f441-4a6f-9924-0417014803a2"
+
+
+def test_nothing_revoked_before_load():
+    revocation_list = RevocationList()
+
+    assert not revocation_list.is_loaded
+    assert not revocation_list.is_revoked(USER_1, 0)
+
+
+def test_load_revokes_older_versions():
+    revocation_list = RevocationList()
+    revocation_list.load([(USER_2, 3, True), (USER_1, 1, True)])
+
+    assert revocation_list.is_loaded
+    assert len(revocation_list) == 2
+    assert revocation_list.is_revoked(USER_1, 0)
+    assert not revocation_list.is_revoked(USER_1, 1)
+    assert revocation_list.is_revoked(USER_2, 2)
+    assert not revocation_list.is_revoked(USER_2, 3)
+    # Users not in list have no revoked token
+    assert not revocation_list.is_revoked(USER_3, 0)
+
+
+def test_deactivated_user_has_all_tokens_revoked():
+    revocation_list = RevocationList()
+    revocation_list.load([(USER_1, 2, False)])
+
+    assert revocation_list._entries[1] == [ALL_REVOKED]
+    assert revocation_list.is_revoked(USER_1, 2)
+    assert revocation_list.is_revoked(USER_1, 100)
+
+
+def test_revoke_new_and_known_users():
+    revocation_list = RevocationList()
+    revocation_list.load([(USER_2, 3, True)])
+
+    revocation_list.revoke(USER_3, 1)
+    revocation_list.revoke(USER_1, 4)
+    assert revocation_list._entries[0] == [USER_1, USER_2, USER_3]
+    assert revocation_list.is_revoked(USER_1, 3)
+    assert not revocation_list.is_revoked(USER_3, 1)
+
+    # Min version never goes back
+    revocation_list.revoke(USER_2, 2)
+    assert revocation_list.is_revoked(USER_2, 2)
+    revocation_list.revoke(USER_2, 5, is_activated=False)
+    assert revocation_list.is_revoked(USER_2, 5)
+    revocation_list.revoke(USER_2, 6)
+    assert revocation_list.is_revoked(USER_2, 6)
+
+
+def test_load_replaces_list():
+    revocation_list = RevocationList()
+    revocation_list.revoke(USER_1, 2)
+    revocation_list.load([(USER_2, 1, True)])
+
+    assert not revocation_list.is_revoked(USER_1, 0)
+    assert revocation_list.is_revoked(USER_2, 0)
+
+
+def test_readers_never_see_arrays_misaligned():
+    revocation_list = RevocationList()
+    # Each user's min version is its rank, so a misaligned read is seen
+    users = [f"{number:08d}-0000-4000-8000-000000000000" for number in range(400)]
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            for number in range(0, 400, 7):
+                try:
+                    ids, min_versions = revocation_list._entries
+                    if number < len(ids) and min_versions[ids.index(users[number])] != number:
+                        errors.append(number)
+                    revocation_list.is_revoked(users[number], number)
+                except ValueError:
+                    pass
+                except Exception as e:
+                    errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for number in reversed(range(400)):
+        revocation_list.revoke(users[number], number)
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert all(
+        revocation_list.is_revoked(user, number - 1) for number, user in enumerate(users)
+    )
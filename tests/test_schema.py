@@ -0,0 +1,90 @@
+import pytest
+from exceptions.errors import InputError
+from tools.schema import Field, Schema
+
+SCHEMA = Schema(
+    {
+        "mail": Field(
+            str,
+            regex=r"^[a-z]+@[a-z]+\.com$",
+            normalize=str.lower,
+            message="Only a valid email address is accepted.",
+        ),
+        "first_name": Field(str, normalize=str.capitalize),
+        "is_admin": Field(bool),
+        "nickname": Field(str, required=False),
+    }
+)
+VALID_DATA = {"mail": "Jane@Mail.COM", "first_name": "jANE", "is_admin": False}
+
+
+def error_message(schema, data):
+    with pytest.raises(InputError) as error:
+        schema.validate(data)
+    return error.value.message
+
+
+def test_values_normalized():
+    assert SCHEMA.validate(VALID_DATA) == {
+        "mail": "jane@mail.com",
+        "first_name": "Jane",
+        "is_admin": False,
+    }
+
+
+def test_regex_checked_after_normalize():
+    # Upper case would not match regex before "str.lower"
+    assert SCHEMA.validate(dict(VALID_DATA, mail="JOE@SF.COM"))["mail"] == "joe@sf.com"
+
+
+def test_optional_field():
+    assert SCHEMA.validate(dict(VALID_DATA, nickname="JJ"))["nickname"] == "JJ"
+
+
+def test_unknown_keys_ignored_by_default():
+    assert "age" not in SCHEMA.validate(dict(VALID_DATA, age=30))
+
+
+def test_all_errors_collected_in_one_message():
+    message = error_message(
+        SCHEMA, {"mail": "not a mail", "first_name": 42, "nickname": None}
+    )
+
+    assert message == (
+        "Only a valid email address is accepted. "
+        "first_name's type must be a str, not a int. "
+        "You don't provide 'is_admin'(required). "
+        "nickname's type must be a str, not a NoneType."
+    )
+
+
+@pytest.mark.parametrize("data", [None, {}, [VALID_DATA], "mail"])
+def test_data_must_be_a_dict(data):
+    with pytest.raises(InputError):
+        SCHEMA.validate(data)
+
+
+def test_partial_requires_nothing():
+    partial = SCHEMA.partial()
+
+    assert partial.validate({"first_name": "bob"}) == {"first_name": "Bob"}
+    assert partial.validate({"mail": "BOB@SF.COM"}) == {"mail": "bob@sf.com"}
+    # Rules are kept
+    assert error_message(partial, {"is_admin": "yes"}) == (
+        "is_admin's type must be a bool, not a str."
+    )
+
+
+def test_partial_rejects_unknown_keys_with_other_errors():
+    message = error_message(SCHEMA.partial(), {"password": "x", "mail": "x", "id": 1})
+
+    assert message == (
+        "Only mail, first_name, is_admin, nickname can be sent, not id, password. "
+        "Only a valid email address is accepted."
+    )
+
+
+def test_partial_keeps_original_schema():
+    SCHEMA.partial()
+
+    assert error_message(SCHEMA, {"nickname": "JJ"}).count("(required)") == 3
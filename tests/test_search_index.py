@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import pytest
+from tools.search_index import SuffixArrayIndex, NGramIndex
+
+MOVIES_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "fixtures", "db_sql", "movies.csv"
+)
+
+# Keywords as sent by autocomplete (split on "_"), several ones are OR
+KEYWORDS = [
+    ["bay"],
+    ["BAY"],
+    ["Bay", "bridge"],
+    ["san", "no match at all"],
+    ["the", "of", "a"],
+    ["st."],
+    ["é"],
+    ["zzzzzz"],
+    [""],
+    ["", "bay"],
+]
+
+
+def read_catalog():
+    # (id, title) of movies & (id, location) of their locations
+    titles_with_id = []
+    locations_with_id = []
+    with open(MOVIES_CSV, encoding="utf-8") as file:
+        for number, row in enumerate(csv.DictReader(file)):
+            id = f"movie-{number}"
+            titles_with_id.append((id, row["title"]))
+            for location in json.loads(row["location_funfact"]):
+                locations_with_id.append((id, location))
+    return titles_with_id, locations_with_id
+
+
+def is_like_any(text, keywords):
+    # Same as "UPPER(text) LIKE '%KEYWORD%' OR ..." of models
+    return any(keyword.upper() in text.upper() for keyword in keywords)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return read_catalog()
+
+
+@pytest.mark.parametrize("keywords", KEYWORDS)
+def test_suffix_array_index_matches_like(catalog, keywords):
+    titles_with_id, _ = catalog
+    index = SuffixArrayIndex(titles_with_id)
+
+    expected = {
+        id: title for id, title in titles_with_id if is_like_any(title, keywords)
+    }
+    assert index.search(*keywords) == expected
+
+
+@pytest.mark.parametrize("keywords", KEYWORDS)
+def test_ngram_index_matches_like(catalog, keywords):
+    _, locations_with_id = catalog
+    index = NGramIndex(locations_with_id)
+
+    expected = sorted(
+        (id, location)
+        for id, location in set(locations_with_id)
+        if is_like_any(location, keywords)
+    )
+    assert index.search(*keywords) == expected
+
+
+@pytest.mark.parametrize("keywords", KEYWORDS)
+def test_similar_search_finds_all_matches(catalog, keywords):
+    _, locations_with_id = catalog
+    index = NGramIndex(locations_with_id)
+
+    assert set(index.search(*keywords)) <= set(index.search_similar(*keywords))
+
+
+def test_empty_keyword_matches_everything(catalog):
+    titles_with_id, locations_with_id = catalog
+
+    assert len(SuffixArrayIndex(titles_with_id).search("")) == len(titles_with_id)
+    assert len(NGramIndex(locations_with_id).search("")) == len(set(locations_with_id))
+
+
+def test_search_is_case_insensitive():
+    index = SuffixArrayIndex([("1", "Bay Bridge"), ("2", "Golden Gate")])
+
+    assert index.search("bAy") == index.search("BAY") == {"1": "Bay Bridge"}
+    assert index.search("gate", "bridge") == {"1": "Bay Bridge", "2": "Golden Gate"}
+
+
+def test_no_entry():
+    assert SuffixArrayIndex([]).search("bay") == {}
+    assert NGramIndex([]).search("bay") == []
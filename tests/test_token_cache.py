@@ -0,0 +1,94 @@
+import datetime
+from types import SimpleNamespace
+import jwt
+import pytest
+import tools.cache
+import tools.token_cache
+from tools.token_cache import decode_token, token_cache
+
+SECRET_KEY = "secret"
+NOW = 1_700_000_000
+
+
+class FakeClock:
+    """Replace module "time" of caches and clock of jwt, time only moves
+    when asked"""
+
+    def __init__(self):
+        self.now = float(NOW)
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tools.cache, "time", clock)
+    monkeypatch.setattr(tools.token_cache, "time", clock)
+
+    class FakeDatetime(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls.utcfromtimestamp(clock.now)
+
+    monkeypatch.setattr(jwt.api_jwt, "datetime", FakeDatetime)
+    token_cache.clear()
+    yield clock
+    token_cache.clear()
+
+
+def make_token(secret_key=SECRET_KEY, **claims):
+    payload = {"id": "1be9b31c-32c8-4e60-a1ad-a561d7860b24", **claims}
+    return jwt.encode(payload, secret_key, algorithm="HS256")
+
+
+def test_token_verified_once(clock, monkeypatch):
+    token = make_token(exp=NOW + 60)
+    data = decode_token(token, SECRET_KEY)
+
+    monkeypatch.setattr(tools.token_cache.jwt, "decode", None)
+    assert decode_token(token, SECRET_KEY) is data
+    assert len(token_cache) == 1
+
+
+def test_cached_token_expires_at_exp(clock):
+    # Before ttl of cache
+    token = make_token(exp=NOW + 30)
+    decode_token(token, SECRET_KEY)
+
+    clock.now += 29
+    assert decode_token(token, SECRET_KEY)["exp"] == NOW + 30
+    clock.now += 2
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_token(token, SECRET_KEY)
+
+
+def test_wrong_signature_never_cached(clock):
+    token = make_token(secret_key="another secret", exp=NOW + 60)
+
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidSignatureError):
+            decode_token(token, SECRET_KEY)
+    assert len(token_cache) == 0
+
+
+def test_token_without_exp_not_cached(clock):
+    token = make_token()
+
+    assert decode_token(token, SECRET_KEY)["id"]
+    assert len(token_cache) == 0
+
+
+def test_init_app_forgets_tokens_verified_with_another_key(clock):
+    token = make_token(exp=NOW + 60)
+    decode_token(token, SECRET_KEY)
+
+    app = SimpleNamespace(config={"TOKEN_CACHE_SIZE": 10})
+    tools.token_cache.init_app(app)
+    assert len(token_cache) == 0
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_token(token, "new secret")
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+import models.user
+from models.user import User
+
+USER_ID = "1be9b31c-32c8-4e60-a1ad-a561d7860b24"
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    statements = []
+
+    def execute(statement):
+        statements.append(
+            str(statement.compile(dialect=postgresql.dialect()))
+        )
+        return SimpleNamespace(first=lambda: None)
+
+    monkeypatch.setattr(
+        models.user.db, "session", SimpleNamespace(execute=execute)
+    )
+    return statements
+
+
+def test_update_user_without_revoking_columns_keeps_version(statements):
+    User().update_user(USER_ID, {"first_name": "Lea", "last_name": "Dupont"})
+
+    assert "token_version" not in statements[0].split("RETURNING")[0]
+    assert "revoked_at" not in statements[0]
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        {"password": "hash"},
+        {"mail": "lea@gmail.com", "first_name": "Lea"},
+        {"is_admin": True},
+        {"is_activated": False},
+    ],
+)
+def test_update_user_revokes_tokens_only_if_revoking_column_changes(
+    statements, columns
+):
+    User().update_user(USER_ID, columns)
+
+    statement = statements[0]
+    assert "token_version=CASE WHEN" in statement
+    assert "revoked_at=CASE WHEN" in statement
+    for column in columns.keys() & models.user.REVOKING_COLUMNS:
+        assert f"t_user.{column} IS DISTINCT FROM" in statement
+    assert "first_name IS DISTINCT FROM" not in statement
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+import pytest
+import controllers.user_management
+from controllers.user_management import change_password
+from exceptions.errors import InputError, PermissionError
+
+USER = SimpleNamespace(id="1be9b31c-32c8-4e60-a1ad-a561d7860b24", is_admin=False)
+ADMIN = SimpleNamespace(id="1f211831-7b93-4fc7-b691-b90c37ef4623", is_admin=True)
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    hashed = []
+    monkeypatch.setattr(
+        controllers.user_management.password_hasher, "hash", hashed.append
+    )
+    return hashed
+
+
+@pytest.mark.parametrize("current_user", [USER, ADMIN])
+def test_change_password_invalid_id_before_permission_and_hash(hashed, current_user):
+    with pytest.raises(InputError):
+        change_password(current_user, {"password": "Passw0rd"}, "not-a-uuid")
+
+    assert hashed == []
+
+
+def test_change_password_of_other_user_not_hashed(hashed):
+    with pytest.raises(PermissionError):
+        change_password(USER, {"password": "Passw0rd"}, ADMIN.id)
+
+    assert hashed == []
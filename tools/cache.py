@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe in-process cache with LRU bound and time-to-live
+
+    When the cache is full, the least recently used entry is evicted.
+    An entry older than its ttl is never returned.
+    With "group_of", keys are indexed by group, so all entries of a group
+    are removed without scanning the cache.
+
+    Args:
+        maxsize (int, optional): max number of entries. Defaults to 1024.
+        ttl (int, optional): time-to-live (seconds) of entries. Defaults to 60.
+        group_of (function, optional): function taking a key and returning
+            its group. Defaults to None (no groups).
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, group_of=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiration time, value), the most recently used at the end
+        self._entries = OrderedDict()
+        self._group_of = group_of
+        # group -> set of its keys in cache
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Get value of key, and count a hit or a miss
+
+        Args:
+            key (hashable): key of entry
+            default (optional): returned if no valid entry. Defaults to None.
+
+        Returns:
+            value of key or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Add or replace value of key
+
+        Args:
+            key (hashable): key of entry
+            value: value of entry
+            ttl (int, optional): ttl of this entry. Defaults to cache's ttl.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key not in self._entries and self._group_of is not None:
+                self._groups.setdefault(self._group_of(key), set()).add(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """Remove an existing key and its index (lock required)"""
+        del self._entries[key]
+        if self._group_of is not None:
+            group = self._group_of(key)
+            keys = self._groups[group]
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def delete(self, key):
+        """Remove key if it exists
+
+        Args:
+            key (hashable): key of entry
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_group(self, group):
+        """Remove all keys of a group, without scanning the cache
+
+        Args:
+            group (hashable): group returned by "group_of" for its keys
+        """
+        with self._lock:
+            for key in self._groups.pop(group, ()):
+                del self._entries[key]
+
+    def delete_matching(self, predicate):
+        """Remove all keys matching a condition
+
+        Args:
+            predicate (function): function taking a key, True to remove it
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self):
+        """Remove all entries (ex: data reloaded)"""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self):
+        """Get usage of cache
+
+        Returns:
+            dict: hits, misses, size and maxsize of cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -1,4 +1,12 @@
 from uuid import UUID
+import base64
+import binascii
+import json
+from exceptions.errors import InputError
+from log.my_logger import get_logger
+
+logger = get_logger()
+
 
 def is_valid_uuid(uuid_to_test, version=4):
     """Check if uuid_to_test is a valid UUID
@@ -14,4 +22,87 @@ def is_valid_uuid(uuid_to_test, version=4):
         uuid_obj = UUID(uuid_to_test, version=version)
     except ValueError:
         return False
-    return str(uuid_obj) == uuid_to_test
\ No newline at end of file
+    return str(uuid_obj) == uuid_to_test
+
+
+def verify_limit(limit, default, maximum):
+    """Check the "limit" param of a request
+
+    Args:
+        limit (string/None): limit received, None if not sent
+        default (int): limit used if not sent
+        maximum (int): max limit accepted
+
+    Raises:
+        InputError: limit is not an integer between 1 and maximum
+
+    Returns:
+        int: limit to use
+    """
+    if limit is None:
+        return default
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        logger.error(f"Limit({limit}) is not an integer.")
+        raise InputError(message="The limit must be an integer.")
+    if not 1 <= limit <= maximum:
+        logger.error(f"Limit({limit}) is out of range.")
+        raise InputError(message=f"The limit must be between 1 and {maximum}.")
+    return limit
+
+
+def verify_boolean(value, name):
+    """Check a boolean param of a request
+
+    Args:
+        value (string/None): value received, None if not sent
+        name (string): name of param
+
+    Raises:
+        InputError: value is not "true" or "false"
+
+    Returns:
+        boolean/None: value, None if not sent
+    """
+    if value is None:
+        return None
+    if value.lower() not in ("true", "false"):
+        logger.error(f"{name}({value}) is not a boolean.")
+        raise InputError(message=f"The {name} must be 'true' or 'false'.")
+    return value.lower() == "true"
+
+
+def encode_cursor(values):
+    """Create an opaque cursor of pagination
+
+    Args:
+        values (list): sort key of the last item of a page
+
+    Returns:
+        string: url-safe cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode()
+
+
+def decode_cursor(cursor):
+    """Read a cursor created by "encode_cursor()"
+
+    Args:
+        cursor (string): cursor received
+
+    Raises:
+        InputError: cursor is not valid
+
+    Returns:
+        list: sort key of the last item of previous page
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except (binascii.Error, UnicodeError, ValueError):
+        logger.error(f"Cursor({cursor}) is not valid.")
+        raise InputError(message="The cursor is not valid.")
+    if not isinstance(values, list):
+        logger.error(f"Cursor({cursor}) is not valid.")
+        raise InputError(message="The cursor is not valid.")
+    return values
@@ -0,0 +1,61 @@
+import csv
+import io
+
+
+class CSVRowStream:
+    """File-like object reading rows in csv (ex: for COPY ... FROM STDIN)
+
+    Rows are written in csv only when they're read, so no more than
+    "buffer_size" bytes and one row are in memory, whatever the number
+    of rows. Empty values are written without quotes (NULL for COPY).
+
+    Args:
+        rows (iterable): tuples of values
+        buffer_size (int, optional): bytes read at once by default.
+            Defaults to 65536.
+        on_progress (function, optional): function taking the number of
+            rows read, called every "progress_every" rows. Defaults to None.
+        progress_every (int, optional): Defaults to 10000.
+    """
+
+    def __init__(self, rows, buffer_size=65536, on_progress=None, progress_every=10000):
+        self.buffer_size = buffer_size
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.rows_read = 0
+        self._rows = iter(rows)
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        # Bytes written but not read yet
+        self._buffer = bytearray()
+
+    def _fill(self, size):
+        # Write rows until "size" bytes are ready or there is no more row
+        while len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                return
+            self._writer.writerow(row)
+            self._buffer += self._text.getvalue().encode("utf-8")
+            self._text.seek(0)
+            self._text.truncate()
+            self.rows_read += 1
+            if self.on_progress and self.rows_read % self.progress_every == 0:
+                self.on_progress(self.rows_read)
+
+    def read(self, size=-1):
+        """Read csv
+
+        Args:
+            size (int, optional): max number of bytes. Defaults to -1
+                ("buffer_size").
+
+        Returns:
+            bytes: csv, empty when all rows are read
+        """
+        if size is None or size < 0:
+            size = self.buffer_size
+        self._fill(size)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
@@ -1,13 +1,53 @@
 from flask import request, current_app
 from functools import wraps
 import jwt
-from models.user import User
+import uuid
+from types import SimpleNamespace
+from tools.user_cache import get_activated_user
+from tools.revocation import revocation_list
+from tools.token_cache import decode_token
 from exceptions.errors import CredentialError, NotFoundError
 from log.my_logger import get_logger
 
 logger = get_logger()
 
 
+def is_stateless(data):
+    """Check if a token can be validated without db
+
+    Args:
+        data (dict): payload of token
+
+    Returns:
+        boolean: True if STATELESS_AUTH is enabled, revocation list is loaded
+            and token has all claims (old tokens are checked in db)
+    """
+    return (
+        current_app.config["STATELESS_AUTH"]
+        and revocation_list.is_loaded
+        and "is_admin" in data
+        and "ver" in data
+    )
+
+
+def user_from_claims(data):
+    """Get current user from claims of token
+
+    Args:
+        data (dict): payload of token
+
+    Raises:
+        CredentialError: token is revoked
+
+    Returns:
+        SimpleNamespace: "id" & "is_admin" of user
+    """
+    if revocation_list.is_revoked(data["id"], data["ver"]):
+        logger.error(f"Token of user({data['id']}) is revoked.")
+        raise CredentialError(message="This token is revoked, please login again.")
+    return SimpleNamespace(id=uuid.UUID(data["id"]), is_admin=data["is_admin"])
+
+
 def token_required(f):
     """Create token required decorator
 
@@ -28,12 +68,11 @@ def token_required(f):
 
         # Get jwt payload WITH verification
         try:
-            data = jwt.decode(
-                token, current_app.config["SECRET_KEY"], algorithms="HS256"
-            )
-            current_user = User.query.filter_by(
-                id=data["id"], is_activated=True
-            ).first()
+            data = decode_token(token, current_app.config["SECRET_KEY"])
+            if is_stateless(data):
+                current_user = user_from_claims(data)
+            else:
+                current_user = get_activated_user(data["id"])
             if not current_user:
                 logger.error(
                     f"User({data['id']}) doesn't exist\
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import time
+
+
+class DiskCache:
+    """Persistent cache with time-to-live, kept in a sqlite file
+
+    It's shared by all workers (processes) using the same file,
+    and kept after restarts. A "None" value is cached too (negative cache),
+    so a missing value isn't asked again before its ttl.
+
+    Args:
+        path (string): path of sqlite file (created if it doesn't exist)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL)"
+            )
+        connection.close()
+
+    def _connect(self):
+        # One connection by operation, so it's safe with threads & processes
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key):
+        """Get value of key
+
+        Args:
+            key (string): key of entry
+
+        Returns:
+            tuple/None: (value,) where value may be None (negative entry),
+                        None if no valid entry
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None or row[1] <= time.time():
+            return None
+        return (json.loads(row[0]),)
+
+    def get_many(self, keys):
+        """Get values of several keys at once
+
+        Args:
+            keys (list): keys of entries
+
+        Returns:
+            dict: (value,) by key, keys without valid entry are missing
+        """
+        if not keys:
+            return {}
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT key, value FROM cache WHERE expires_at > ? "
+                f"AND key IN ({', '.join('?' * len(keys))})",
+                (time.time(), *keys),
+            ).fetchall()
+        finally:
+            connection.close()
+        return {key: (json.loads(value),) for key, value in rows}
+
+    def set(self, key, value, ttl):
+        """Add or replace value of key
+
+        Args:
+            key (string): key of entry
+            value: value (json serializable) of entry, None for negative entry
+            ttl (int): time-to-live (seconds) of entry
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+        connection.close()
@@ -0,0 +1,20 @@
+import orjson
+from flask.json import JSONEncoder
+
+
+class FastJSONEncoder(JSONEncoder):
+    """JSON encoder of the app, serializing with orjson
+
+    UUID, dict & list (ex: JSONB and ARRAY columns) are serialized natively
+    by orjson. Other types (ex: dates) fall back on flask's "default()",
+    so responses keep the same format.
+    Pretty printed json (ex: JSONIFY_PRETTYPRINT_REGULAR) is left to flask.
+    """
+
+    def encode(self, o):
+        if self.indent is not None:
+            return super().encode(o)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(o, default=self.default, option=option).decode("utf-8")
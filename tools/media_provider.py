@@ -0,0 +1,101 @@
+import json
+from abc import ABC, abstractmethod
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+class MediaProvider(ABC):
+    """Interface of providers of movies' poster & trailer
+
+    A provider must implement "fetch()", it's called by a pool of threads
+    (never during a request), so it can block on network.
+    """
+
+    @abstractmethod
+    def fetch(self, movie):
+        """Get poster & trailer of a movie
+
+        Args:
+            movie (dict): "id", "title" & "release_year" of movie
+
+        Raises:
+            Exception: provider is unavailable (result is not cached)
+
+        Returns:
+            dict/None: "poster" & "trailer" urls, None if movie is unknown
+        """
+
+    def default_media(self):
+        """Poster & trailer sent while the real ones are unknown
+
+        Returns:
+            dict: "poster" & "trailer" urls
+        """
+        return {"poster": None, "trailer": None}
+
+
+class PlaceholderMediaProvider(MediaProvider):
+    """Provider giving the same placeholder urls for every movie"""
+
+    PLACEHOLDER = {"poster": "https://movie_url", "trailer": "https://trailer_url"}
+
+    def fetch(self, movie):
+        return dict(self.PLACEHOLDER)
+
+    def default_media(self):
+        return dict(self.PLACEHOLDER)
+
+
+class HTTPMediaProvider(MediaProvider):
+    """Provider calling an http api which answers in json
+
+    Request: GET <base_url>?title=<title>&year=<release_year>
+    Response: {"poster": "<url>", "trailer": "<url>"}, 404 if unknown movie
+
+    Args:
+        base_url (string): url of api (ex: a local stub server for tests)
+        timeout (int, optional): timeout (seconds) of requests. Defaults to 5.
+    """
+
+    def __init__(self, base_url, timeout=5):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def fetch(self, movie):
+        query = urllib.parse.urlencode(
+            {"title": movie["title"], "year": movie.get("release_year") or ""}
+        )
+        try:
+            with urllib.request.urlopen(
+                f"{self.base_url}?{query}", timeout=self.timeout
+            ) as response:
+                body = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        return {"poster": body.get("poster"), "trailer": body.get("trailer")}
+
+
+def create_media_provider(name, api_url=None, timeout=5):
+    """Create the provider defined in config
+
+    Args:
+        name (string): "placeholder" or "http"
+        api_url (string, optional): url of api for "http". Defaults to None.
+        timeout (int, optional): timeout (seconds) for "http". Defaults to 5.
+
+    Raises:
+        ValueError: unknown provider or missing url
+
+    Returns:
+        MediaProvider: provider
+    """
+    if name == "placeholder":
+        return PlaceholderMediaProvider()
+    if name == "http":
+        if not api_url:
+            raise ValueError("MEDIA_API_URL is required by 'http' media provider")
+        return HTTPMediaProvider(api_url, timeout)
+    raise ValueError(f"Unknown media provider '{name}'")
@@ -0,0 +1,150 @@
+import threading
+from contextlib import contextmanager
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from exceptions.errors import ServiceUnavailableError
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+
+class PasswordHasher:
+    """Hash & verify passwords in a pool of processes
+
+    Hashing is slow on purpose, so it's done out of request workers: a burst
+    of logins only waits for the pool and doesn't hold the GIL of others.
+    The number of hashes waiting or running is bounded, beyond it requests
+    get at once a ServiceUnavailableError (503) instead of queuing.
+
+    Args:
+        method (string, optional): method of werkzeug's
+            "generate_password_hash", with its cost (ex: "pbkdf2:sha256:260000").
+            Defaults to "sha256".
+        workers (int, optional): number of processes. Defaults to 2.
+        max_pending (int, optional): max hashes waiting or running.
+            Defaults to 32.
+    """
+
+    def __init__(self, method="sha256", workers=2, max_pending=32):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure(method, workers, max_pending)
+
+    def configure(self, method, workers, max_pending):
+        """Replace method & bounds of pool (see __init__)"""
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Prefix of hashes created by method (ex: "pbkdf2:sha256:260000"),
+        # default cost of werkzeug is included if method doesn't give it
+        self._method_prefix = generate_password_hash("", method).split("$", 1)[0]
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        # Processes are started at first hash, not when app is imported
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    @contextmanager
+    def _pending(self):
+        # Take a place among pending hashes, or fail at once if none is free
+        if not self._slots.acquire(blocking=False):
+            logger.error(f"Password hasher is overloaded ({self.max_pending} pending).")
+            raise ServiceUnavailableError(
+                message="Too many requests at the moment, please retry later.",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield self._get_executor()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method
+
+        Args:
+            password (string): password in plain text
+
+        Raises:
+            ServiceUnavailableError: too many hashes pending
+
+        Returns:
+            string: hashed password
+        """
+        with self._pending() as executor:
+            return executor.submit(generate_password_hash, password, self.method).result()
+
+    def hash_many(self, passwords):
+        """Hash several passwords in parallel, with all processes of pool
+        They count as one pending hash.
+
+        Args:
+            passwords (list): passwords in plain text
+
+        Raises:
+            ServiceUnavailableError: too many hashes pending
+
+        Returns:
+            list: hashed passwords, in the same order
+        """
+        # Chunks are small enough to keep all processes busy until the end
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        with self._pending() as executor:
+            return list(
+                executor.map(
+                    generate_password_hash,
+                    passwords,
+                    repeat(self.method),
+                    chunksize=chunksize,
+                )
+            )
+
+    def verify(self, password_hash, password):
+        """Check a password against its hash
+
+        Args:
+            password_hash (string): hashed password in db
+            password (string): password in plain text
+
+        Raises:
+            ServiceUnavailableError: too many hashes pending
+
+        Returns:
+            boolean: True if password is correct
+        """
+        with self._pending() as executor:
+            return executor.submit(check_password_hash, password_hash, password).result()
+
+    def needs_rehash(self, password_hash):
+        """Check if a hash was created by another method or cost
+
+        Args:
+            password_hash (string): hashed password in db
+
+        Returns:
+            boolean: True if password must be hashed again
+        """
+        return password_hash.split("$", 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
+
+
+def init_app(app):
+    """Configure password hasher
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    password_hasher.configure(
+        app.config["PASSWORD_HASH_METHOD"],
+        app.config["PASSWORD_HASH_WORKERS"],
+        app.config["PASSWORD_HASH_MAX_PENDING"],
+    )
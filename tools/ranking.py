@@ -0,0 +1,120 @@
+import heapq
+from tools.search_index import normalize, max_typos
+
+# Scores by kind of match, the best match of a keyword in a text is kept
+PREFIX_SCORE = 3.0
+WORD_BOUNDARY_SCORE = 2.0
+SUBSTRING_SCORE = 1.0
+
+
+def substring_edit_distance(keyword, text):
+    """Smallest edit distance between keyword and any substring of text
+
+    It's the Levenshtein distance where skipping the beginning and
+    the end of text is free (Sellers algorithm).
+
+    Args:
+        keyword (string): normalized keyword
+        text (string): normalized text
+
+    Returns:
+        int: number of insertions/deletions/substitutions
+    """
+    # previous_row[i]: distance between keyword[:i] and a substring of text
+    # ending at the current character
+    previous_row = list(range(len(keyword) + 1))
+    best = previous_row[-1]
+    for character in text:
+        current_row = [0]
+        for i, keyword_character in enumerate(keyword, 1):
+            current_row.append(
+                min(
+                    previous_row[i] + 1,
+                    current_row[i - 1] + 1,
+                    previous_row[i - 1] + (keyword_character != character),
+                )
+            )
+        best = min(best, current_row[-1])
+        previous_row = current_row
+    return best
+
+
+def score_keyword(keyword, text):
+    """Score how well a keyword matches a text
+
+    Best is a prefix of text, then a word's beginning in text,
+    then anywhere in text, then with typos (fewer is better).
+
+    Args:
+        keyword (string): normalized keyword
+        text (string): normalized text
+
+    Returns:
+        float: score, 0 if keyword doesn't match text
+    """
+    if not keyword or not text:
+        return 0.0
+
+    # Shorter texts are closer to keyword
+    closeness = len(keyword) / max(len(keyword), len(text))
+
+    position = text.find(keyword)
+    if position == 0:
+        return PREFIX_SCORE + closeness
+    best = 0.0
+    while position > 0:
+        if not text[position - 1].isalnum():
+            return WORD_BOUNDARY_SCORE + closeness
+        best = SUBSTRING_SCORE + closeness
+        position = text.find(keyword, position + 1)
+    if best:
+        return best
+
+    typos = max_typos(len(keyword))
+    if not typos:
+        return 0.0
+    distance = substring_edit_distance(keyword, text)
+    if distance > typos:
+        return 0.0
+    return SUBSTRING_SCORE * (1 - distance / (typos + 1))
+
+
+def score(keywords, text):
+    """Score a text for all keywords
+
+    Args:
+        keywords (list): normalized keywords
+        text (string): text to score
+
+    Returns:
+        float: sum of keywords' score
+    """
+    normalized_text = normalize(text or "")
+    return sum(score_keyword(keyword, normalized_text) for keyword in keywords)
+
+
+def top_k(texts, keywords, k):
+    """Keep the k texts which match best keywords
+
+    Only a heap of k texts is kept, texts are never all sorted.
+    Texts with same score are sorted by text.
+
+    Args:
+        texts (iterable): texts to rank
+        keywords (list): keywords input
+        k (int): max number of texts returned
+
+    Returns:
+        list: texts matching keywords, the best at first
+    """
+    keywords = [normalize(keyword) for keyword in keywords if keyword]
+    scored_texts = ((score(keywords, text), text) for text in texts)
+    return [
+        text
+        for text_score, text in heapq.nsmallest(
+            k,
+            (scored for scored in scored_texts if scored[0] > 0),
+            # Best score at first, then by text
+            key=lambda scored: (-scored[0], scored[1]),
+        )
+    ]
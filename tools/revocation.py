@@ -0,0 +1,152 @@
+import bisect
+import threading
+from models.user import User
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+# Min version of deactivated users: all their tokens are revoked
+ALL_REVOKED = float("inf")
+
+
+class RevocationList:
+    """Revoked tokens, checked in memory without database
+
+    A token carries the "token_version" of its user at login. It's revoked
+    if its version is lower than the current version of the user,
+    and all tokens of a deactivated user are revoked.
+    Only users having revoked tokens are kept, in a sorted array of ids
+    with their min valid version, searched by bisection.
+    Both arrays are replaced together in one attribute (never modified),
+    so readers don't need a lock and never see them misaligned.
+    """
+
+    def __init__(self):
+        # (sorted ids, min valid version of each id)
+        self._entries = ([], [])
+        self._lock = threading.Lock()
+        self.is_loaded = False
+
+    def __len__(self):
+        return len(self._entries[0])
+
+    def load(self, users):
+        """Replace revoked tokens by those found in db
+
+        Args:
+            users (list): tuples of ("id" (string), "token_version",
+                "is_activated"), see User.get_all_users_with_revoked_tokens
+        """
+        revoked = sorted(
+            (id, token_version if is_activated else ALL_REVOKED)
+            for id, token_version, is_activated in users
+        )
+        with self._lock:
+            self._entries = (
+                [id for id, _ in revoked],
+                [min_version for _, min_version in revoked],
+            )
+            self.is_loaded = True
+
+    def revoke(self, user_id, token_version, is_activated=True):
+        """Revoke tokens of a user modified by this worker, without waiting sync
+
+        Args:
+            user_id (string): user's id
+            token_version (int): new version of user
+            is_activated (bool, optional): False to revoke all tokens.
+                Defaults to True.
+        """
+        min_version = token_version if is_activated else ALL_REVOKED
+        with self._lock:
+            ids, min_versions = (list(entries) for entries in self._entries)
+            index = bisect.bisect_left(ids, user_id)
+            if index < len(ids) and ids[index] == user_id:
+                min_versions[index] = max(min_versions[index], min_version)
+            else:
+                ids.insert(index, user_id)
+                min_versions.insert(index, min_version)
+            self._entries = (ids, min_versions)
+
+    def is_revoked(self, user_id, token_version):
+        """Check if a token is revoked
+
+        Args:
+            user_id (string): "id" in token
+            token_version (int): "ver" in token
+
+        Returns:
+            boolean: True if token is revoked
+        """
+        ids, min_versions = self._entries
+        index = bisect.bisect_left(ids, user_id)
+        if index < len(ids) and ids[index] == user_id:
+            return token_version < min_versions[index]
+        return False
+
+
+revocation_list = RevocationList()
+
+
+def sync_revocation_list(app):
+    """Load revoked tokens from db
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    with app.app_context():
+        users = User().get_all_users_with_revoked_tokens(
+            app.config["TOKEN_LIFETIME"])
+    revocation_list.load(users)
+    logger.debug(f"Revocation list synced, {len(revocation_list)} users.")
+
+
+def run_revocation_sync(app, interval, stop_event):
+    """Sync revoked tokens from db every "interval" seconds
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+        interval (int): seconds between two syncs
+        stop_event (threading.Event): set it to stop sync
+    """
+    while not stop_event.wait(interval):
+        try:
+            sync_revocation_list(app)
+        except Exception as e:
+            # Old list is kept until next sync
+            logger.error(f"Failed to sync revocation list, details: {e}")
+
+
+def start_revocation_sync(app):
+    """Load revoked tokens and start their sync in a daemon thread
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    try:
+        sync_revocation_list(app)
+    except Exception as e:
+        # Tokens are checked in db until the list is loaded
+        logger.error(f"Failed to load revocation list, details: {e}")
+
+    stop_event = threading.Event()
+    threading.Thread(
+        target=run_revocation_sync,
+        args=(app, app.config["REVOCATION_SYNC_INTERVAL"], stop_event),
+        name="revocation-sync",
+        daemon=True,
+    ).start()
+    app.extensions["revocation_sync"] = stop_event
+
+
+def init_app(app):
+    """Start sync of revoked tokens on first request if STATELESS_AUTH
+    is enabled
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    if app.config["STATELESS_AUTH"]:
+        # Only an app serving requests syncs, never cli commands
+        # (ex: "flask load-movies") nor a master process before fork
+        app.before_first_request(lambda: start_revocation_sync(app))
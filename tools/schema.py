@@ -0,0 +1,131 @@
+import re
+from exceptions.errors import InputError
+from tools.user import verify_data_form
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+
+class Field:
+    """Rule of one key in the body of a request
+
+    Args:
+        type_required (type): type of value
+        required (bool, optional): key must be sent. Defaults to True.
+        regex (string, optional): pattern the value must match
+            (after normalize). Defaults to None.
+        normalize (function, optional): function applied to the value
+            (ex: str.lower). Defaults to None.
+        message (string, optional): error if regex doesn't match.
+            Defaults to None.
+    """
+
+    def __init__(
+        self, type_required, required=True, regex=None, normalize=None, message=None
+    ):
+        self.type_required = type_required
+        self.required = required
+        self.regex = re.compile(regex) if isinstance(regex, str) else regex
+        self.normalize = normalize
+        self.message = message or "This value is not valid."
+
+
+class Schema:
+    """Validator of the body of a request
+
+    Fields are compiled once (tuple of rules, regexes compiled), so a request
+    is checked in one pass over them. All errors are collected and raised
+    together in one InputError.
+
+    Args:
+        fields (dict): Field by key
+        allow_unknown (bool, optional): keys not in fields are ignored,
+            else they are an error. Defaults to True.
+    """
+
+    def __init__(self, fields, allow_unknown=True):
+        self.fields = dict(fields)
+        self.allow_unknown = allow_unknown
+        self._names = frozenset(self.fields)
+        # (key, required, type, regex's match, normalize, message) by field
+        self._rules = tuple(
+            (
+                name,
+                field.required,
+                field.type_required,
+                field.regex.match if field.regex is not None else None,
+                field.normalize,
+                field.message,
+            )
+            for name, field in self.fields.items()
+        )
+
+    def partial(self):
+        """Get the same schema where no key is required and unknown keys
+        are an error (ex: for PATCH)
+
+        Returns:
+            Schema: new schema
+        """
+        fields = {
+            name: Field(
+                field.type_required,
+                required=False,
+                regex=field.regex,
+                normalize=field.normalize,
+                message=field.message,
+            )
+            for name, field in self.fields.items()
+        }
+        return Schema(fields, allow_unknown=False)
+
+    def validate(self, data):
+        """Check data and get its normalized values
+
+        Args:
+            data (object/None): data in the body of a request
+
+        Raises:
+            InputError: data is not a dict, or keys missing, unknown or
+                not valid (all of them in message)
+
+        Returns:
+            dict: normalized value by key of schema sent
+        """
+        # Data form check (dict send in json)
+        verify_data_form(data)
+
+        errors = []
+        if not self.allow_unknown:
+            unknown_keys = data.keys() - self._names
+            if unknown_keys:
+                errors.append(
+                    f"Only {', '.join(self.fields)} can be sent, "
+                    f"not {', '.join(sorted(unknown_keys))}."
+                )
+
+        values = {}
+        for name, required, type_required, match, normalize, message in self._rules:
+            if name not in data:
+                if required:
+                    errors.append(f"You don't provide '{name}'(required).")
+                continue
+            value = data[name]
+            if not isinstance(value, type_required):
+                errors.append(
+                    f"{name}'s type must be a {type_required.__name__}, "
+                    f"not a {type(value).__name__}."
+                )
+                continue
+            if normalize is not None:
+                value = normalize(value)
+            if match is not None and not match(value):
+                errors.append(message)
+                continue
+            values[name] = value
+
+        if errors:
+            message = " ".join(errors)
+            logger.error(f"Data not valid: {message}")
+            raise InputError(message=message)
+        return values
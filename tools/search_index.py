@@ -0,0 +1,216 @@
+import bisect
+from collections import Counter
+
+# Greatest code point, used as upper bound when searching suffixes by prefix
+MAX_CHAR = "\U0010ffff"
+
+
+def normalize(text):
+    """Normalize text for case insensitive search
+
+    It matches the "UPPER(...)" used in sql queries of models.
+
+    Args:
+        text (string): text to normalize
+
+    Returns:
+        string: normalized text
+    """
+    return text.upper()
+
+
+def max_typos(length):
+    """Number of typos tolerated in a keyword
+
+    Args:
+        length (int): length of keyword
+
+    Returns:
+        int: 0 for short keywords, 1 up to 7 characters, else 2
+    """
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+class SuffixArrayIndex:
+    """Substring index over short texts (ex: movie titles)
+
+    All suffixes of every normalized text are kept sorted, so texts
+    containing a keyword are found by a binary search of the keyword
+    among suffixes, without scanning texts which don't contain it.
+
+    Args:
+        entries (iterable): tuples of (key, text), ex: (movie_id, title)
+    """
+
+    def __init__(self, entries):
+        self._entries = list(entries)
+
+        suffixes = []
+        for position, (_, text) in enumerate(self._entries):
+            normalized_text = normalize(text or "")
+            for start in range(len(normalized_text)):
+                suffixes.append((normalized_text[start:], position))
+        suffixes.sort()
+
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._positions = [position for _, position in suffixes]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def search(self, *keywords):
+        """Find texts which contain at least one of keywords
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            dict: key is the entry's key and value its text
+        """
+        positions = set()
+        for keyword in keywords:
+            if not keyword:
+                # Same as LIKE '%%', everything matches
+                positions.update(range(len(self._entries)))
+                continue
+            keyword = normalize(keyword)
+            start = bisect.bisect_left(self._suffixes, keyword)
+            end = bisect.bisect_right(self._suffixes, keyword + MAX_CHAR, start)
+            positions.update(self._positions[start:end])
+
+        return dict(self._entries[position] for position in sorted(positions))
+
+
+def ngrams(text, n):
+    """Get all distinct n-grams of a text
+
+    Args:
+        text (string): text to split
+        n (int): size of grams
+
+    Returns:
+        set: n-grams of text
+    """
+    return {text[start:start + n] for start in range(len(text) - n + 1)}
+
+
+class NGramIndex:
+    """Inverted n-gram index over texts shared by several keys
+    (ex: locations shared by several movies)
+
+    Every distinct text is split into grams of 1 to 3 characters, each gram
+    points to the texts containing it (postings). A keyword up to 3
+    characters is answered by its own postings, a longer one by the
+    intersection of its trigrams' postings, then checked by substring.
+
+    Args:
+        entries (iterable): tuples of (key, text), ex: (movie_id, location)
+        n (int, optional): max size of grams. Defaults to 3.
+    """
+
+    def __init__(self, entries, n=3):
+        self.n = n
+
+        # Distinct texts with the keys related to each one
+        keys_by_text = {}
+        for key, text in entries:
+            keys_by_text.setdefault(text, []).append(key)
+        self._texts = list(keys_by_text)
+        self._keys = [tuple(keys_by_text[text]) for text in self._texts]
+        self._normalized_texts = [normalize(text) for text in self._texts]
+
+        postings = {}
+        for position, normalized_text in enumerate(self._normalized_texts):
+            for size in range(1, n + 1):
+                for gram in ngrams(normalized_text, size):
+                    postings.setdefault(gram, []).append(position)
+        self._postings = {gram: tuple(posting) for gram, posting in postings.items()}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _search_keyword(self, keyword):
+        if not keyword:
+            return set(range(len(self._texts)))
+        if len(keyword) <= self.n:
+            return set(self._postings.get(keyword, ()))
+
+        # Intersect postings from the smallest, stop as soon as it's empty
+        grams_postings = sorted(
+            (self._postings.get(gram, ()) for gram in ngrams(keyword, self.n)),
+            key=len,
+        )
+        positions = set(grams_postings[0])
+        for posting in grams_postings[1:]:
+            if not positions:
+                break
+            positions.intersection_update(posting)
+
+        # Grams could be in text but not contiguous, check it
+        return {
+            position
+            for position in positions
+            if keyword in self._normalized_texts[position]
+        }
+
+    def _search_similar_keyword(self, keyword):
+        typos = max_typos(len(keyword))
+        if not typos:
+            return self._search_keyword(keyword)
+
+        # A typo changes at most 2 bigrams, so texts similar to keyword
+        # share at least all its bigrams but 2 by typo
+        bigrams = ngrams(keyword, 2)
+        shared_bigrams = Counter()
+        for bigram in bigrams:
+            shared_bigrams.update(self._postings.get(bigram, ()))
+        min_shared = max(1, len(bigrams) - 2 * typos)
+        return {
+            position
+            for position, shared in shared_bigrams.items()
+            if shared >= min_shared
+        }
+
+    def search(self, *keywords):
+        """Find texts which contain at least one of keywords
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            list: sorted tuples of (key, text)
+        """
+        positions = set()
+        for keyword in keywords:
+            positions.update(self._search_keyword(normalize(keyword)))
+
+        return self._to_entries(positions)
+
+    def search_similar(self, *keywords):
+        """Find texts which could contain at least one of keywords with typos
+
+        It's a superset of "search()": texts containing a keyword are found
+        too, candidates must then be scored (see tools.ranking).
+
+        Args:
+            keywords (string): keywords input
+
+        Returns:
+            list: sorted tuples of (key, text)
+        """
+        positions = set()
+        for keyword in keywords:
+            positions.update(self._search_similar_keyword(normalize(keyword)))
+
+        return self._to_entries(positions)
+
+    def _to_entries(self, positions):
+        return sorted(
+            (key, self._texts[position])
+            for position in positions
+            for key in self._keys[position]
+        )
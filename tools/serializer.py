@@ -0,0 +1,51 @@
+from functools import lru_cache
+from operator import attrgetter
+
+
+@lru_cache(maxsize=None)
+def get_serializer(model, columns_to_ignore=(), only=None):
+    """Get the serializer of a model for some columns
+
+    Columns are resolved once by (model, columns), then each call
+    only reads attributes of the row.
+
+    Args:
+        model (db.Model): class of rows to serialize
+        columns_to_ignore (tuple, optional): columns not serialized.
+            Defaults to ().
+        only (tuple, optional): columns to serialize, others are ignored.
+            Defaults to None (all columns of model).
+
+    Returns:
+        function: function taking a row and returning its dict
+    """
+    keys = model.__mapper__.c.keys() if only is None else only
+    ignored = frozenset(columns_to_ignore)
+    keys = tuple(key for key in keys if key not in ignored)
+
+    if not keys:
+        return lambda row: {}
+    getter = attrgetter(*keys)
+    if len(keys) == 1:
+        # attrgetter of one attribute doesn't return a tuple
+        key = keys[0]
+        return lambda row: {key: getter(row)}
+    return lambda row: dict(zip(keys, getter(row)))
+
+
+def to_dict(row, columns_to_ignore=(), only=None):
+    """Convert a row to dict with the compiled serializer of its model
+
+    Args:
+        row (db.Model): row to convert
+        columns_to_ignore (tuple, optional): columns not converted.
+            Defaults to ().
+        only (list, optional): columns to convert, others are ignored.
+            Defaults to None (all columns).
+
+    Returns:
+        dict: dict of row's wanted info
+    """
+    if only is not None:
+        only = tuple(only)
+    return get_serializer(type(row), tuple(columns_to_ignore), only)(row)
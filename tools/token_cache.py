@@ -0,0 +1,44 @@
+import hashlib
+import time
+import jwt
+from tools.cache import LRUCache
+
+# Payloads of tokens already verified, keyed by sha256 of token
+token_cache = LRUCache(maxsize=4096)
+
+
+def decode_token(token, secret_key):
+    """Get payload of a token, its signature is verified only once
+
+    A token is cached until its "exp", so an expired or wrong token
+    raises the same errors as "jwt.decode()".
+
+    Args:
+        token (string): token in header "x-access-token"
+        secret_key (string): key used to sign tokens
+
+    Raises:
+        jwt.ExpiredSignatureError: token is expired
+        jwt.InvalidSignatureError: token is wrong
+
+    Returns:
+        dict: payload of token (must not be modified)
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    data = token_cache.get(key)
+    if data is None:
+        data = jwt.decode(token, secret_key, algorithms="HS256")
+        if "exp" in data:
+            token_cache.set(key, data, ttl=data["exp"] - time.time())
+    return data
+
+
+def init_app(app):
+    """Configure cache of verified tokens
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    token_cache.maxsize = app.config["TOKEN_CACHE_SIZE"]
+    # Tokens signed by another key must be verified again
+    token_cache.clear()
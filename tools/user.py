@@ -1,3 +1,4 @@
+import json
 from uuid import UUID
 from exceptions.errors import InputError
 from log.my_logger import get_logger
@@ -59,43 +60,30 @@ def is_uuid(id, version=4):
         return False
 
 
-def verify_type_integrity_of_data(template, data):
-    """Check integrity & type
-
-    It allows to check if data includs all columns required by template,
-    and ensure they have also the type defined by template.
+def read_ndjson(lines, max_rows):
+    """Read rows sent in ndjson (one json by line)
 
     Args:
-        template (dict): key is the column name and value is it's type
-            example
-                    template = {
-                    "first_name": str,
-                    "password": str,
-                    "is_activated": bool,
-                    "is_admin": bool,
-                    "last_name": str,
-                    "mail": str,
-                    "liked_movie_id": list,
-                    }
-        data (dict): data in the body of a request
+        lines (iterable): lines of body of a request (bytes)
+        max_rows (int): max number of rows accepted
 
     Raises:
-        InputError: Error info about input
+        InputError: a line is not valid json or too many rows
+
+    Returns:
+        list: rows read, empty lines are ignored
     """
-    # All required columns check
-    for key_required in template.keys():
-        if key_required not in [key for key in data.keys()]:
-            logger.error(f"'{key_required}' is missing.")
-            raise InputError(f"You don't provide '{key_required}'(required).")
-
-    # Data type check
-    for key_required, type_required in template.items():
-        if not isinstance(data[key_required], type_required):
-            logger.error(
-                f"{key_required}'s type must be a {type_required},\
-                    not a {type(data[key_required])}."
-            )
-            raise InputError(
-                message=f"{key_required}'s type must be a {type_required},\
-                    not {type(data[key_required])}."
-            )
+    rows = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if len(rows) == max_rows:
+            logger.error(f"More than {max_rows} rows in ndjson.")
+            raise InputError(message=f"No more than {max_rows} rows at once.")
+        try:
+            rows.append(json.loads(line))
+        except ValueError:
+            logger.error(f"Line {number} of ndjson is not valid json.")
+            raise InputError(message=f"Line {number} is not valid json.")
+    return rows
@@ -0,0 +1,56 @@
+import uuid
+from types import SimpleNamespace
+from models.user import User
+from tools.cache import LRUCache
+from log.my_logger import get_logger
+
+logger = get_logger()
+
+# Activated users authenticated by token, keyed by user's id (string)
+user_cache = LRUCache(maxsize=1024, ttl=30)
+
+
+def get_activated_user(user_id):
+    """Find an activated user by id, from cache if possible
+
+    Users are cached as snapshots of their columns (password excluded),
+    never as ORM objects which would be bound to the session of a request.
+
+    Args:
+        user_id (string): user's id in token
+
+    Returns:
+        SimpleNamespace/None: user's columns as attributes (ex: "id",
+            "is_admin"), None if user doesn't exist or is not activated
+    """
+    key = str(user_id)
+    user = user_cache.get(key)
+    if user is None:
+        found_user = User.query.filter_by(id=user_id, is_activated=True).first()
+        if not found_user:
+            return None
+        user = SimpleNamespace(**found_user.to_dict("password"))
+        user_cache.set(key, user)
+    return user
+
+
+def invalidate_user(user_id):
+    """Remove a user from cache (ex: user modified or deactivated)
+
+    Each worker has its own cache, others get the change after its ttl.
+
+    Args:
+        user_id (string): valid uuid of user
+    """
+    user_cache.delete(str(uuid.UUID(user_id)))
+    logger.debug(f"User({user_id}) removed from cache.")
+
+
+def init_app(app):
+    """Configure cache of authenticated users
+
+    Args:
+        app (app): the unique instance app created in app/__init__.py
+    """
+    user_cache.maxsize = app.config["USER_CACHE_SIZE"]
+    user_cache.ttl = app.config["USER_CACHE_TTL"]